@@ -0,0 +1,86 @@
+"""Local SOCKS5 stand-in for the Tor daemon.
+
+Accepts no-auth CONNECT requests and pipes bytes to the target. With
+--target every connection goes to one address whatever host was asked for,
+so .onion URLs can be served by the Flask app in main.py, e.g.
+
+    python main.py &
+    python socks_stub.py --port 9050 --target 127.0.0.1:8080
+
+Then point the app at it with PHOBOS_SOCKS_PROXY=127.0.0.1:9050.
+"""
+import argparse
+import asyncio
+import ipaddress
+import struct
+
+
+async def pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(64 * 1024)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def handle(reader, writer, target):
+    try:
+        version, count = await reader.readexactly(2)
+        methods = await reader.readexactly(count)
+        if version != 5 or 0 not in methods:
+            writer.write(b"\x05\xff")
+            return
+        writer.write(b"\x05\x00")
+        version, command, _, kind = await reader.readexactly(4)
+        if kind == 1:
+            host = str(ipaddress.IPv4Address(await reader.readexactly(4)))
+        elif kind == 4:
+            host = str(ipaddress.IPv6Address(await reader.readexactly(16)))
+        else:
+            host = (await reader.readexactly((await reader.readexactly(1))[0])).decode("idna")
+        port = struct.unpack(">H", await reader.readexactly(2))[0]
+        if command != 1:
+            writer.write(b"\x05\x07\x00\x01" + bytes(6))
+            return
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(*(target or (host, port)))
+        except OSError:
+            writer.write(b"\x05\x05\x00\x01" + bytes(6))
+            return
+        writer.write(b"\x05\x00\x00\x01" + bytes(6))
+        await writer.drain()
+        await asyncio.gather(pipe(reader, upstream_writer), pipe(upstream_reader, writer))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host, port, target):
+    server = await asyncio.start_server(lambda r, w: handle(r, w, target), host, port)
+    print(f"SOCKS5 stub listening on {host}:{port}" + (f", forwarding to {target[0]}:{target[1]}" if target else ""))
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9050)
+    parser.add_argument("--target", help="host:port every CONNECT is sent to")
+    args = parser.parse_args()
+    target = None
+    if args.target:
+        host, _, port = args.target.rpartition(":")
+        target = (host, int(port))
+    asyncio.run(serve(args.host, args.port, target))
+
+
+if __name__ == "__main__":
+    main()
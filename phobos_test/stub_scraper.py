@@ -0,0 +1,84 @@
+"""Offline stand-in for `main.go -serve`.
+
+Speaks the same newline-delimited JSON protocol on stdin/stdout but answers
+from the templates in this directory instead of going through Tor, e.g.
+
+    PHOBOS_FETCH_ENGINE=daemon PHOBOS_SCRAPER="python ../../phobos_test/stub_scraper.py --delay 0.5" python main.py
+
+With --base the pages are fetched over HTTP from a running `main.py` Flask
+server instead (e.g. --base http://127.0.0.1:8080).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+from urllib.parse import urlparse
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Same routes as main.py; any other /<name> is served from <name>.html
+ROUTES = {
+    "modern_india_2025": "forums.html",
+    "operation_sindoor": "forums2.html",
+    "forum3": "forums3.html",
+    "forum4": "forums4.html",
+}
+
+
+def read_urls(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def fetch_template(url):
+    name = urlparse(url).path.strip("/").split("/")[-1]
+    path = os.path.join(TEMPLATES_DIR, ROUTES.get(name, name + ".html"))
+    if not os.path.exists(path):
+        return "404 Not Found", ""
+    with open(path, "r", encoding="utf-8") as f:
+        return "200 OK", f.read()
+
+
+def fetch_http(base, url):
+    parsed = urlparse(url)
+    target = base.rstrip("/") + parsed.path
+    try:
+        with urllib.request.urlopen(target, timeout=30) as resp:
+            return f"{resp.status} {resp.reason}", resp.read().decode("utf-8", "replace")
+    except Exception as e:
+        return "Error: " + str(e), ""
+
+
+def emit(message):
+    sys.stdout.write(json.dumps(message, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to sleep before each page")
+    parser.add_argument("--base", help="fetch from this Flask server instead of reading templates")
+    parser.add_argument("--urls", default="url.txt", help="url list used when a command names no URLs")
+    args = parser.parse_args()
+
+    for line in sys.stdin:
+        line = line.strip()
+        try:
+            command = json.loads(line) if line else {}
+            urls = command.get("urls") or read_urls(args.urls)
+        except (ValueError, OSError) as e:
+            emit({"type": "done", "error": str(e)})
+            continue
+
+        for url in urls:
+            if args.delay:
+                time.sleep(args.delay)
+            status, html = fetch_http(args.base, url) if args.base else fetch_template(url)
+            emit({"type": "page", "url": url, "status": status, "links": [], "html": html})
+        emit({"type": "done", "count": len(urls)})
+
+
+if __name__ == "__main__":
+    main()
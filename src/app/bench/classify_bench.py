@@ -0,0 +1,62 @@
+"""Per-entry predict + predict_proba (the old analyze_content loop) vs
+classify_batch, on synthetic documents built from model/train.json.
+
+    cd src/app && python -m bench.classify_bench --sizes 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+import joblib
+
+from model.model import classify_batch
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_corpus(size, seed=42):
+    """Documents of 3-12 training sentences each, like a short forum thread"""
+    with open(os.path.join(APP_DIR, "model", "train.json"), "r", encoding="utf-8") as f:
+        sentences = [item["text"] for item in json.load(f)["data"]]
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(sentences, k=rng.randint(3, 12))) for _ in range(size)]
+
+
+def per_entry(model, texts):
+    for text in texts:
+        model.predict([text])[0]
+        model.predict_proba([text])[0].max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--loop-max", type=int, default=10000,
+                        help="time the per-entry loop on at most this many documents and extrapolate")
+    args = parser.parse_args()
+
+    model = joblib.load(os.path.join(APP_DIR, "threat_classifier.pkl"))
+
+    for size in args.sizes:
+        texts = build_corpus(size)
+
+        sample = texts[:args.loop_max]
+        start = time.perf_counter()
+        per_entry(model, sample)
+        loop_time = (time.perf_counter() - start) * size / len(sample)
+        note = "" if len(sample) == size else f" (extrapolated from {len(sample)})"
+
+        start = time.perf_counter()
+        result = classify_batch(model, texts)
+        batch_time = time.perf_counter() - start
+
+        print(f"{size} documents")
+        print(f"  per-entry loop  {loop_time:8.2f} s  {size / loop_time:10.0f} docs/s{note}")
+        print(f"  classify_batch  {batch_time:8.2f} s  {size / batch_time:10.0f} docs/s")
+        print(f"  speedup {loop_time / batch_time:.1f}x, {int((result['labels'] == 'suspicious').sum())} suspicious")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Pickled sklearn pipeline vs its compact NumPy export (model/compact.py):
+cold-start load time and memory in a fresh process, classification throughput
+and predict_proba parity on synthetic documents built from model/train.json.
+
+    cd src/app && python -m bench.compact_bench
+    cd src/app && python -m bench.compact_bench --model /tmp/big_model.pkl --docs 20000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from bench.classify_bench import build_corpus
+from config.app_config import THREAT_MODEL_PATH
+from model.compact import export_model
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter: import, load, classify one text, report
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+{load}
+model.predict_proba(["selling guns cheap"])
+seconds = time.perf_counter() - start
+# VmHWM, not ru_maxrss: that carries over the parent's peak across fork+exec on
+# Linux. Without /proc (macOS, Windows) fall back to ru_maxrss where it exists.
+try:
+    with open("/proc/self/status") as f:
+        peak = next(int(line.split()[1]) for line in f if line.startswith("VmHWM")) / 1024
+except (OSError, StopIteration):
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    except ImportError:
+        peak = None
+print(json.dumps({{"seconds": seconds, "rss_mb": peak, "sklearn": "sklearn" in sys.modules}}))
+"""
+LOADERS = {
+    "pickle": "import joblib\nmodel = joblib.load({path!r})",
+    "compact": "from model.compact import CompactClassifier\nmodel = CompactClassifier.load({path!r})",
+}
+
+
+def cold_start(kind, path, runs):
+    """Median of runs fresh-process loads (the first also warms the page cache)"""
+    code = COLD_START.format(load=LOADERS[kind].format(path=path))
+    results = []
+    for _ in range(runs + 1):
+        output = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=APP_DIR, check=True,
+                                capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    results = sorted(results[1:], key=lambda result: result["seconds"])
+    return results[len(results) // 2]
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, filename)) for filename in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=THREAT_MODEL_PATH, help="pickled TF-IDF + LogisticRegression pipeline")
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5, help="fresh-process loads per format")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    with tempfile.TemporaryDirectory() as directory:
+        compact = export_model(model, directory)
+        print(f"{args.model}: {len(compact.hashes)} terms, pickle {os.path.getsize(args.model) / 1024:.0f} KB, "
+              f"compact {directory_size(directory) / 1024:.0f} KB")
+
+        print(f"{'format':<8} {'cold start ms':>14} {'peak RSS MB':>12} {'docs/s':>9}  sklearn imported")
+        texts = build_corpus(args.docs)
+        for kind, path, classifier in (("pickle", args.model, model), ("compact", directory, compact)):
+            result = cold_start(kind, path, args.runs)
+            start = time.perf_counter()
+            classifier.predict_proba(texts)
+            rate = len(texts) / (time.perf_counter() - start)
+            rss = "n/a" if result["rss_mb"] is None else f"{result['rss_mb']:.1f}"
+            print(f"{kind:<8} {result['seconds'] * 1000:>14.1f} {rss:>12} {rate:>9.0f}  "
+                  f"{'yes' if result['sklearn'] else 'no'}")
+
+        difference = np.abs(model.predict_proba(texts) - compact.predict_proba(texts)).max()
+        agree = (model.predict(texts) == compact.predict(texts)).mean()
+        print(f"Max predict_proba difference over {len(texts)} documents: {difference:.2e}, "
+              f"labels agree on {agree:.2%}")
+
+
+if __name__ == "__main__":
+    main()
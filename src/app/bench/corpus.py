@@ -0,0 +1,181 @@
+"""Synthetic forum corpus built from the phobos_test templates, and a local
+HTTP server for it.
+
+Posts (user, age, text) are harvested from the template forum pages and
+reassembled into new threads of configurable size inside the original page
+chrome, so pages look like the real ones to the parser and scorer.
+
+    cd src/app && python -m bench.corpus --pages 10000 --thread-size 40 --serve --port 8081
+"""
+import argparse
+import glob
+import hashlib
+import html
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(APP_DIR)), "phobos_test", "templates")
+
+POST_RE = re.compile(
+    r'<div class="comment-user">(?:<a[^>]*>)?(.*?)(?:</a>)?</div>\s*'
+    r'<div class="comment-meta">(.*?)</div>\s*'
+    r'<div class="comment-text">(.*?)</div>', re.DOTALL)
+
+POST_HTML = """
+            <div class="comment-block">
+                <div class="comment">
+                    <div class="comment-user"><a href="{user}">{user}</a></div>
+                    <div class="comment-meta">{meta}</div>
+                    <div class="comment-text">{text}</div>
+                    <div class="comment-actions">
+                        <span>Reply</span> <span>Like</span>
+                    </div>
+                </div>
+            </div>"""
+
+
+def load_templates():
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(TEMPLATES_DIR, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def harvest_posts(templates=None):
+    """(user, meta, text) for every post in the template pages"""
+    templates = templates or load_templates()
+    posts = []
+    for page in templates.values():
+        for user, meta, text in POST_RE.findall(page):
+            posts.append((html.unescape(user.strip()), html.unescape(meta.strip()),
+                          html.unescape(" ".join(text.split()))))
+    return posts
+
+
+def thread_shells(templates=None):
+    """(head, tail) around the comment list of each forum template"""
+    templates = templates or load_templates()
+    shells = []
+    for page in templates.values():
+        start = page.find('<div class="comments">')
+        if start < 0:
+            continue
+        start += len('<div class="comments">')
+        # The comment list closes right before the container's closing tags
+        end = page.rfind("</div>", start, page.rfind("</body>"))
+        end = page.rfind("</div>", start, end)
+        shells.append((page[:start], page[end:]))
+    return shells
+
+
+def build_page(index, posts, shells, thread_size, rng):
+    head, tail = shells[index % len(shells)]
+    body = "".join(
+        POST_HTML.format(user=html.escape(user), meta=html.escape(meta), text=html.escape(text))
+        for user, meta, text in rng.choices(posts, k=thread_size))
+    head = head.replace("</h1>", f" #{index}</h1>", 1)
+    return head + body + "\n        " + tail
+
+
+def build_corpus(pages, thread_size=20, seed=42, jitter=0.5):
+    """{path: html} for pages threads of about thread_size posts (+/- jitter)"""
+    templates = load_templates()
+    posts = harvest_posts(templates)
+    shells = thread_shells(templates)
+    rng = random.Random(seed)
+    corpus = {}
+    for i in range(pages):
+        size = max(1, round(thread_size * rng.uniform(1 - jitter, 1 + jitter)))
+        corpus[f"/thread/{i}"] = build_page(i, posts, shells, size, rng)
+    return corpus
+
+
+class BenchHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connection bursts into 1 s SYN retries
+    request_queue_size = 1024
+
+
+class CorpusServer:
+    """Serves a corpus over keep-alive HTTP/1.1 with a fixed per-request latency"""
+
+    def __init__(self, corpus, latency=0.0, host="127.0.0.1", port=0):
+        self.corpus = {path: page.encode("utf-8") for path, page in corpus.items()}
+        self.latency = latency
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                body = server.corpus.get(self.path.split("?", 1)[0])
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = BenchHTTPServer((host, port), Handler)
+        self.base = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="corpus-server", daemon=True)
+        self._thread.start()
+
+    def urls(self):
+        return [self.base + path for path in self.corpus]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--thread-size", type=int, default=20, help="average posts per thread")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", type=float, default=0.0, help="server-side delay per request (s)")
+    parser.add_argument("--serve", action="store_true", help="serve the corpus until interrupted")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--urls", help="write the corpus URLs to this file (e.g. for the Go scraper)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.pages, args.thread_size, args.seed)
+    size_mb = sum(len(page) for page in corpus.values()) / (1024 * 1024)
+    print(f"{len(corpus)} pages, {size_mb:.1f} MB, {len(harvest_posts())} distinct posts")
+    if not args.serve:
+        return
+    server = CorpusServer(corpus, args.latency, port=args.port)
+    if args.urls:
+        with open(args.urls, "w", encoding="utf-8") as f:
+            f.write("".join(url + "\n" for url in server.urls()))
+    print(f"Serving on {server.base}/thread/0 .. /thread/{len(corpus) - 1}, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
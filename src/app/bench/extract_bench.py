@@ -0,0 +1,74 @@
+"""HTML-to-text throughput: serial html.parser (the old read.py path) vs the
+extraction pool.
+
+    cd src/app && python -m bench.extract_bench --pages 2000
+"""
+import argparse
+import glob
+import os
+import time
+
+from core import extraction
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(APP_DIR)), "phobos_test", "templates")
+
+# Markup the two parsers have disagreed on, checked on every run
+EDGE_CASES = [
+    "<html><body><p>x</p></body></html>\n<div>trailing post</div>",
+    "<p>x</p></html><p>y</p>",
+    "<p>a</p></HTML ><p>b</p></html><p>c</p>",
+    "<html><body>a</body></html><!-- c -->tail",
+    "<html><body><p>x</p></body>\n<div>after body</div></html>",
+]
+
+
+def build_corpus(pages, repeat):
+    """Template pages, each with its body repeated to simulate longer threads"""
+    templates = []
+    for path in sorted(glob.glob(os.path.join(TEMPLATES_DIR, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        head, sep, body = html.partition("<body>")
+        if sep:
+            body, _, tail = body.partition("</body>")
+            html = head + sep + body * repeat + "</body>" + tail
+        templates.append(html)
+    return [templates[i % len(templates)].replace("</h1>", f" #{i}</h1>", 1) for i in range(pages)]
+
+
+def timed(label, fn, corpus):
+    start = time.perf_counter()
+    texts = fn(corpus)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f} s  {len(corpus) / elapsed:10.1f} pages/s")
+    return texts, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5, help="body repetitions per page")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.pages, args.repeat)
+    size_mb = sum(len(html) for html in corpus) / (1024 * 1024)
+    print(f"{len(corpus)} pages, {size_mb:.1f} MB, backend={extraction.BACKEND}, cores={os.cpu_count()}")
+
+    # Start the pool outside the timed runs; the app keeps it for its lifetime
+    extraction.extract_batch(corpus[:2])
+
+    baseline, base_time = timed("serial html.parser", lambda c: [extraction.extract_text_bs4(h) for h in c], corpus)
+    timed(f"serial {extraction.BACKEND}", lambda c: [extraction.extract_text(h) for h in c], corpus)
+    pooled, pool_time = timed(f"pool {extraction.BACKEND}", extraction.extract_batch, corpus)
+
+    mismatches = sum(1 for a, b in zip(baseline, pooled) if a != b)
+    print(f"speedup: {base_time / pool_time:.1f}x, output mismatches vs html.parser: {mismatches}")
+    edge_mismatches = [html for html in EDGE_CASES if extraction.extract_text(html) != extraction.extract_text_bs4(html)]
+    print(f"edge-case mismatches: {len(edge_mismatches)} of {len(EDGE_CASES)}")
+    for html in edge_mismatches:
+        print(f"  {html!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Fetch throughput: the scraper subprocess path vs the in-process asyncio engine.
+
+Serves the phobos_test templates from a local keep-alive HTTP server (or use
+--base to point at a running phobos_test/main.py Flask server) and fetches
+--pages URLs both ways, directly and through phobos_test/socks_stub.py.
+
+    cd src/app && python -m bench.fetch_bench --pages 500 --latency 0.05
+    cd src/app && python -m bench.fetch_bench --scraper "go run main.go -serve"
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+from bench.corpus import BenchHTTPServer
+from core.fetcher import AsyncFetcher, FetchEngine
+from core.scraper_daemon import ScraperDaemon
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = os.path.join(os.path.dirname(os.path.dirname(APP_DIR)), "phobos_test")
+TEMPLATES_DIR = os.path.join(TEST_DIR, "templates")
+ROUTES = ["modern_india_2025", "operation_sindoor", "forum3", "forum4"]
+ONION = "qged2larle44sgm4wekwbiy3xinn6phwgkxq2tg4quzjivez7jboroqd.onion"
+
+
+def template_server(latency):
+    """Start a threaded HTTP/1.1 server for the templates; returns its base URL"""
+    sys.path.insert(0, TEST_DIR)
+    from stub_scraper import fetch_template
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            status, html = fetch_template(self.path.split("?", 1)[0])
+            body = html.encode("utf-8")
+            self.send_response(int(status.split()[0]))
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = BenchHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_socks(base):
+    parts = urlsplit(base)
+    port = free_port()
+    process = subprocess.Popen([sys.executable, os.path.join(TEST_DIR, "socks_stub.py"), "--port", str(port),
+                                "--target", f"{parts.hostname}:{parts.port or 80}"], stdout=subprocess.DEVNULL)
+    for _ in range(50):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return process, f"127.0.0.1:{port}"
+
+
+def timed(label, scrape, urls):
+    start = time.perf_counter()
+    ok = size = 0
+    for page in scrape(urls):
+        ok += str(page.get("status", "")).startswith("2")
+        size += len(page.get("html") or "")
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:7.2f} s  {len(urls) / elapsed:9.1f} pages/s  "
+          f"{size / elapsed / 1e6:6.1f} MB/s  ok={ok}/{len(urls)}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="server-side delay per request (s)")
+    parser.add_argument("--base", help="use this server instead of the built-in one")
+    parser.add_argument("--scraper", help="subprocess scraper command (default: phobos_test/stub_scraper.py --base)")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--per-host", type=int, default=16)
+    args = parser.parse_args()
+
+    base = args.base or template_server(args.latency)
+    paths = [f"/{ROUTES[i % len(ROUTES)]}?n={i}" for i in range(args.pages)]
+    direct_urls = [base + path for path in paths]
+    onion_urls = [f"http://{ONION}{path}" for path in paths]
+    print(f"{args.pages} pages from {base}, latency={args.latency}s")
+
+    command = args.scraper or [sys.executable, os.path.join(TEST_DIR, "stub_scraper.py"), "--base", base]
+    daemon = ScraperDaemon(command=command)
+    # Start the subprocess outside the timed run; the app keeps it resident
+    list(daemon.scrape(direct_urls[:1]))
+    base_time = timed("subprocess scraper", lambda urls: daemon.scrape(urls, timeout=3600), direct_urls)
+    daemon.close()
+
+    engine = FetchEngine(AsyncFetcher(proxy=None, max_connections=args.connections, per_host=args.per_host))
+    direct_time = timed("asyncio engine, direct", lambda urls: engine.scrape(urls, timeout=3600), direct_urls)
+    timed("asyncio engine, direct (warm pool)", lambda urls: engine.scrape(urls, timeout=3600), direct_urls)
+    engine.close()
+
+    socks, proxy = start_socks(base)
+    try:
+        engine = FetchEngine(AsyncFetcher(proxy=proxy, max_connections=args.connections, per_host=args.per_host))
+        timed("asyncio engine, via SOCKS5 stub", lambda urls: engine.scrape(urls, timeout=3600), onion_urls)
+        engine.close()
+    finally:
+        socks.terminate()
+
+    print(f"speedup (direct vs subprocess): {base_time / direct_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
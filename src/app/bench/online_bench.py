@@ -0,0 +1,100 @@
+"""Accuracy parity of the online hashing + SGD classifier against the batch
+TF-IDF + LogisticRegression pipeline, with training and update costs.
+
+Stratified k-fold over the labelled examples. Per fold both models are fit on
+the training part and scored on the held-out part, plus a "streamed" online
+model that starts from half the training part and gets the rest one label at
+a time through partial_fit, the way analyst labels arrive.
+
+    cd src/app && python -m bench.online_bench
+    cd src/app && python -m bench.online_bench --data model/labels.jsonl --folds 10
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold
+
+from model.model import build_pipeline
+from model.online import TRAIN_PATH, OnlineClassifier, load_examples
+
+MODELS = ["batch", "online", "streamed"]
+
+
+def run_fold(texts, labels, train, test):
+    train_texts = [texts[i] for i in train]
+    train_labels = [labels[i] for i in train]
+    test_texts = [texts[i] for i in test]
+    test_labels = [labels[i] for i in test]
+    results = {}
+    update_seconds = []
+    for name in MODELS:
+        start = time.perf_counter()
+        if name == "batch":
+            model = build_pipeline().fit(train_texts, train_labels)
+        elif name == "online":
+            model = OnlineClassifier().fit(train_texts, train_labels)
+        else:
+            half = len(train_texts) // 2
+            model = OnlineClassifier().fit(train_texts[:half], train_labels[:half])
+            for text, label in zip(train_texts[half:], train_labels[half:]):
+                began = time.perf_counter()
+                model.partial_fit([text], [label])
+                update_seconds.append(time.perf_counter() - began)
+        fit_seconds = time.perf_counter() - start
+        predicted = model.predict(test_texts)
+        results[name] = {
+            "accuracy": accuracy_score(test_labels, predicted),
+            "f1": f1_score(test_labels, predicted, average="macro"),
+            "fit_s": fit_seconds,
+        }
+    return results, update_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=TRAIN_PATH, help="train.json or a JSON Lines file of {text, label}")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="exit non-zero if online accuracy trails batch by more than this")
+    parser.add_argument("--output", help="write the report as JSON here")
+    args = parser.parse_args()
+
+    texts, labels = load_examples(args.data)
+    folds = StratifiedKFold(n_splits=args.folds, shuffle=True, random_state=args.seed)
+    per_fold = []
+    update_seconds = []
+    for train, test in folds.split(texts, labels):
+        results, updates = run_fold(texts, labels, train, test)
+        per_fold.append(results)
+        update_seconds.extend(updates)
+
+    summary = {name: {key: float(np.mean([fold[name][key] for fold in per_fold]))
+                      for key in ("accuracy", "f1", "fit_s")} for name in MODELS}
+    print(f"{len(texts)} examples, {args.folds}-fold cross-validation")
+    print(f"{'model':<10} {'accuracy':>9} {'macro F1':>9} {'fit ms':>9}")
+    for name in MODELS:
+        print(f"{name:<10} {summary[name]['accuracy']:>9.3f} {summary[name]['f1']:>9.3f} "
+              f"{summary[name]['fit_s'] * 1000:>9.1f}")
+    updates = sorted(update_seconds)
+    if updates:
+        print(f"partial_fit per label: p50 {updates[len(updates) // 2] * 1000:.2f} ms, "
+              f"max {updates[-1] * 1000:.2f} ms over {len(updates)} labels")
+    gap = summary["batch"]["accuracy"] - summary["online"]["accuracy"]
+    print(f"Online accuracy {'trails' if gap > 0 else 'matches or beats'} batch by {abs(gap):.3f}")
+
+    if args.output:
+        report = {"data": args.data, "examples": len(texts), "folds": args.folds, "summary": summary,
+                  "update_ms_p50": updates[len(updates) // 2] * 1000 if updates else None}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    if gap > args.tolerance:
+        raise SystemExit(f"Online model trails batch accuracy by more than {args.tolerance}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""End-to-end pipeline benchmark: fetch -> extract -> score, per stage and
+through MonitorWorker, on synthetic forum corpora served locally.
+
+Each (size, stage) runs in a fresh subprocess so peak memory is per stage.
+Results go to a JSON report; with --baseline the run is compared against an
+earlier report and exits non-zero on a regression beyond the thresholds.
+
+    cd src/app && python -m bench.pipeline_bench --sizes 100 1000 10000
+    cd src/app && python -m bench.pipeline_bench --baseline bench/reports/pipeline-<commit>.json
+
+Latency is per page: time on the wire for fetch, extraction time inside the
+pool worker for extract, keyword scoring plus its share of the classifier
+batch for score, and from the start of the page's request until its score
+is ready for e2e.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORTS_DIR = os.path.join(APP_DIR, "bench", "reports")
+STAGES = ["fetch", "extract", "score", "e2e"]
+
+
+def peak_rss_mb():
+    """Peak RSS of this process plus the summed peaks of the live extraction
+    workers, in MB. RUSAGE_CHILDREN only covers children that have exited and
+    been waited for, which the pool's workers haven't while the stage runs."""
+    if resource is None:
+        return None
+    from core.extraction import worker_rss_mb
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    workers = worker_rss_mb()
+    if workers is None:
+        # No /proc: the largest exited child is the best available
+        workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own + workers, 1)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def summarize(pages, elapsed, latencies):
+    return {
+        "pages": pages,
+        "seconds": round(elapsed, 4),
+        "pages_per_s": round(pages / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3) if latencies else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def isolate_stores(tmp_dir):
+    """Point the app's stores at a scratch directory so runs start cold"""
+    import core.fingerprints as fingerprints
+    import core.llm_service as llm_service
+    import core.store as store
+    import core.url_registry as url_registry
+    url_registry._registry = url_registry.UrlRegistry(os.path.join(tmp_dir, "urls.db"),
+                                                      os.path.join(tmp_dir, "url.txt"))
+    fingerprints._store = fingerprints.FingerprintStore(os.path.join(tmp_dir, "phobos.db"))
+    store._store = store.ResultStore(os.path.join(tmp_dir, "phobos.db"))
+    # The LLM stage is far slower than the rest and needs a model file; keep it out
+    llm_service._service = llm_service.LlmService("off")
+    return url_registry._registry
+
+
+def stage_fetch(corpus, args):
+    from bench.corpus import CorpusServer
+    from core.fetcher import AsyncFetcher, FetchEngine
+    server = CorpusServer(corpus, args.latency)
+    engine = FetchEngine(AsyncFetcher(proxy=None, max_connections=args.connections, per_host=args.per_host))
+    try:
+        latencies = []
+        start = time.perf_counter()
+        for page in engine.scrape(server.urls(), timeout=3600):
+            latencies.append(page.get("elapsed", 0.0))
+        return summarize(len(corpus), time.perf_counter() - start, latencies)
+    finally:
+        engine.close()
+        server.close()
+
+
+def stage_extract(corpus, args):
+    from config.app_config import EXTRACT_CHUNKSIZE
+    from core.extraction import extract_page_timed, get_pool
+    pages = list(corpus.values())
+    pool = get_pool()
+    # Start the workers outside the timed run; the app keeps them for its lifetime
+    list(pool.map(extract_page_timed, pages[:2]))
+    start = time.perf_counter()
+    latencies = [took for _, _, took in pool.map(extract_page_timed, pages, chunksize=EXTRACT_CHUNKSIZE)]
+    return summarize(len(pages), time.perf_counter() - start, latencies)
+
+
+def stage_score(corpus, args):
+    from core.extraction import extract_batch
+    from core.monitor import MonitorWorker
+    texts = extract_batch(list(corpus.values()))
+    worker = MonitorWorker()
+    worker.load_or_train_model()
+    worker.score_entry({"url": "warmup", "text": texts[0]})
+    latencies = []
+    scored = []
+    start = time.perf_counter()
+    for url, text in zip(corpus, texts):
+        began = time.perf_counter()
+        scored.append(worker.score_entry({"url": url, "text": text}))
+        latencies.append(time.perf_counter() - began)
+    began = time.perf_counter()
+    worker.classify_scored(scored)
+    share = (time.perf_counter() - began) / max(len(scored), 1)
+    return summarize(len(scored), time.perf_counter() - start, [took + share for took in latencies])
+
+
+def stage_e2e(corpus, args):
+    from bench.corpus import CorpusServer
+    import core.monitor as monitor
+    from core.extraction import extract_page_timed, get_pool
+    from core.fetcher import AsyncFetcher, FetchEngine
+
+    registry = isolate_stores(tempfile.mkdtemp(prefix="phobos-bench-"))
+    server = CorpusServer(corpus, args.latency)
+    urls = server.urls()
+    registry.bulk_import(urls)
+    engine = FetchEngine(AsyncFetcher(proxy=None, max_connections=args.connections, per_host=args.per_host))
+    requested = {}
+
+    class TimedSource:
+        def scrape(self, urls, **kwargs):
+            for page in engine.scrape(urls, timeout=3600, **kwargs):
+                requested[page["url"]] = time.perf_counter() - page.get("elapsed", 0.0)
+                yield page
+
+    scored_at = {}
+
+    class TimedWorker(monitor.MonitorWorker):
+        def score_page(self, store, url, text, page_posts):
+            result = super().score_page(store, url, text, page_posts)
+            scored_at[url] = time.perf_counter()
+            return result
+
+    monitor.get_page_source = TimedSource
+    worker = TimedWorker(urls)
+    worker.load_or_train_model()
+    list(get_pool().map(extract_page_timed, ["<p>warmup</p>"] * 2))
+    try:
+        start = time.perf_counter()
+        worker.run()
+        elapsed = time.perf_counter() - start
+    finally:
+        engine.close()
+        server.close()
+    latencies = [scored_at[url] - requested[url] for url in scored_at if url in requested]
+    return summarize(len(scored_at), elapsed, latencies)
+
+
+def run_stage(args):
+    """Child process: build the corpus, run one stage, print its JSON summary"""
+    from bench.corpus import build_corpus
+    corpus = build_corpus(args.run_stage_size, args.thread_size, args.seed)
+    result = globals()["stage_" + args.run_stage](corpus, args)
+    result["corpus_mb"] = round(sum(len(page) for page in corpus.values()) / (1024 * 1024), 2)
+    print("RESULT " + json.dumps(result))
+
+
+def spawn_stage(stage, size, args):
+    command = [sys.executable, "-m", "bench.pipeline_bench", "--run-stage", stage, "--run-stage-size", str(size),
+               "--thread-size", str(args.thread_size), "--seed", str(args.seed), "--latency", str(args.latency),
+               "--connections", str(args.connections), "--per-host", str(args.per_host)]
+    proc = subprocess.run(command, cwd=APP_DIR, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"{stage} x{size} failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+
+
+def median_result(results):
+    """Per-metric median over repeated runs of one stage"""
+    merged = dict(results[0])
+    for key, value in results[0].items():
+        if isinstance(value, (int, float)):
+            values = sorted(r[key] for r in results if r.get(key) is not None)
+            merged[key] = values[len(values) // 2] if values else None
+    merged["runs"] = len(results)
+    return merged
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report, baseline, tolerance, memory_tolerance):
+    """Regressions of report vs baseline as printable lines"""
+    regressions = []
+    for size, stages in report["results"].items():
+        for stage, current in stages.items():
+            previous = baseline.get("results", {}).get(size, {}).get(stage)
+            if not previous:
+                continue
+            checks = [
+                ("pages_per_s", -1, tolerance),
+                ("p99_ms", 1, tolerance),
+                ("peak_rss_mb", 1, memory_tolerance),
+            ]
+            for key, direction, limit in checks:
+                old, new = previous.get(key), current.get(key)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old * direction
+                if change > limit:
+                    regressions.append(f"{stage:<8} x{size:<6} {key:<12} {old:>10.2f} -> {new:<10.2f} "
+                                       f"({change * 100:+.0f}% worse, limit {limit * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--thread-size", type=int, default=20, help="average posts per thread")
+    parser.add_argument("--latency", type=float, default=0.01, help="server-side delay per request (s)")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--per-host", type=int, default=64, help="all corpus pages share one host")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the median of each metric is kept")
+    parser.add_argument("--output", help="report path (default bench/reports/pipeline-<commit>.json)")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed throughput drop / p99 rise as a fraction")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed peak memory rise")
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--run-stage-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage(args)
+        return
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {"thread_size": args.thread_size, "latency": args.latency, "connections": args.connections,
+                   "per_host": args.per_host, "seed": args.seed, "repeat": args.repeat},
+        "results": {},
+    }
+    print(f"{'stage':<8} {'pages':>7} {'MB':>7} {'pages/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+    for size in args.sizes:
+        for stage in args.stages:
+            result = median_result([spawn_stage(stage, size, args) for _ in range(args.repeat)])
+            report["results"].setdefault(str(size), {})[stage] = result
+            print(f"{stage:<8} {result['pages']:>7} {result['corpus_mb']:>7} {result['pages_per_s']:>10} "
+                  f"{result['p50_ms']:>9} {result['p99_ms']:>9} {result['peak_rss_mb']:>8}")
+
+    output = args.output or os.path.join(REPORTS_DIR, f"pipeline-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance, args.memory_tolerance)
+        if regressions:
+            print(f"Regressions vs {baseline.get('commit', args.baseline)}:")
+            print("\n".join("  " + line for line in regressions))
+            sys.exit(1)
+        print(f"No regressions vs {baseline.get('commit', args.baseline)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
+import os
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRAPER_DIR = os.path.join(os.path.dirname(APP_DIR), "scraper")
+
 TIMER_INTERVALS = [
     ("10 seconds", 10),
     ("30 seconds", 30),
@@ -9,6 +14,171 @@ TIMER_INTERVALS = [
 
 DEFAULT_INTERVAL = 10
 
+# Per-URL revisit scheduler: the interval chosen above is the base revisit
+# interval; pages that change often or score high are revisited sooner (down to
+# the minimum), static or failing ones back off (up to the maximum). Fetches are
+# capped at SCHEDULE_FETCH_RATE per second with bursts of up to SCHEDULE_BURST.
+SCHEDULE_MIN_INTERVAL = 10
+SCHEDULE_MAX_INTERVAL = 6 * 3600
+SCHEDULE_FETCH_RATE = 5
+SCHEDULE_BURST = 50
+SCHEDULE_TICK_MS = 1000
+
+# Seconds between checks of model artifacts for hot-reload (0 disables)
+MODEL_RELOAD_INTERVAL = 5
+
+# Resident scraper started once per process (run from src/scraper). Build the
+# binary with `go build -o phobos-scraper main.go` to skip the compile step, or
+# point PHOBOS_SCRAPER at phobos_test/stub_scraper.py for offline testing.
+SCRAPER_COMMAND = ["go", "run", "main.go", "-serve"]
+SCRAPER_TIMEOUT = 60
+
+# Which fetcher MonitorWorker uses: "asyncio" (core/fetcher.py, in-process) or
+# "daemon" (the Go scraper above). PHOBOS_FETCH_ENGINE overrides it.
+FETCH_ENGINE = "asyncio"
+# In-process fetcher: SOCKS5 upstream ("" for direct connections; overridden by
+# PHOBOS_SOCKS_PROXY), concurrency limits, per-page body cap and timeouts (s)
+FETCH_SOCKS_PROXY = "127.0.0.1:9050"
+FETCH_MAX_CONNECTIONS = 64
+FETCH_PER_HOST = 4
+FETCH_MAX_BYTES = 10 * 1024 * 1024
+FETCH_TIMEOUT = 60
+FETCH_IDLE_TIMEOUT = 60
+FETCH_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; rv:128.0) Gecko/20100101 Firefox/128.0"
+
+# read.py --stream: read size in characters and default memory ceiling in MB
+# for the main process and extraction workers together (None = no ceiling). The
+# ceiling is split evenly between them as address-space limits (RLIMIT_AS, not on
+# Windows), with fewer workers if each would get under READ_MIN_PROCESS_MB.
+READ_CHUNK_SIZE = 64 * 1024
+READ_MAX_RSS_MB = None
+READ_MIN_PROCESS_MB = 256
+READ_STREAM_BATCH = 64
+
+# HTML-to-text process pool (None = one worker per core) and pages per task
+EXTRACT_WORKERS = None
+EXTRACT_CHUNKSIZE = 8
+
+# Weighted keyword lexicon used by the keyword scorer, hot-reloaded on change
+LEXICON_PATH = os.path.join(APP_DIR, "config", "lexicon.json")
+
+# Classifier confidence at which a page with no keyword hits is still flagged
+CLASSIFIER_THRESHOLD = 0.7
+
+# Batch classifier artifact served to the monitor and written by model/search.py.
+# The search cross-validates every SEARCH_GRID combination over SEARCH_FOLDS
+# stratified folds on SEARCH_JOBS cores (-1 = all) and keeps the best by macro
+# F1. Fitted TF-IDF steps are cached in SEARCH_CACHE_DIR per fold and vectorizer
+# setting, so sweeps over classifier__ params never re-tokenize; the cache is
+# trimmed to SEARCH_CACHE_MAX_BYTES after each run.
+THREAT_MODEL_PATH = os.path.join(APP_DIR, "threat_classifier.pkl")
+SEARCH_CACHE_DIR = os.path.join(APP_DIR, "model", "search_cache")
+SEARCH_CACHE_MAX_BYTES = 1024 ** 3
+SEARCH_JOBS = -1
+SEARCH_FOLDS = 5
+SEARCH_GRID = {
+    "tfidf__max_features": [2000, 5000, 20000],
+    "tfidf__ngram_range": [(1, 1), (1, 2), (1, 3)],
+    "tfidf__sublinear_tf": [False, True],
+    "classifier__C": [0.3, 1, 3, 10],
+}
+
+# Memory-mapped NumPy export of the batch model (model/compact.py), served when
+# CLASSIFIER_BACKEND is "compact"
+COMPACT_MODEL_DIR = os.path.join(APP_DIR, "threat_classifier.compact")
+
+# Classifier served to the monitor: "batch" is the TF-IDF + LogisticRegression
+# pipeline retrained from train.json, "compact" its NumPy export above, "online"
+# the hashing + SGD model in model/online.py that analyst labels are folded into
+# one at a time (PHOBOS_CLASSIFIER overrides). Labels are journaled to
+# ONLINE_LABELS_PATH and the online model is checkpointed to ONLINE_MODEL_PATH
+# every ONLINE_CHECKPOINT_EVERY labels or ONLINE_CHECKPOINT_SECONDS, whichever
+# comes first; the registry hot-reloads the checkpoint and labels since the last
+# one are replayed from the journal on startup. alpha trades how far one label
+# moves the model against stability (averaged SGD barely moves at all after
+# the initial fit); 2^18 hash buckets keep an update at a few ms, since its cost
+# grows with the weight vector, not the text.
+CLASSIFIER_BACKEND = "batch"
+ONLINE_MODEL_PATH = os.path.join(APP_DIR, "online_classifier.pkl")
+ONLINE_LABELS_PATH = os.path.join(APP_DIR, "model", "labels.jsonl")
+ONLINE_MODEL = {"n_features": 2 ** 18, "ngram_range": (1, 3), "alpha": 3e-4, "average": False, "epochs": 20}
+ONLINE_CHECKPOINT_EVERY = 20
+ONLINE_CHECKPOINT_SECONDS = 60
+
+# Resident LLM report service (core/llm_service.py): "llama_cpp" loads the GGUF
+# model once per process, "stub" writes a canned keyword-based report (no model
+# needed), "off" disables it; PHOBOS_LLM_BACKEND overrides. Reports are
+# memoized in LLM_REPORTS_PATH by content hash. LLM_SECONDS_ESTIMATE is the
+# assumed cost of one report until the service has timed some of its own.
+LLM_BACKEND = "llama_cpp"
+LLM_MODEL_PATH = os.path.join(APP_DIR, "model", "mistral-7b-instruct-v0.2.Q2_K.gguf")
+LLM_PARAMS = {"n_ctx": 1024, "n_threads": 8, "n_batch": 128, "use_mmap": True, "use_mlock": False}
+LLM_GENERATION = {"max_tokens": 150, "temperature": 0.3, "top_p": 0.95, "repeat_penalty": 1.1}
+LLM_REPORTS_PATH = os.path.join(APP_DIR, "llm_reports.db")
+LLM_SECONDS_ESTIMATE = 15
+
+# Long pages are split into overlapping windows (core/chunking.py) sized to
+# fit LLM_PARAMS["n_ctx"] next to the prompt, the reply and CHUNK_RESERVED_TOKENS
+# of slack, at CHUNK_CHARS_PER_TOKEN. Every window is classified, in batches
+# of CHUNK_BATCH_SIZE, and the page takes the max ("max") or the mean of the top
+# CHUNK_TOP_K ("topk") window probabilities. Only the CHUNK_TOP_K hottest
+# windows of an escalated page go to the LLM. Pages that would need more than
+# CHUNK_MAX_WINDOWS windows get wider ones instead, so cost per page is bounded.
+CHUNK_CHARS_PER_TOKEN = 3
+CHUNK_RESERVED_TOKENS = 64
+CHUNK_OVERLAP = 0.15
+CHUNK_AGGREGATE = "max"
+CHUNK_TOP_K = 3
+CHUNK_BATCH_SIZE = 256
+CHUNK_MAX_WINDOWS = 200
+
+# Triage cascade (core/triage.py): every page gets the keyword score and the
+# classifier; only pages with a keyword score >= TRIAGE_KEYWORD_THRESHOLD, or
+# labelled suspicious with confidence >= TRIAGE_CLASSIFIER_THRESHOLD, go on to
+# the LLM, highest priority first (keyword score + TRIAGE_CLASSIFIER_WEIGHT x
+# suspicious confidence). New LLM work is capped so the report queue never
+# holds more than TRIAGE_LLM_SECONDS of estimated work or TRIAGE_LLM_TOKENS
+# prompt+reply tokens (None = no cap).
+TRIAGE_KEYWORD_THRESHOLD = 3
+TRIAGE_CLASSIFIER_THRESHOLD = 0.8
+TRIAGE_CLASSIFIER_WEIGHT = 5
+TRIAGE_LLM_SECONDS = 300
+TRIAGE_LLM_TOKENS = None
+
+# SQLite (WAL) history of runs, pages, extracted texts and scores. Only the last
+# RESULTS_KEEP_RUNS runs are kept (None keeps everything), pruned every
+# RESULTS_PRUNE_EVERY runs; each distinct text is stored once. The per-URL
+# HTML/text hashes used to skip unchanged pages live in the same database.
+RESULTS_DB_PATH = os.path.join(APP_DIR, "phobos.db")
+RESULTS_KEEP_RUNS = 500
+RESULTS_PRUNE_EVERY = 50
+
+# System log: lines kept in memory/on screen, UI refresh period and the
+# rotating JSON Lines file it is mirrored to
+LOG_BUFFER_SIZE = 5000
+LOG_FLUSH_MS = 250
+LOG_FILE_PATH = os.path.join(APP_DIR, "phobos_system.jsonl")
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Per-stage timings and page/byte/error counters (core/metrics.py). Disabled,
+# every span and counter is a no-op; PHOBOS_METRICS=0/1 overrides. The
+# Prometheus text exposition is rewritten to METRICS_FILE_PATH after each cycle
+# (for node_exporter's textfile collector) and served on METRICS_PORT when set
+# (None = no endpoint; PHOBOS_METRICS_PORT overrides). The Stats tab refreshes
+# every METRICS_REFRESH_MS while visible.
+METRICS_ENABLED = True
+METRICS_FILE_PATH = os.path.join(APP_DIR, "phobos_metrics.prom")
+METRICS_PORT = None
+METRICS_REFRESH_MS = 1000
+
+# Monitored URL registry; url.txt is regenerated from it for the Go scraper.
+# Removals rewrite url.txt at most once per URL_EXPORT_DELAY seconds, so
+# removing many URLs one by one doesn't rewrite and fsync it for each.
+URL_DB_PATH = os.path.join(SCRAPER_DIR, "urls.db")
+URL_FILE_PATH = os.path.join(SCRAPER_DIR, "url.txt")
+URL_EXPORT_DELAY = 1.0
+
 COLORS = {
     'bg_primary': '#2b2b2b',
     'bg_secondary': '#3c3c3c', 
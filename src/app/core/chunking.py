@@ -0,0 +1,65 @@
+import math
+
+
+def window_chars(n_ctx, reserved_tokens, chars_per_token):
+    """Characters of page text that fit in n_ctx next to reserved_tokens of prompt and reply"""
+    return max(256, int((n_ctx - reserved_tokens) * chars_per_token))
+
+
+def windows(text, size, overlap=0.15, max_windows=None):
+    """(start, end) offsets of overlapping windows covering all of text.
+
+    Windows are size characters long and overlap by a fraction of that, so a
+    post cut at one window's edge is whole in the next. Edges are moved back
+    to the nearest whitespace when there is one close by. When covering the
+    text would take more than max_windows, the windows are widened instead so
+    the count (and cost) per page stays bounded while coverage stays complete.
+    """
+    length = len(text)
+    if length <= size:
+        return [(0, length)]
+    step = max(1, int(size * (1 - overlap)))
+    if max_windows and math.ceil((length - size) / step) + 1 > max_windows:
+        # Solve for the size whose windows (same overlap fraction) cover it in max_windows
+        size = math.ceil(length / (1 + (max_windows - 1) * (1 - overlap)))
+        step = max(1, int(size * (1 - overlap)))
+    spans = []
+    start = 0
+    while True:
+        end = min(length, start + size)
+        if end < length:
+            cut = text.rfind(" ", start + step, end)
+            cut = max(cut, text.rfind("\n", start + step, end))
+            if cut > start:
+                end = cut
+        spans.append((start, end))
+        if end >= length:
+            return spans
+        next_start = end - (size - step)
+        # Start the next window on a word boundary too
+        space = text.find(" ", next_start, end)
+        start = space + 1 if 0 <= space < end - 1 else next_start
+        start = max(start, spans[-1][0] + 1)
+
+
+def aggregate(values, mode="max", k=3):
+    """Page-level value from per-window ones: the max, or the mean of the top k"""
+    if not values:
+        return 0.0
+    if mode == "topk":
+        top = sorted(values, reverse=True)[:k]
+        return sum(top) / len(top)
+    return max(values)
+
+
+def focus(text, start, end, offsets, size):
+    """At most size characters of text[start:end], centred on its keyword matches.
+
+    Used when a window was widened past what the LLM context holds.
+    """
+    if end - start <= size:
+        return text[start:end]
+    inside = [offset for offset in offsets if start <= offset < end]
+    centre = sorted(inside)[len(inside) // 2] if inside else start + size // 2
+    left = min(max(start, centre - size // 2), end - size)
+    return text[left:left + size]
@@ -0,0 +1,214 @@
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    from lxml import etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+from config.app_config import EXTRACT_CHUNKSIZE, EXTRACT_WORKERS
+from core import posts
+
+SEPARATOR = "\n\n"
+
+# Strings BeautifulSoup keeps out of get_text(): its html builders store text
+# inside these elements as Script/Stylesheet/TemplateString/Ruby* strings
+SKIPPED_TAGS = {"script", "style", "template", "rt", "rp"}
+
+# libxml2 stops reading at </html>, html.parser keeps going; dropping the end
+# tags keeps text after it (posts appended past the end of a template)
+HTML_END_RE = re.compile(r"</html\s*>", re.IGNORECASE)
+HTML_END_BYTES_RE = re.compile(rb"</html\s*>", re.IGNORECASE)
+
+
+def extract_text_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.get_text(separator=SEPARATOR, strip=True)
+
+
+def walk_text(root, collector=None):
+    """(parts, spans) for a parsed document: the text pieces extract_text joins,
+    and for each element the collector asks for the [first, last) range of
+    parts inside it"""
+    parts = []
+    spans = {}
+    skip_depth = 0
+    for event, el in etree.iterwalk(root, events=("start", "end", "comment", "pi")):
+        if event == "start":
+            if collector is not None:
+                classes = el.get("class")
+                if classes and collector.start(el, classes):
+                    spans[el] = [len(parts), len(parts)]
+            if el.tag.lower() in SKIPPED_TAGS:
+                skip_depth += 1
+            if not skip_depth and el.text:
+                text = el.text.strip()
+                if text:
+                    parts.append(text)
+            continue
+        if event == "end":
+            if el.tag.lower() in SKIPPED_TAGS:
+                skip_depth -= 1
+            if collector is not None:
+                if el in collector.containers:
+                    collector.end(el)
+                if el in spans:
+                    spans[el][1] = len(parts)
+        # Comments and PIs only report one event; their own text is never kept
+        if not skip_depth and el.tail:
+            text = el.tail.strip()
+            if text:
+                parts.append(text)
+    return parts, spans
+
+
+def parse_html(html):
+    if isinstance(html, bytes):
+        html = HTML_END_BYTES_RE.sub(b"", html)
+    else:
+        html = HTML_END_RE.sub("", html)
+    try:
+        return lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        # Empty documents, or str input carrying an encoding declaration
+        return None
+
+
+def extract_text_lxml(html):
+    """lxml equivalent of extract_text_bs4, several times faster on large pages"""
+    root = parse_html(html)
+    if root is None:
+        return extract_text_bs4(html)
+    parts, _ = walk_text(root)
+    return SEPARATOR.join(parts)
+
+
+def extract_page_lxml(html):
+    """(text, posts): extract_text plus the thread's posts as body offsets into the text"""
+    root = parse_html(html)
+    if root is None:
+        return extract_page_bs4(html)
+    collector = posts.PostCollector()
+    parts, spans = walk_text(root, collector)
+    offsets = []
+    offset = 0
+    for part in parts:
+        offsets.append(offset)
+        offset += len(part) + len(SEPARATOR)
+    text = SEPARATOR.join(parts)
+    page_posts = []
+    for author, time_text, body in collector.posts():
+        first, last = spans.get(body, (0, 0))
+        if first < last:
+            page_posts.append({"author": author, "time": time_text, "start": offsets[first],
+                               "end": offsets[last - 1] + len(parts[last - 1])})
+    return text, page_posts or posts.segment_text(text, SEPARATOR)
+
+
+def extract_page_bs4(html):
+    text = extract_text_bs4(html)
+    return text, posts.segment_text(text, SEPARATOR)
+
+
+BACKEND = "lxml" if lxml is not None else "html.parser"
+extract_text = extract_text_lxml if lxml is not None else extract_text_bs4
+extract_page = extract_page_lxml if lxml is not None else extract_page_bs4
+
+
+def extract_page_timed(html):
+    """(text, posts, seconds spent extracting), so the parse stage can be timed inside the worker"""
+    start = time.perf_counter()
+    text, page_posts = extract_page(html)
+    return text, page_posts, time.perf_counter() - start
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def limit_memory(mb):
+    """Cap this process's address space, and with it its RSS, at mb MB.
+
+    Allocations past the cap raise MemoryError. Returns False where the
+    platform has no resource module (Windows).
+    """
+    if resource is None:
+        return False
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = int(mb * 1024 * 1024)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    return True
+
+
+def get_pool(workers=EXTRACT_WORKERS, memory_mb=None):
+    """Shared extraction pool, started on first use and kept for the process lifetime.
+
+    workers and memory_mb (each worker's limit_memory cap, None for none)
+    only apply to the call that starts the pool.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: the GUI process has Qt and worker threads running
+                _pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=limit_memory if memory_mb else None,
+                    initargs=(memory_mb,) if memory_mb else (),
+                )
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def worker_rss_mb(field="VmHWM"):
+    """Total of a /proc status field (VmHWM: peak RSS, VmRSS: current) over the
+    pool's worker processes in MB; 0 before the pool starts, None off Linux"""
+    if not os.path.isdir("/proc"):
+        return None
+    if _pool is None:
+        return 0.0
+    total = 0
+    for pid in list(_pool._processes or {}):
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                total += next((int(line.split()[1]) for line in f if line.startswith(field + ":")), 0)
+        except OSError:
+            # Worker exited between listing and reading
+            continue
+    return total / 1024
+
+
+def submit_page_timed(html):
+    return get_pool().submit(extract_page_timed, html)
+
+
+def extract_batch(htmls, chunksize=EXTRACT_CHUNKSIZE):
+    """Extract text from many documents across all cores, preserving order"""
+    htmls = list(htmls)
+    if len(htmls) <= 1:
+        return [extract_text(html) for html in htmls]
+    return list(get_pool().map(extract_text, htmls, chunksize=chunksize))
+
+
+def extract_page_batch(htmls, chunksize=EXTRACT_CHUNKSIZE):
+    """(text, posts) for many documents across all cores, preserving order"""
+    htmls = list(htmls)
+    if len(htmls) <= 1:
+        return [extract_page(html) for html in htmls]
+    return list(get_pool().map(extract_page, htmls, chunksize=chunksize))
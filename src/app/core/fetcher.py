@@ -0,0 +1,429 @@
+import asyncio
+import ipaddress
+import os
+import queue
+import re
+import ssl
+import struct
+import threading
+import time
+import zlib
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from config.app_config import (FETCH_SOCKS_PROXY, FETCH_MAX_CONNECTIONS, FETCH_PER_HOST, FETCH_MAX_BYTES,
+                               FETCH_TIMEOUT, FETCH_IDLE_TIMEOUT, FETCH_USER_AGENT, SCRAPER_TIMEOUT)
+from core.url_registry import get_url_registry
+
+MAX_REDIRECTS = 5
+MAX_HEADER_BYTES = 64 * 1024
+LINK_RE = re.compile(r"""<a\s[^>]*?href\s*=\s*["']?(http[^"'\s>]+)""", re.IGNORECASE)
+CHARSET_RE = re.compile(r"charset=([\w.:-]+)", re.IGNORECASE)
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+_DONE = object()
+
+
+class FetchError(Exception):
+    pass
+
+
+class BodyTooLarge(FetchError):
+    pass
+
+
+def decode_body(body, encoding, max_body):
+    """Undo Content-Encoding, refusing to inflate past max_body bytes"""
+    encoding = encoding.strip().lower()
+    if not body or encoding in ("", "identity"):
+        return body
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        # wbits 47 auto-detects gzip/zlib headers; some servers send raw deflate
+        try:
+            decoder = zlib.decompressobj(47)
+            data = decoder.decompress(body, max_body + 1)
+        except zlib.error:
+            decoder = zlib.decompressobj(-15)
+            data = decoder.decompress(body, max_body + 1)
+        if len(data) > max_body or decoder.unconsumed_tail:
+            raise BodyTooLarge(f"decoded body exceeds {max_body} bytes")
+        return data
+    if encoding == "br" and brotli is not None:
+        data = brotli.decompress(body)
+        if len(data) > max_body:
+            raise BodyTooLarge(f"decoded body exceeds {max_body} bytes")
+        return data
+    raise FetchError(f"unsupported content encoding: {encoding}")
+
+
+def parse_proxy(value):
+    """"host:port" or "socks5h://host:port" -> (host, port); empty/None -> None"""
+    if not value:
+        return None
+    if "://" in value:
+        value = value.split("://", 1)[1]
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+async def socks5_connect(reader, writer, host, port):
+    """SOCKS5 CONNECT without auth; the proxy resolves the name, so .onion works"""
+    writer.write(b"\x05\x01\x00")
+    await writer.drain()
+    version, method = await reader.readexactly(2)
+    if version != 5 or method != 0:
+        raise FetchError("SOCKS5 proxy refused no-auth login")
+    try:
+        ip = ipaddress.ip_address(host)
+        address = (b"\x01" if ip.version == 4 else b"\x04") + ip.packed
+    except ValueError:
+        name = host.encode("idna")
+        address = b"\x03" + bytes([len(name)]) + name
+    writer.write(b"\x05\x01\x00" + address + struct.pack(">H", port))
+    await writer.drain()
+    version, reply, _, kind = await reader.readexactly(4)
+    if version != 5 or reply != 0:
+        raise FetchError(f"SOCKS5 connect to {host}:{port} failed (reply {reply})")
+    # Skip the bound address the proxy reports back
+    if kind == 1:
+        await reader.readexactly(4 + 2)
+    elif kind == 4:
+        await reader.readexactly(16 + 2)
+    else:
+        length = (await reader.readexactly(1))[0]
+        await reader.readexactly(length + 2)
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = time.monotonic()
+
+    def usable(self, idle_timeout):
+        return (not self.reader.at_eof() and not self.writer.is_closing()
+                and time.monotonic() - self.idle_since < idle_timeout)
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncFetcher:
+    """Minimal asyncio HTTP/1.1 client for crawling.
+
+    Connections are kept alive and pooled per (scheme, host, port). At most
+    max_connections requests run at once overall and per_host per host. With a
+    SOCKS5 proxy every connection is tunnelled through it (Tor). Bodies are
+    read incrementally and abandoned once they pass max_body bytes.
+    """
+
+    def __init__(self, proxy=FETCH_SOCKS_PROXY, max_connections=FETCH_MAX_CONNECTIONS, per_host=FETCH_PER_HOST,
+                 max_body=FETCH_MAX_BYTES, timeout=FETCH_TIMEOUT, idle_timeout=FETCH_IDLE_TIMEOUT):
+        self.proxy = parse_proxy(proxy)
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.max_body = max_body
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._idle_count = 0
+        self._global = None
+        self._hosts = {}
+        self._ssl = ssl.create_default_context()
+
+    def _limits(self, key):
+        # Created lazily so they bind to the loop the fetcher runs on
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_connections)
+        if key not in self._hosts:
+            self._hosts[key] = asyncio.Semaphore(self.per_host)
+        return self._global, self._hosts[key]
+
+    async def _open(self, scheme, host, port):
+        if self.proxy:
+            reader, writer = await asyncio.open_connection(*self.proxy)
+            try:
+                await socks5_connect(reader, writer, host, port)
+                if scheme == "https":
+                    await writer.start_tls(self._ssl, server_hostname=host)
+            except BaseException:
+                writer.close()
+                raise
+        elif scheme == "https":
+            reader, writer = await asyncio.open_connection(host, port, ssl=self._ssl, server_hostname=host)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return _Connection(reader, writer)
+
+    def _take_idle(self, key):
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            self._idle_count -= 1
+            if not idle:
+                del self._idle[key]
+            if conn.usable(self.idle_timeout):
+                return conn
+            conn.close()
+        return None
+
+    def _put_idle(self, key, conn):
+        # Crawls touch many hosts once; don't hold more idle sockets than the
+        # number of requests allowed in flight
+        if self._idle_count >= self.max_connections:
+            conn.close()
+            return
+        conn.idle_since = time.monotonic()
+        self._idle.setdefault(key, []).append(conn)
+        self._idle_count += 1
+
+    async def _read_head(self, reader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        if len(head) > MAX_HEADER_BYTES:
+            raise FetchError("response headers too large")
+        lines = head.decode("iso-8859-1").split("\r\n")
+        parts = lines[0].split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise FetchError(f"bad status line: {lines[0]!r}")
+        status = int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ""
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                name = name.strip().lower()
+                value = value.strip()
+                headers[name] = f"{headers[name]}, {value}" if name in headers else value
+        return parts[0], status, reason, headers, len(head)
+
+    async def _read_body(self, reader, status, headers, method):
+        """Returns (body, reusable)"""
+        chunks = []
+        size = 0
+
+        def add(chunk):
+            nonlocal size
+            size += len(chunk)
+            if size > self.max_body:
+                raise BodyTooLarge(f"body exceeds {self.max_body} bytes")
+            chunks.append(chunk)
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            return b"", True
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                line = await reader.readuntil(b"\r\n")
+                length = int(line.split(b";", 1)[0].strip() or b"0", 16)
+                if length == 0:
+                    # Trailers, then the blank line that ends the message
+                    while (await reader.readuntil(b"\r\n")) != b"\r\n":
+                        pass
+                    break
+                if size + length > self.max_body:
+                    raise BodyTooLarge(f"body exceeds {self.max_body} bytes")
+                add(await reader.readexactly(length))
+                await reader.readexactly(2)
+            return b"".join(chunks), True
+        if "content-length" in headers:
+            remaining = int(headers["content-length"])
+            if remaining > self.max_body:
+                raise BodyTooLarge(f"body exceeds {self.max_body} bytes")
+            while remaining:
+                chunk = await reader.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    raise FetchError("connection closed mid-body")
+                remaining -= len(chunk)
+                add(chunk)
+            return b"".join(chunks), True
+        # No length: the body runs until the server closes the connection
+        while True:
+            chunk = await reader.read(64 * 1024)
+            if not chunk:
+                return b"".join(chunks), False
+            add(chunk)
+
+    async def _request(self, method, url, headers, timeout=None):
+        """(status, reason, headers, body, bytes, seconds); timeout covers only the time on the wire"""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise FetchError(f"unsupported URL: {url}")
+        host = parts.hostname
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        host_header = host if parts.port is None else f"{host}:{port}"
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host_header}", f"User-Agent: {FETCH_USER_AGENT}",
+                 "Accept: text/html,*/*", f"Accept-Encoding: {ACCEPT_ENCODING}", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("iso-8859-1")
+
+        global_limit, host_limit = self._limits(key)
+        # Per-host slot first: waiting on a busy host must not hold a global slot
+        async with host_limit, global_limit:
+            # The timeout starts once the slots are held: queueing for a busy host isn't the page's fault
+            started = time.monotonic()
+            async with asyncio.timeout(timeout):
+                for attempt in range(2):
+                    conn = self._take_idle(key)
+                    reused = conn is not None
+                    if conn is None:
+                        conn = await self._open(scheme, host, port)
+                    try:
+                        conn.writer.write(request)
+                        await conn.writer.drain()
+                        version, status, reason, response_headers, head_size = await self._read_head(conn.reader)
+                        body, reusable = await self._read_body(conn.reader, status, response_headers, method)
+                    except (asyncio.IncompleteReadError, ConnectionError) as e:
+                        conn.close()
+                        # A pooled connection the server already dropped; retry once on a fresh one
+                        if reused and attempt == 0:
+                            continue
+                        raise FetchError(str(e) or type(e).__name__)
+                    except BaseException:
+                        conn.close()
+                        raise
+                    if (reusable and version == "HTTP/1.1"
+                            and response_headers.get("connection", "").lower() != "close"):
+                        self._put_idle(key, conn)
+                    else:
+                        conn.close()
+                    return (status, reason, response_headers, body, head_size + len(body),
+                            time.monotonic() - started)
+
+    async def fetch(self, url, headers=None):
+        """Page dict in the scraper's format: {url, status, links, html, headers, bytes, elapsed}.
+
+        bytes counts what came over the wire (headers plus still-compressed
+        body); elapsed is the time spent on the wire, excluding waits for a
+        free connection slot, and the timeout applies to it alone (redirects
+        included), so pages queued behind a busy host don't time out. Conditional
+        headers go to url only, not to redirect targets; a 304 answer comes back
+        with empty html.
+        Errors are reported in status ("Error: ...") rather than raised, as
+        the Go scraper does.
+        """
+        target = url
+        received = 0
+        elapsed = 0.0
+        try:
+            for hop in range(MAX_REDIRECTS + 1):
+                # Validators belong to the requested URL, not to wherever it redirects;
+                # redirects share one timeout, counted on the wire only
+                status, reason, response_headers, body, size, took = await self._request(
+                    "GET", target, headers if hop == 0 else None, max(0.0, self.timeout - elapsed))
+                received += size
+                elapsed += took
+                if status in (301, 302, 303, 307, 308) and "location" in response_headers:
+                    target = urljoin(target, response_headers["location"])
+                    continue
+                break
+            else:
+                raise FetchError("too many redirects")
+            body = decode_body(body, response_headers.get("content-encoding", ""), self.max_body)
+        except TimeoutError:
+            return {"url": url, "status": f"Error: timed out after {self.timeout}s", "links": [], "html": "",
+                    "bytes": received}
+        except Exception as e:
+            return {"url": url, "status": f"Error: {e or type(e).__name__}", "links": [], "html": "",
+                    "bytes": received}
+        match = CHARSET_RE.search(response_headers.get("content-type", ""))
+        try:
+            html = body.decode(match.group(1) if match else "utf-8", "replace")
+        except LookupError:
+            html = body.decode("utf-8", "replace")
+        return {"url": url, "status": f"{status} {reason}".strip(), "links": LINK_RE.findall(html),
+                "html": html, "headers": response_headers, "bytes": received, "elapsed": elapsed}
+
+    async def fetch_many(self, urls, headers_for=None):
+        """Yield page dicts in completion order"""
+        tasks = [asyncio.ensure_future(self.fetch(url, headers_for(url) if headers_for else None))
+                 for url in urls]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def close(self):
+        for idle in self._idle.values():
+            for conn in idle:
+                conn.close()
+        self._idle.clear()
+        self._idle_count = 0
+
+
+class FetchEngine:
+    """Runs an AsyncFetcher on a private event loop thread.
+
+    Offers the same scrape(urls) generator as ScraperDaemon, so MonitorWorker
+    can use either. The loop (and with it the connection pool) lives as long
+    as the engine, so keep-alive connections carry over between cycles.
+    """
+
+    def __init__(self, fetcher=None):
+        self.fetcher = fetcher or AsyncFetcher()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="fetch-engine", daemon=True)
+        self._thread.start()
+
+    def scrape(self, urls=None, timeout=SCRAPER_TIMEOUT, headers_for=None):
+        """Yield page dicts as they complete; urls=None means every registered URL"""
+        if urls is None:
+            urls = get_url_registry().urls()
+        urls = list(urls)
+        if not urls:
+            return
+        pages = queue.Queue()
+
+        async def produce():
+            try:
+                async for page in self.fetcher.fetch_many(urls, headers_for):
+                    pages.put(page)
+            except BaseException as e:
+                pages.put(e)
+                raise
+            finally:
+                pages.put(_DONE)
+
+        future = asyncio.run_coroutine_threadsafe(produce(), self.loop)
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                try:
+                    item = pages.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    raise TimeoutError(f"Fetch timed out after {timeout}s")
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Stopped early (timeout or caller broke off): drop the rest
+            future.cancel()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.fetcher.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_fetch_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                proxy = os.environ.get("PHOBOS_SOCKS_PROXY", FETCH_SOCKS_PROXY)
+                _engine = FetchEngine(AsyncFetcher(proxy=proxy))
+    return _engine
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+from config.app_config import RESULTS_DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    url TEXT PRIMARY KEY,
+    html_hash TEXT,
+    text_hash TEXT,
+    posts TEXT,
+    result TEXT
+);
+CREATE TABLE IF NOT EXISTS texts (
+    hash TEXT PRIMARY KEY,
+    text TEXT
+);
+"""
+
+
+def fingerprint(content):
+    return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+class FingerprintStore:
+    """Per-URL hashes of the raw HTML and extracted text, with cached outputs.
+
+    One SQLite row per URL: {url, html_hash, text_hash, posts, result}, so a
+    page whose HTML is unchanged can reuse its extracted text and posts, and a
+    page whose text is unchanged can reuse its scoring result. The table lives
+    in the result database and the text itself is only kept once, in its
+    texts table, by hash. Rows are read on demand; only updates since the
+    last save() are held in memory, and save() writes just those in one
+    transaction.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self.pending = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @property
+    def dirty(self):
+        return bool(self.pending)
+
+    def entry(self, url):
+        """{html_hash, text_hash, text, posts, result} for url (unsaved updates included), else None"""
+        with self._lock:
+            if url in self.pending:
+                return self.pending[url]
+            row = self._conn.execute(
+                "SELECT f.html_hash, f.text_hash, t.text, f.posts, f.result FROM fingerprints f "
+                "LEFT JOIN texts t ON t.hash = f.text_hash WHERE f.url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        entry = {"html_hash": row[0], "text_hash": row[1], "text": row[2]}
+        if row[3] is not None:
+            entry["posts"] = json.loads(row[3])
+        if row[4] is not None:
+            entry["result"] = json.loads(row[4])
+        return entry
+
+    def cached_text(self, url, html):
+        """Extracted text from the last time this exact HTML was seen, else None"""
+        entry = self.entry(url)
+        if entry and entry.get("html_hash") == fingerprint(html):
+            return entry.get("text")
+        return None
+
+    def cached_result(self, url, text):
+        """Scoring result from the last time this exact text was seen, else None"""
+        entry = self.entry(url)
+        if entry and entry.get("text_hash") == fingerprint(text):
+            return entry.get("result")
+        return None
+
+    def cached_posts(self, url):
+        """Post offsets found in the stored text of url, else None"""
+        entry = self.entry(url)
+        return entry.get("posts") if entry else None
+
+    def last_result(self, url):
+        """Scoring result from the last visit, whether or not the text changed since"""
+        entry = self.entry(url)
+        return entry.get("result") if entry else None
+
+    def cached_page(self, url):
+        """(html hash, extracted text) from the last fetch of url, else None.
+
+        Used when the server answers 304 Not Modified and sends no HTML.
+        """
+        entry = self.entry(url)
+        if entry and entry.get("html_hash") is not None and entry.get("text") is not None:
+            return entry["html_hash"], entry["text"]
+        return None
+
+    def update(self, url, html, text, result=None, html_hash=None, posts=None):
+        entry = dict(self.entry(url) or {})
+        text_hash = fingerprint(text)
+        if entry.get("text_hash") != text_hash:
+            entry.pop("result", None)
+            entry.pop("posts", None)
+        entry["html_hash"] = html_hash or fingerprint(html)
+        entry["text_hash"] = text_hash
+        entry["text"] = text
+        if posts is not None:
+            entry["posts"] = posts
+        if result is not None:
+            entry["result"] = result
+        with self._lock:
+            self.pending[url] = entry
+
+    def save(self):
+        if not self.pending:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO texts (hash, text) VALUES (?, ?)",
+                    {entry["text_hash"]: entry["text"] for entry in self.pending.values()}.items())
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?)",
+                    [(url, entry["html_hash"], entry["text_hash"],
+                      json.dumps(entry["posts"]) if "posts" in entry else None,
+                      json.dumps(entry["result"], ensure_ascii=False) if "result" in entry else None)
+                     for url, entry in self.pending.items()])
+            self.pending = {}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_fingerprint_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FingerprintStore()
+    return _store
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import re
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lowercased word tokens with their character offsets in text"""
+    return [(m.group().lower(), m.start(), m.end()) for m in TOKEN_RE.finditer(text)]
+
+
+def variants(token):
+    # Let "weapons"/"attacks"/"toys" hit "weapon"/"attack"/"toy" without
+    # letting "skill" hit "kill" or "said" hit "aid"
+    yield token
+    if len(token) > 3 and token.endswith("s"):
+        yield token[:-1]
+        if token.endswith("es"):
+            yield token[:-2]
+
+
+class _Node:
+    __slots__ = ("children", "term")
+
+    def __init__(self):
+        self.children = {}
+        self.term = None
+
+
+class KeywordMatcher:
+    """Word-level trie over a weighted lexicon.
+
+    Terms are matched on whole words in one left-to-right pass over the text;
+    the work per position is bounded by the longest term (in words), not by
+    the size of the lexicon.
+    """
+
+    def __init__(self, lexicon):
+        self.root = _Node()
+        self.weights = {}
+        self.size = 0
+        for category, spec in lexicon.items():
+            default_weight = spec.get("weight", 1)
+            self.weights[category] = default_weight
+            for term in spec.get("terms", []):
+                weight = default_weight
+                if isinstance(term, dict):
+                    weight = term.get("weight", default_weight)
+                    term = term["term"]
+                self.add(category, term, weight)
+        self.version = hashlib.sha1(json.dumps(lexicon, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def add(self, category, term, weight):
+        tokens = [token for token, _, _ in tokenize(term)]
+        if not tokens:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.children.setdefault(token, _Node())
+        if node.term is None:
+            self.size += 1
+        node.term = (category, term, weight)
+
+    def find(self, text):
+        """All (category, term, weight, start, end) matches, longest match per start word"""
+        tokens = tokenize(text)
+        matches = []
+        for i in range(len(tokens)):
+            node = self.root
+            best = None
+            for j in range(i, len(tokens)):
+                token, _, end = tokens[j]
+                node = next((node.children[v] for v in variants(token) if v in node.children), None)
+                if node is None:
+                    break
+                if node.term is not None:
+                    best = node.term + (tokens[i][1], end)
+            if best is not None:
+                matches.append(best)
+        return matches
+
+    def score(self, text):
+        """Weighted score over distinct matched terms, per-category hits and offsets"""
+        matches = self.find(text)
+        hits = {category: 0 for category in self.weights}
+        seen = set()
+        total = 0
+        for category, term, weight, _, _ in matches:
+            hits[category] += 1
+            if term not in seen:
+                seen.add(term)
+                total += weight
+        return {
+            "score": total,
+            "hits": hits,
+            "matches": [[term, start, end] for _, term, _, start, end in matches]
+        }
@@ -0,0 +1,327 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    from llama_cpp import Llama
+except ImportError:
+    Llama = None
+
+from config.app_config import (CHUNK_CHARS_PER_TOKEN, CHUNK_RESERVED_TOKENS, LEXICON_PATH, LLM_BACKEND,
+                               LLM_GENERATION, LLM_MODEL_PATH, LLM_PARAMS, LLM_REPORTS_PATH, LLM_SECONDS_ESTIMATE)
+from core.chunking import window_chars
+from core.fingerprints import fingerprint
+from core.metrics import get_metrics
+
+# Instructions first and the post last, so every prompt starts with the same
+# tokens: llama.cpp keeps the longest common token prefix of consecutive
+# prompts in its KV cache and only evaluates the post and the reply
+PROMPT_PREFIX = """You are a cybersecurity analyst.
+
+Task: for the forum post below,
+1. Summarize in 2–3 sentences.
+2. Identify any dangerous/illegal activity.
+3. Give a danger rating (0–10).
+4. Provide concise reasoning.
+
+Keep your response structured and concise.
+
+"""
+
+# No URL: the same post on a mirror or under a new thread URL shares one report
+PROMPT_POST = """Forum Post:
+Content: {content}
+
+Analysis:
+"""
+
+# Page text that fits in one prompt at CHUNK_CHARS_PER_TOKEN; longer pages are
+# windowed by the caller. Scripts that take more tokens per character (Devanagari,
+# Urdu) are cut to the real token budget by LlamaBackend.fit
+WINDOW_CHARS = window_chars(
+    LLM_PARAMS.get("n_ctx", 512),
+    len(PROMPT_PREFIX + PROMPT_POST) // CHUNK_CHARS_PER_TOKEN + LLM_GENERATION.get("max_tokens", 0)
+    + CHUNK_RESERVED_TOKENS,
+    CHUNK_CHARS_PER_TOKEN)
+
+RATING_RE = re.compile(r"danger rating(?:\s*\([^)]*\))?\W*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    backend TEXT,
+    report TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    seconds REAL
+);
+"""
+
+
+def build_prompt(text):
+    return PROMPT_PREFIX + PROMPT_POST.format(content=text[:WINDOW_CHARS])
+
+
+def danger_rating(report):
+    """The 0-10 rating a report gives, or None if it doesn't state one"""
+    match = RATING_RE.search(report or "")
+    return min(10.0, float(match.group(1))) if match else None
+
+
+def merge_reports(parts, unit="windows"):
+    """One page report from (heading, report) per window or post, headed by the highest rating"""
+    if len(parts) == 1:
+        return parts[0][1]
+    ratings = [rating for rating in (danger_rating(report) for _, report in parts) if rating is not None]
+    lines = [f"Page danger rating: {max(ratings):g}/10 (max over {len(parts)} {unit})"] if ratings else []
+    for heading, report in parts:
+        lines.append(f"[{heading}]")
+        lines.append(report)
+    return "\n".join(lines)
+
+
+def estimate_tokens(prompt):
+    """Rough prompt + reply token count, at the CHUNK_CHARS_PER_TOKEN windows are sized with"""
+    return len(prompt) // CHUNK_CHARS_PER_TOKEN + LLM_GENERATION.get("max_tokens", 0)
+
+
+def backend_id(kind, model_path=LLM_MODEL_PATH):
+    """Identity of the backend for memo keys, without loading the model"""
+    if kind == "llama_cpp" and os.path.exists(model_path):
+        return f"llama_cpp:{os.path.basename(model_path)}:{os.path.getsize(model_path)}"
+    return kind
+
+
+class LlamaBackend:
+    """llama.cpp model loaded once per process, with the prompt prefix pre-evaluated.
+
+    complete() takes the post text and cuts it to the tokens n_ctx has room
+    for, so a window that tokenizes denser than WINDOW_CHARS assumes loses its
+    tail instead of failing.
+    """
+
+    def __init__(self, model_path=LLM_MODEL_PATH, params=None, generation=None):
+        if Llama is None:
+            raise RuntimeError("llama_cpp is not installed (pip install llama-cpp-python)")
+        if not os.path.exists(model_path):
+            raise RuntimeError(f"model file not found: {model_path}")
+        self.generation = dict(LLM_GENERATION, **(generation or {}))
+        print(f"Loading LLM from {model_path}")
+        self.llm = Llama(model_path=model_path, verbose=False, **dict(LLM_PARAMS, **(params or {})))
+        # Fill the KV cache with the shared prefix now; every completion after
+        # this reuses it instead of re-evaluating the instructions
+        self.llm.eval(self.llm.tokenize(PROMPT_PREFIX.encode("utf-8")))
+        print("LLM loaded")
+
+    def fit(self, text):
+        """text cut so its prompt and the reply fit in the context window"""
+        text = text[:WINDOW_CHARS]
+        excess = (len(self.llm.tokenize(build_prompt(text).encode("utf-8"))) + self.generation.get("max_tokens", 0)
+                  - self.llm.n_ctx())
+        if excess <= 0:
+            return text
+        tokens = self.llm.tokenize(text.encode("utf-8"), add_bos=False)
+        # A few spare tokens: the text on its own may tokenize differently at the edges
+        keep = max(0, len(tokens) - excess - 8)
+        get_metrics().inc("phobos_llm_truncated_total")
+        return self.llm.detokenize(tokens[:keep]).decode("utf-8", "ignore")
+
+    def complete(self, text):
+        try:
+            output = self.llm(build_prompt(self.fit(text)), **self.generation)
+        except ValueError as e:
+            # llama.cpp refuses prompts longer than n_ctx; fail this window only
+            raise RuntimeError(f"window does not fit the LLM context: {e}") from e
+        return output["choices"][0]["text"].strip()
+
+
+class StubBackend:
+    """Canned report from the keyword lexicon, for tests and machines without the model"""
+
+    def __init__(self, delay=0.0):
+        from core.keywords import KeywordMatcher
+        self.delay = delay
+        self.matcher = KeywordMatcher.from_file(LEXICON_PATH)
+
+    def complete(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        content = text[:WINDOW_CHARS]
+        result = self.matcher.score(content)
+        categories = [category for category, count in result["hits"].items() if count]
+        terms = sorted({term for term, _, _ in result["matches"]})
+        summary = " ".join(content.split())[:200]
+        return (f"Summary: {summary}\n"
+                f"Dangerous activity: {', '.join(categories) or 'none identified'}\n"
+                f"Danger rating: {min(10, result['score'])}/10\n"
+                f"Reasoning: keyword matches: {', '.join(terms[:10]) or 'none'}")
+
+
+def create_backend(kind):
+    if kind == "llama_cpp":
+        return LlamaBackend()
+    if kind == "stub":
+        return StubBackend()
+    raise ValueError(f"unknown LLM backend: {kind}")
+
+
+class LlmService:
+    """Resident report generator fed through a queue.
+
+    submit() returns a Future per post. Reports are memoized in SQLite under a
+    hash of the backend and the post text, so an unchanged post is answered
+    without touching the model, and the same post queued twice shares one
+    completion. One daemon thread owns the backend, loaded on first use; if
+    loading fails the service disables itself instead of failing every post.
+    """
+
+    def __init__(self, backend=LLM_BACKEND, path=LLM_REPORTS_PATH):
+        self.kind = backend if isinstance(backend, str) else type(backend).__name__
+        self.backend = None if isinstance(backend, str) else backend
+        self.backend_id = backend_id(self.kind)
+        self.error = None if self.kind != "off" else "disabled"
+        self.stats = {"cached": 0, "generated": 0, "failed": 0}
+        # Running estimate of seconds per report, and what the queue holds
+        self.seconds_per_report = LLM_SECONDS_ESTIMATE
+        self.queued_tokens = 0
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._thread = None
+        self._conn = None
+        if self.error is None:
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            row = self._conn.execute(
+                "SELECT AVG(seconds) FROM (SELECT seconds FROM reports WHERE backend = ? AND seconds IS NOT NULL"
+                " ORDER BY created_at DESC LIMIT 50)", (self.backend_id,)).fetchone()
+            if row[0] is not None:
+                self.seconds_per_report = row[0]
+
+    @property
+    def enabled(self):
+        return self.error is None
+
+    def add_listener(self, callback):
+        """callback(url, report) runs on the service thread for every new report"""
+        self._listeners.append(callback)
+
+    def key(self, text):
+        return fingerprint(self.backend_id + "\0" + text)
+
+    def cached(self, text):
+        """Memoized report for this post, else None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT report FROM reports WHERE key = ?", (self.key(text),)).fetchone()
+        return row[0] if row else None
+
+    def is_pending(self, text):
+        return self.key(text) in self._pending
+
+    def backlog_seconds(self):
+        """Estimated time to work through everything queued"""
+        return len(self._pending) * self.seconds_per_report
+
+    def submit(self, url, text):
+        """Future for this post's report (already done when memoized), or None when disabled"""
+        if not self.enabled:
+            return None
+        key = self.key(text)
+        tokens = estimate_tokens(build_prompt(text))
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            row = self._conn.execute("SELECT report FROM reports WHERE key = ?", (key,)).fetchone()
+            future = Future()
+            if row is not None:
+                self.stats["cached"] += 1
+                get_metrics().inc("phobos_llm_reports_total", source="cache")
+                future.set_result(row[0])
+                return future
+            self._pending[key] = future
+            self.queued_tokens += tokens
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="llm-service", daemon=True)
+                self._thread.start()
+        self._queue.put((key, url, text, tokens, future))
+        get_metrics().set("phobos_llm_queue", self._queue.qsize())
+        return future
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            key, url, text, tokens, future = item
+            try:
+                if self.backend is None and self.error is None:
+                    try:
+                        with get_metrics().span("llm_load"):
+                            self.backend = create_backend(self.kind)
+                    except Exception as e:
+                        self.error = str(e)
+                        print(f"LLM analysis disabled: {e}")
+                if self.backend is None:
+                    raise RuntimeError(f"LLM analysis disabled: {self.error}")
+                start = time.perf_counter()
+                with get_metrics().span("llm"):
+                    report = self.backend.complete(text)
+                seconds = time.perf_counter() - start
+                self.seconds_per_report = 0.8 * self.seconds_per_report + 0.2 * seconds
+                with self._lock:
+                    with self._conn:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO reports (key, url, backend, report, created_at, seconds)"
+                            " VALUES (?, ?, ?, ?, ?, ?)", (key, url, self.backend_id, report, time.time(), seconds))
+                    self.stats["generated"] += 1
+                get_metrics().inc("phobos_llm_reports_total", source="model")
+                future.set_result(report)
+                for callback in list(self._listeners):
+                    try:
+                        callback(url, report)
+                    except Exception as e:
+                        print(f"LLM listener error: {e}")
+            except Exception as e:
+                self.stats["failed"] += 1
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+                    self.queued_tokens -= tokens
+                get_metrics().set("phobos_llm_queue", self._queue.qsize())
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self.error = self.error or "closed"
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_llm_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = LlmService(os.environ.get("PHOBOS_LLM_BACKEND", LLM_BACKEND))
+    return _service
@@ -0,0 +1,262 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.app_config import METRICS_ENABLED, METRICS_FILE_PATH, METRICS_PORT
+
+# Upper bounds (s) of the duration histogram buckets; +Inf is implicit
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# Stages in pipeline order, for the UI panel
+STAGES = ["cycle", "model_load", "scrape", "fetch", "parse", "score", "classify", "triage", "emit", "ui", "llm_load",
+          "llm"]
+
+DESCRIPTIONS = {
+    "phobos_stage_seconds": ("histogram", "Time spent in each pipeline stage"),
+    "phobos_stage_errors_total": ("counter", "Exceptions raised inside a pipeline stage"),
+    "phobos_pages_total": ("counter", "Pages returned by the fetcher, by status class"),
+    "phobos_bytes_total": ("counter", "Bytes received from the fetcher"),
+    "phobos_pages_reused_total": ("counter", "Pages whose text was reused instead of parsed"),
+    "phobos_posts_total": ("counter", "Thread posts scored (new) or carried over from an earlier visit (seen)"),
+    "phobos_fetch_errors_total": ("counter", "Requested pages that failed or never came back"),
+    "phobos_cycles_total": ("counter", "Completed MonitorWorker cycles"),
+    "phobos_scheduled_urls": ("gauge", "URLs known to the revisit scheduler"),
+    "phobos_failing_urls": ("gauge", "URLs currently backing off after failures"),
+    "phobos_last_cycle_timestamp_seconds": ("gauge", "Unix time the last cycle finished"),
+    "phobos_llm_reports_total": ("counter", "LLM reports handed out, from the memo store or the model"),
+    "phobos_llm_queue": ("gauge", "Posts waiting for an LLM report"),
+    "phobos_llm_truncated_total": ("counter", "LLM inputs cut further to fit the model's context window"),
+    "phobos_triage_total": ("counter", "Entries that reached each tier of the triage cascade"),
+    "phobos_llm_avoided_total": ("counter", "Entries that did not need new LLM work, by reason"),
+    "phobos_llm_seconds_avoided_total": ("counter", "Estimated LLM seconds the cascade avoided"),
+    "phobos_llm_tokens_avoided_total": ("counter", "Estimated LLM tokens the cascade avoided"),
+}
+
+
+def status_class(status):
+    """'2xx', '3xx', ... for HTTP statuses, 'error' for everything else"""
+    status = str(status or "")
+    if status[:1].isdigit() and status[1:3].isdigit():
+        return status[0] + "xx"
+    return "error"
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join('%s="%s"' % (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                     for key, value in labels)
+    return "{" + pairs + "}"
+
+
+class Span:
+    """Times one stage; exceptions are counted against the stage and re-raised"""
+    __slots__ = ("metrics", "labels", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.labels = (("stage", stage),)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._observe(("phobos_stage_seconds", self.labels), time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics._inc(("phobos_stage_errors_total", self.labels), 1)
+        return False
+
+
+class Metrics:
+    """In-process counters, gauges and duration histograms keyed by (name, labels).
+
+    With enabled=False every call returns straight away and span() hands back
+    one shared nullcontext, so instrumented code costs an attribute check.
+    """
+
+    def __init__(self, enabled=True, buckets=BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.gauges = {}
+        # (name, labels) -> [bucket counts..., +Inf count, sum, last value]
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        self._inc((name, tuple(sorted(labels.items())) if labels else ()), value)
+
+    def _inc(self, key, value):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[(name, tuple(sorted(labels.items())) if labels else ())] = value
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        self._observe((name, tuple(sorted(labels.items())) if labels else ()), value)
+
+    def _observe(self, key, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(self.buckets) + 1) + [0.0, 0.0]
+            histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] = value
+
+    def span(self, stage):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, stage)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def quantile(self, counts, q):
+        """Bucket-interpolated quantile, as Prometheus' histogram_quantile does"""
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def snapshot(self):
+        """Plain-dict view for the UI: per-stage timings and all counters/gauges"""
+        with self._lock:
+            histograms = {key: list(value) for key, value in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        stages = {}
+        for (name, labels), histogram in histograms.items():
+            if name != "phobos_stage_seconds":
+                continue
+            stage = dict(labels).get("stage")
+            counts = histogram[:-2]
+            count = sum(counts)
+            stages[stage] = {
+                "count": count,
+                "total": histogram[-2],
+                "avg": histogram[-2] / count if count else None,
+                "last": histogram[-1],
+                "p95": self.quantile(counts, 0.95),
+                "errors": counters.get(("phobos_stage_errors_total", (("stage", stage),)), 0),
+            }
+        return {"stages": stages, "counters": counters, "gauges": gauges}
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            histograms = {key: list(value) for key, value in self.histograms.items()}
+            samples = dict(self.counters)
+            samples.update(self.gauges)
+        lines = []
+        names = sorted({name for name, _ in samples} | {name for name, _ in histograms})
+        for name in names:
+            kind, description = DESCRIPTIONS.get(name, ("untyped", ""))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (sample, labels), value in sorted(samples.items()):
+                if sample == name:
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+            for (sample, labels), histogram in sorted(histograms.items()):
+                if sample != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), histogram[:-2]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram[-2]}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=METRICS_FILE_PATH):
+        """Atomically replace path with the current exposition"""
+        if not self.enabled or not path:
+            return
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing metrics to {path}: {e}")
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve GET /metrics from a daemon thread; returns the bound port"""
+        if self._server is not None:
+            return self._server.server_address[1]
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"Metrics endpoint on http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server.server_address[1]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+_NULL_SPAN = nullcontext()
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                enabled = os.environ.get("PHOBOS_METRICS", "1" if METRICS_ENABLED else "0") not in ("0", "")
+                _metrics = Metrics(enabled=enabled)
+    return _metrics
+
+
+def metrics_port():
+    """Configured endpoint port, or None when the endpoint is off"""
+    port = os.environ.get("PHOBOS_METRICS_PORT", METRICS_PORT)
+    return int(port) if port not in (None, "") else None
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import threading
+
+import joblib
+
+from config.app_config import MODEL_RELOAD_INTERVAL
+
+
+def file_signature(path):
+    """Cheap (mtime, size) signature used to decide when to re-hash a file"""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class _Entry:
+    def __init__(self, path, loader, fallback):
+        self.path = path
+        self.loader = loader
+        self.fallback = fallback
+        self.model = None
+        self.signature = None
+        self.digest = None
+        self.loaded = False
+
+
+class ModelRegistry:
+    """Process-wide cache of model artifacts.
+
+    Each registered model is loaded once and shared by every caller. A daemon
+    thread polls the artifact's mtime/size and, when it changes, compares the
+    content hash and swaps in the new model without blocking readers.
+    """
+
+    def __init__(self, poll_interval=MODEL_RELOAD_INTERVAL):
+        self.poll_interval = poll_interval
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def register(self, name, path, loader=joblib.load, fallback=None):
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(path, loader, fallback)
+
+    def get(self, name):
+        entry = self._entries[name]
+        if not entry.loaded:
+            with self._lock:
+                if not entry.loaded:
+                    self._load(name, entry)
+                    entry.loaded = True
+            self._ensure_watcher()
+        return entry.model
+
+    def digest(self, name):
+        """Content hash of the artifact currently served for name, or None"""
+        entry = self._entries.get(name)
+        return entry.digest if entry is not None else None
+
+    def _load(self, name, entry):
+        try:
+            if os.path.exists(entry.path):
+                print(f"Loading model '{name}' from {entry.path}")
+                signature = file_signature(entry.path)
+                digest = file_digest(entry.path)
+                entry.model = entry.loader(entry.path)
+                entry.signature, entry.digest = signature, digest
+                print(f"Model '{name}' loaded")
+            elif entry.fallback is not None:
+                print(f"Model '{name}' not found, building it")
+                entry.model = entry.fallback()
+                if os.path.exists(entry.path):
+                    entry.signature = file_signature(entry.path)
+                    entry.digest = file_digest(entry.path)
+        except Exception as e:
+            print(f"Error loading model '{name}': {e}")
+            entry.model = None
+
+    def _ensure_watcher(self):
+        if self.poll_interval <= 0 or self._watcher is not None:
+            return
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+                self._watcher.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            for name, entry in list(self._entries.items()):
+                if entry.loaded:
+                    self._check(name, entry)
+
+    def _check(self, name, entry):
+        try:
+            signature = file_signature(entry.path)
+        except OSError:
+            return
+        if signature == entry.signature:
+            return
+        try:
+            digest = file_digest(entry.path)
+            if digest == entry.digest:
+                entry.signature = signature
+                return
+            model = entry.loader(entry.path)
+        except Exception as e:
+            # Usually a half-written file; keep serving the old model and retry next poll
+            print(f"Reload of model '{name}' failed: {e}")
+            return
+        entry.model = model
+        entry.signature, entry.digest = signature, digest
+        print(f"Model '{name}' reloaded from {entry.path}")
+
+    def stop(self):
+        self._stop.set()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
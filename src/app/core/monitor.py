@@ -1,251 +1,635 @@
-import subprocess
 import os
 import json
+import time
+from collections import deque
+from concurrent.futures import Future
 from PyQt5.QtCore import QThread, pyqtSignal
 import joblib
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import Pipeline
+from config.app_config import (CHUNK_AGGREGATE, CHUNK_BATCH_SIZE, CHUNK_MAX_WINDOWS, CHUNK_OVERLAP, CHUNK_TOP_K,
+                               CLASSIFIER_BACKEND, CLASSIFIER_THRESHOLD, COMPACT_MODEL_DIR, FETCH_ENGINE, LEXICON_PATH,
+                               ONLINE_MODEL_PATH, THREAT_MODEL_PATH)
+from core.keywords import KeywordMatcher
+from core.model_registry import get_registry
+from core.scraper_daemon import get_scraper_daemon
+from core.fetcher import get_fetch_engine
+from core import chunking, extraction, posts
+from core.fingerprints import fingerprint, get_fingerprint_store
+from core.llm_service import WINDOW_CHARS, merge_reports
+from core.metrics import get_metrics, status_class
+from core.scheduler import is_ok
+from core.store import get_result_store
+from core.triage import TriageCascade, format_summary, suspicious_confidence
+from core.url_registry import get_url_registry
+from model.compact import CompactClassifier, export_model
+from model.model import build_pipeline, classify_batch
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATUS_RANK = {"SAFE": 0, "POTENTIALLY SUSPICIOUS": 1, "SUSPICIOUS": 2}
+# What a post is made of on input (extraction, fingerprint store or read.py output)
+POST_FIELDS = ("author", "time", "start", "end")
+
+
+def train_model():
+    try:
+        train_path = os.path.join(APP_DIR, 'model/train.json')
+        
+        if not os.path.exists(train_path):
+            print("train.json not found, creating basic model")
+            return create_basic_model()
+
+        with open(train_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        
+        texts = [item["text"] for item in data["data"]]
+        labels = [item["label"] for item in data["data"]]
+        
+
+        model = build_pipeline()
+        model.fit(texts, labels)
+        
+
+        joblib.dump(model, THREAT_MODEL_PATH)
+        print("AI model trained and saved")
+        return model
+        
+    except Exception as e:
+        print(f"Error training model: {e}")
+        return create_basic_model()
+
+def create_basic_model():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    basic_texts = [
+        "weapon dealing discussion", "selling guns", "terrorist funding",
+        "normal discussion", "technology news", "cooking recipes"
+    ]
+    basic_labels = ["suspicious", "suspicious", "suspicious", 
+                   "not suspicious", "not suspicious", "not suspicious"]
+    
+    model = Pipeline([
+        ('tfidf', TfidfVectorizer(max_features=1000, lowercase=True)),
+        ('classifier', LogisticRegression(random_state=42))
+    ])
+    
+    model.fit(basic_texts, basic_labels)
+    print("Basic AI model created")
+    return model
+
+
+def build_compact_model():
+    """Export the batch model (training it first if needed) to COMPACT_MODEL_DIR"""
+    model = joblib.load(THREAT_MODEL_PATH) if os.path.exists(THREAT_MODEL_PATH) else train_model()
+    compact = export_model(model, COMPACT_MODEL_DIR)
+    print(f"Compact model exported to {COMPACT_MODEL_DIR}")
+    return compact
+
+
+def build_online_model():
+    """Registry fallback for the online backend; imports sklearn only when it runs"""
+    from model.online import build_online_model
+    return build_online_model()
+
+
+def label_units(text, html, label):
+    """Texts an analyst's label on a page teaches the online model.
+
+    The units the monitor classifies: the page's posts (plus any text before
+    the first), else the whole page. A page marked safe labels all of them; a
+    page marked suspicious only those the keyword matcher or classifier flags,
+    or else the most suspicious one, so the harmless replies of a flagged
+    thread aren't learned as threats.
+    """
+    if html:
+        text, page_posts = extraction.extract_page(html)
+    else:
+        page_posts = posts.segment_text(text, extraction.SEPARATOR)
+    spans = [(post["start"], post["end"]) for post in page_posts]
+    if spans and text[:spans[0][0]].strip():
+        spans.insert(0, (0, spans[0][0]))
+    units = [text[start:end] for start, end in spans] or [text]
+    if label != "suspicious" or len(units) == 1:
+        return units
+    matcher = get_registry().get("lexicon")
+    scores = [matcher.score(unit)["score"] for unit in units]
+    probabilities = [0.0] * len(units)
+    model = get_registry().get("threat_classifier")
+    if model is not None and "suspicious" in list(model.classes_):
+        column = list(model.classes_).index("suspicious")
+        probabilities = [float(p) for p in classify_batch(model, units)["probabilities"][:, column]]
+    flagged = [unit for unit, score, p in zip(units, scores, probabilities) if score > 0 or p >= 0.5]
+    if flagged:
+        return flagged
+    return [max(zip(units, probabilities), key=lambda pair: pair[1])[0]]
+
+
+def get_page_source():
+    """The fetch engine selected by FETCH_ENGINE; both stream pages via scrape(urls)"""
+    if os.environ.get("PHOBOS_FETCH_ENGINE", FETCH_ENGINE) == "daemon":
+        return get_scraper_daemon()
+    return get_fetch_engine()
+
+
+CLASSIFIER = os.environ.get("PHOBOS_CLASSIFIER", CLASSIFIER_BACKEND)
+if CLASSIFIER == "online":
+    get_registry().register("threat_classifier", ONLINE_MODEL_PATH, fallback=build_online_model)
+elif CLASSIFIER == "compact":
+    get_registry().register("threat_classifier", os.path.join(COMPACT_MODEL_DIR, "meta.json"),
+                            loader=CompactClassifier.load, fallback=build_compact_model)
+else:
+    get_registry().register("threat_classifier", THREAT_MODEL_PATH, fallback=train_model)
+get_registry().register("lexicon", LEXICON_PATH, loader=KeywordMatcher.from_file)
+
 
 class MonitorWorker(QThread):
     scraped_data = pyqtSignal(str)
-    parsed_data = pyqtSignal(str)
     ai_results = pyqtSignal(str)
+    run_completed = pyqtSignal(int)
+    fetch_stats = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, urls=None, scheduler=None):
         super().__init__()
         self.ai_model = None
-        self.load_or_train_model()
+        # URLs to fetch this cycle (None = everything in url.txt); outcomes are
+        # reported back to the scheduler that handed them out
+        self.urls = urls
+        self.scheduler = scheduler
 
     def load_or_train_model(self):
-        try:
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            model_path = os.path.join(app_dir, 'threat_classifier.pkl')
-            
-            if os.path.exists(model_path):
-                print("Loading existing AI model...")
-                self.ai_model = joblib.load(model_path)
-                print("AI model loaded successfully")
+        # Shared across workers; only the first cycle pays for loading/training
+        self.ai_model = get_registry().get("threat_classifier")
+
+    def score_entry(self, entry):
+        url = entry.get("url", "unknown") 
+        matcher = get_registry().get("lexicon")
+        keyword_result = matcher.score(entry.get("text", ""))
+        total_score = keyword_result["score"]
+        status, classification = self.status_for(total_score)
+
+        return {
+            "url": url,
+            "text": entry.get("text", ""),
+            "status": status,
+            "classification": classification,
+            "score": total_score,
+            "hits": keyword_result["hits"],
+            "matches": keyword_result["matches"],
+            "lexicon": matcher.version
+        }
+
+    def status_for(self, score):
+        if score >= 3:
+            return "SUSPICIOUS", "SUSPICIOUS"
+        if score >= 1:
+            return "POTENTIALLY SUSPICIOUS", "POTENTIALLY SUSPICIOUS"
+        return "SAFE", "NOT SUSPICIOUS"
+
+    def score_page(self, store, url, text, page_posts):
+        """Scoring result for a page: per post when it splits into posts, else whole"""
+        if not page_posts:
+            return self.score_cached(store, url, text)
+        return self.score_posts(store, url, text, page_posts)
+
+    def score_cached(self, store, url, text):
+        """Scoring result without the text, reused from the store when the text is unchanged"""
+        result = store.cached_result(url, text)
+        if result is None or result.get("lexicon") != get_registry().get("lexicon").version:
+            result = self.score_entry({"url": url, "text": text})
+            del result["text"]
+        elif result.get("model") != get_registry().digest("threat_classifier"):
+            # Keyword score still valid, but the classifier changed since
+            result = {k: v for k, v in result.items() if not k.startswith("ai_")}
+        return result
+
+    def score_posts(self, store, url, text, page_posts):
+        """Score each post of a thread, reusing posts already scored on an earlier visit.
+
+        Posts are matched to the last visit's by id (author and body), so on a
+        revisit only newly appeared or edited posts go through the matcher. Text
+        before the first post (the thread title and opening post) is scored as
+        one more post. The page gets the highest post score, summed hits and
+        every post's matches at page offsets; its status is set once the posts
+        are classified (summarize_posts).
+        """
+        matcher = get_registry().get("lexicon")
+        digest = get_registry().digest("threat_classifier")
+        last = store.last_result(url) or {}
+        previous = {}
+        if last.get("lexicon") == matcher.version:
+            previous = {post["id"]: post for post in last.get("posts", [])}
+        units = [{k: post[k] for k in POST_FIELDS} for post in page_posts]
+        if units and text[:units[0]["start"]].strip():
+            units.insert(0, {"author": "", "time": "", "start": 0, "end": units[0]["start"]})
+        scored_posts = []
+        new = 0
+        for post in posts.with_ids(text, units):
+            result = previous.get(post["id"])
+            post["new"] = result is None
+            if result is None:
+                result = self.score_entry({"url": url, "text": post["text"]})
+                del result["url"], result["text"], result["lexicon"]
+                new += 1
+            elif last.get("model") == digest and "ai_label" in result:
+                result = dict(result, model=digest)
             else:
-                print("Training new AI model...")
-                self.train_model()
-        except Exception as e:
-            print(f"Error loading/training AI model: {e}")
-            self.ai_model = None
+                # Keyword score still valid, but the classifier changed since
+                result = {k: v for k, v in result.items() if not k.startswith("ai_")}
+                result["status"] = self.status_for(result["score"])[0]
+            result["classification"] = "NOT SUSPICIOUS" if result["status"] == "SAFE" else result["status"]
+            post_url = f"{url} (post by {post['author']})" if post["author"] else url
+            scored_posts.append(dict(result, url=post_url, **post))
+        get_metrics().inc("phobos_posts_total", new, state="new")
+        get_metrics().inc("phobos_posts_total", len(scored_posts) - new, state="seen")
+        hits = dict.fromkeys(matcher.weights, 0)
+        matches = []
+        for post in scored_posts:
+            for category, count in post["hits"].items():
+                hits[category] = hits.get(category, 0) + count
+            matches.extend([term, start + post["start"], end + post["start"]] for term, start, end in post["matches"])
+        score = max(post["score"] for post in scored_posts)
+        status, classification = self.status_for(score)
+        return {"status": status, "classification": classification, "score": score, "hits": hits,
+                "matches": matches, "lexicon": matcher.version, "posts": scored_posts, "new_posts": new}
 
-    def train_model(self):
-        try:
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            train_path = os.path.join(app_dir, 'model/train.json')
-            
-            if not os.path.exists(train_path):
-                print("train.json not found, creating basic model")
-                self.create_basic_model()
-                return
+    def summarize_posts(self, entry):
+        """Page status, label, alerts and report from its classified posts"""
+        entry_posts = entry["posts"]
+        status = max((post["status"] for post in entry_posts), key=STATUS_RANK.get)
+        entry["status"] = status
+        entry["classification"] = "NOT SUSPICIOUS" if status == "SAFE" else status
+        labelled = [post for post in entry_posts if "ai_label" in post]
+        if labelled:
+            top = max(labelled, key=suspicious_confidence)
+            entry["ai_label"] = top["ai_label"]
+            entry["ai_confidence"] = top["ai_confidence"]
+            entry["model"] = top["model"]
+        # Alerts only for flagged posts that weren't there last visit
+        entry["alerts"] = [{k: post[k] for k in ("author", "time", "status", "score")}
+                           for post in entry_posts if post.get("new") and post["status"] != "SAFE"]
+        reports = []
+        reported = set()
+        for post in entry_posts:
+            # A post quoted or repeated in the thread has the same id and report
+            if post.get("llm_report") and post["id"] not in reported:
+                reported.add(post["id"])
+                reports.append((f"post by {post['author'] or 'page'}{', ' + post['time'] if post['time'] else ''}",
+                                post["llm_report"]))
+        if reports:
+            entry["llm_report"] = merge_reports(reports, unit="posts")
 
-            with open(train_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            texts = [item["text"] for item in data["data"]]
-            labels = [item["label"] for item in data["data"]]
-            
+    def analysis_units(self, scored):
+        """What gets classified and triaged: the posts of threads, whole pages otherwise"""
+        units = []
+        for entry in scored:
+            units.extend(entry["posts"] if entry.get("posts") else [entry])
+        return units
 
-            self.ai_model = Pipeline([
-                ('tfidf', TfidfVectorizer(
-                    max_features=5000,
-                    ngram_range=(1, 3),
-                    stop_words='english',
-                    lowercase=True
-                )),
-                ('classifier', LogisticRegression(
-                    random_state=42,
-                    class_weight='balanced'
-                ))
-            ])
-            
-            self.ai_model.fit(texts, labels)
-            
+    def analyze_units(self, scored):
+        """Classify and triage scored pages post by post; returns the triage summary"""
+        units = self.analysis_units(scored)
+        with get_metrics().span("classify"):
+            self.classify_scored(units)
+        with get_metrics().span("triage"):
+            # Posts keep their report across visits; pages are re-triaged (memo hits are free)
+            triage = TriageCascade().run([unit for unit in units if "id" not in unit or not unit.get("llm_report")])
+        for entry in scored:
+            if entry.get("posts"):
+                self.summarize_posts(entry)
+        return triage
 
-            model_path = os.path.join(app_dir, 'threat_classifier.pkl')
-            joblib.dump(self.ai_model, model_path)
-            print("AI model trained and saved")
-            
-        except Exception as e:
-            print(f"Error training model: {e}")
-            self.create_basic_model()
-
-    def create_basic_model(self):
-        basic_texts = [
-            "weapon dealing discussion", "selling guns", "terrorist funding",
-            "normal discussion", "technology news", "cooking recipes"
-        ]
-        basic_labels = ["suspicious", "suspicious", "suspicious", 
-                       "not suspicious", "not suspicious", "not suspicious"]
-        
-        self.ai_model = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=1000, lowercase=True)),
-            ('classifier', LogisticRegression(random_state=42))
-        ])
-        
-        self.ai_model.fit(basic_texts, basic_labels)
-        print("Basic AI model created")
+    def stored_result(self, entry):
+        """What the fingerprint store keeps for an entry.
 
-    def analyze_with_ai(self, results_data):
-        try:
-            data = json.loads(results_data) if isinstance(results_data, str) else results_data
-            if not data:
-                return "No data to analyze"
-            
-            WEAPON_KEYWORDS = ['weapon', 'gun', 'rifle', 'pistol', 'ammunition', 'bomb', 'explosive', 'toy']
-            TERROR_KEYWORDS = ['terrorist', 'jihad', 'attack', 'kill', 'assassination', 'hitman']
-            ANTI_INDIA = ['anti-india', 'separatist', 'kashmir liberation', 'pakistan intelligence', 'aid']
-            
-            analysis_results = []
-            suspicious_count = 0
-            
-            for i, entry in enumerate(data, 1):
-                url = entry.get("url", "unknown") 
-                text = entry.get("text", "").lower()
-                
-                weapon_score = sum(1 for word in WEAPON_KEYWORDS if word in text)
-                terror_score = sum(1 for word in TERROR_KEYWORDS if word in text)
-                anti_india_score = sum(1 for word in ANTI_INDIA if word in text)
-                
-                total_score = weapon_score * 3 + terror_score * 4 + anti_india_score * 2
-                
-                if total_score >= 3:
-                    status = "SUSPICIOUS"
-                    classification = "SUSPICIOUS"
-                    suspicious_count += 1
-                elif total_score >= 1:
-                    status = "POTENTIALLY SUSPICIOUS"
-                    classification = "POTENTIALLY SUSPICIOUS"
-                else:
-                    status = "SAFE"
-                    classification = "NOT SUSPICIOUS"
-                
-                analysis_results.append(f"""
-    Entry {i}: {status}
-    URL: {url}
-    Classification: {classification}
-    Threat Score: {total_score}
-    Text Preview: {entry.get('text', '')[:100]}{'...' if len(entry.get('text', '')) > 100 else ''}
+        No page or post text, and for threads only what score_posts needs on
+        the next visit: the lexicon and model apply to the whole page, page
+        matches and hits are rebuilt from the posts, and post classifications
+        follow from their status.
+        """
+        if not entry.get("posts"):
+            return {k: v for k, v in entry.items() if k not in ("url", "text")}
+        result = {k: v for k, v in entry.items() if k not in ("url", "text", "posts", "matches", "alerts", "new_posts")}
+        result["posts"] = []
+        for post in entry["posts"]:
+            stored = {k: v for k, v in post.items()
+                      if k not in ("url", "text", "new", "model", "classification", "hits")}
+            stored["hits"] = {category: count for category, count in post["hits"].items() if count}
+            if len(post.get("ai_chunks", [])) <= 1:
+                # A short post is its own single window
+                stored.pop("ai_chunks", None)
+            result["posts"].append(stored)
+        return result
+
+    def classify_scored(self, scored):
+        """Add classifier labels to scored entries that don't have one.
+
+        Each entry's text is split into overlapping windows and every window of
+        every entry is classified in batches; the page label comes from the
+        max (or top-k mean) window probability, so a threat deep in a long
+        thread isn't diluted by the rest of the page.
+        """
+        todo = [entry for entry in scored if "ai_label" not in entry]
+        if not todo or self.ai_model is None:
+            return
+        classes = list(self.ai_model.classes_)
+        if "suspicious" not in classes:
+            # Not our two-class model; label whole pages as before
+            batch = classify_batch(self.ai_model, todo)
+            self.apply_labels(todo, [str(label) for label in batch["labels"]], batch["confidence"])
+            return
+        spans = [chunking.windows(entry["text"], WINDOW_CHARS, CHUNK_OVERLAP, CHUNK_MAX_WINDOWS) for entry in todo]
+        texts = [entry["text"][start:end] for entry, entry_spans in zip(todo, spans) for start, end in entry_spans]
+        column = classes.index("suspicious")
+        other = next((label for label in classes if label != "suspicious"), "not suspicious")
+        probabilities = []
+        for i in range(0, len(texts), CHUNK_BATCH_SIZE):
+            batch = classify_batch(self.ai_model, texts[i:i + CHUNK_BATCH_SIZE])
+            probabilities.extend(float(p) for p in batch["probabilities"][:, column])
+        labels, confidences = [], []
+        position = 0
+        for entry, entry_spans in zip(todo, spans):
+            window_probabilities = probabilities[position:position + len(entry_spans)]
+            position += len(entry_spans)
+            entry["ai_chunks"] = [[start, end, round(p, 4)]
+                                  for (start, end), p in zip(entry_spans, window_probabilities)]
+            p = chunking.aggregate(window_probabilities, CHUNK_AGGREGATE, CHUNK_TOP_K)
+            labels.append("suspicious" if p >= 0.5 else other)
+            confidences.append(p if p >= 0.5 else 1.0 - p)
+        self.apply_labels(todo, labels, confidences)
+
+    def apply_labels(self, entries, labels, confidences):
+        digest = get_registry().digest("threat_classifier")
+        for entry, label, confidence in zip(entries, labels, confidences):
+            entry["ai_label"] = str(label)
+            entry["ai_confidence"] = round(float(confidence), 4)
+            entry["model"] = digest
+            if (entry["status"] == "SAFE" and entry["ai_label"] == "suspicious"
+                    and entry["ai_confidence"] >= CLASSIFIER_THRESHOLD):
+                entry["status"] = "POTENTIALLY SUSPICIOUS"
+                entry["classification"] = "POTENTIALLY SUSPICIOUS"
+
+    def format_analysis(self, scored):
+        analysis_results = []
+        suspicious_count = 0
+        
+        for i, result in enumerate(scored, 1):
+            if result["status"] == "SUSPICIOUS":
+                suspicious_count += 1
+            text = result["text"]
+            analysis_results.append(f"""
+    Entry {i}: {result['status']}
+    URL: {result['url']}
+    Classification: {result['classification']}
+    Threat Score: {result['score']}
+    AI Label: {result.get('ai_label', 'n/a')} ({result.get('ai_confidence', 0):.2f})
+    Keyword Hits: {', '.join(f'{category}={count}' for category, count in result['hits'].items())}
+    {self.format_preview(result, text)}{self.format_report(result)}
     {'-' * 60}""")
-            
-            threat_level = "HIGH" if suspicious_count > len(data) * 0.5 else "MEDIUM" if suspicious_count > 0 else "LOW"
-            
-            summary = f"""
+        
+        threat_level = "HIGH" if suspicious_count > len(scored) * 0.5 else "MEDIUM" if suspicious_count > 0 else "LOW"
+        
+        summary = f"""
     THREAT ANALYSIS SUMMARY  
     {'=' * 60}
-    Total Entries: {len(data)}
+    Total Entries: {len(scored)}
     Suspicious Content: {suspicious_count}
     Threat Level: {threat_level}
 
     {'=' * 60}
     DETAILED ANALYSIS:
     """
+        
+        return summary + "\n".join(analysis_results)
+
+    def format_preview(self, result, text):
+        """First 100 chars of the page, of its most suspicious post, or of its most suspicious window"""
+        if result.get("posts"):
+            top = max(result["posts"], key=lambda post: (STATUS_RANK[post["status"]], post["score"],
+                                                         suspicious_confidence(post)))
+            body = top["text"]
+            return (f"Posts: {len(result['posts'])} ({result.get('new_posts', 0)} new, "
+                    f"{len(result.get('alerts', []))} flagged)\n"
+                    f"    Top Post [{top['author'] or 'page'}{', ' + top['time'] if top['time'] else ''}, "
+                    f"score {top['score']}]: {body[:100]}{'...' if len(body) > 100 else ''}")
+        chunks = result.get("ai_chunks") or []
+        if len(chunks) > 1:
+            start, end, p = max(chunks, key=lambda chunk: chunk[2])
+            window = text[start:end]
+            return (f"Hottest Window [chars {start}-{end} of {len(text)}, p={p:.2f}]: "
+                    f"{window[:100]}{'...' if len(window) > 100 else ''}")
+        return f"Text Preview: {text[:100]}{'...' if len(text) > 100 else ''}"
+
+    def format_report(self, result):
+        report = result.get("llm_report")
+        if not report:
+            return ""
+        return "\n    LLM Report:\n" + "\n".join("      " + line for line in report.splitlines())
+
+    def analyze_with_ai(self, results_data):
+        try:
+            data = json.loads(results_data) if isinstance(results_data, str) else results_data
+            if not data:
+                return "No data to analyze"
             
-            return summary + "\n".join(analysis_results)
+            store = get_fingerprint_store()
+            scored = []
+            for entry in data:
+                url = entry.get("url", "unknown")
+                text = entry.get("text", "")
+                page_posts = entry.get("posts")
+                if page_posts is None:
+                    page_posts = posts.segment_text(text, extraction.SEPARATOR)
+                scored.append(dict(self.score_page(store, url, text, page_posts), url=url, text=text))
+            self.analyze_units(scored)
+            return self.format_analysis(scored)
             
         except Exception as e:
             return f"Analysis Error: {str(e)}"
 
 
+    def conditional_headers(self, store):
+        """headers_for callback sending stored validators, for pages we can rebuild from cache"""
+        urls = self.urls if self.urls is not None else get_url_registry().urls()
+        validators = get_url_registry().validators(urls)
+        headers = {}
+        for url, (etag, last_modified) in validators.items():
+            if store.cached_page(url) is None:
+                continue
+            headers[url] = {}
+            if etag:
+                headers[url]["If-None-Match"] = etag
+            if last_modified:
+                headers[url]["If-Modified-Since"] = last_modified
+        return headers.get
+
+    def format_fetch_stats(self, pages, not_modified):
+        # The Go scraper doesn't report wire sizes; fall back to the HTML length
+        transferred = sum(page.get("bytes", len(page.get("html") or "")) for page in pages)
+        hit_rate = not_modified / len(pages) * 100 if pages else 0
+        return (f"Fetched {len(pages)} pages, {transferred / 1024:.1f} KB transferred, "
+                f"{not_modified} not modified ({hit_rate:.0f}% cache hit rate)")
+
+    def report_outcomes(self, pages, scored, changed_urls):
+        if self.scheduler is None:
+            return
+        scores = {entry["url"]: entry.get("score", 0) for entry in scored}
+        outcomes = [(page.get("url"), is_ok(page.get("status")), page.get("url") in changed_urls,
+                     scores.get(page.get("url"), 0)) for page in pages]
+        fetched = {page.get("url") for page in pages}
+        # Requested but never returned (timeout, crash): count as failures
+        missing = [url for url in self.urls or [] if url not in fetched]
+        get_metrics().inc("phobos_fetch_errors_total", len(missing))
+        outcomes += [(url, False, False, 0) for url in missing]
+        self.scheduler.report(outcomes)
+
+    def record_page(self, metrics, page):
+        metrics.inc("phobos_pages_total", status=status_class(page.get("status")))
+        metrics.inc("phobos_bytes_total", page.get("bytes", len(page.get("html") or "")))
+        if page.get("elapsed") is not None:
+            metrics.observe("phobos_stage_seconds", page["elapsed"], stage="fetch")
+        if not is_ok(page.get("status")):
+            metrics.inc("phobos_fetch_errors_total")
+
     def run(self):
         print("MonitorWorker started")
+        metrics = get_metrics()
+        with metrics.span("cycle"):
+            self.run_cycle(metrics)
+        metrics.inc("phobos_cycles_total")
+        metrics.set("phobos_last_cycle_timestamp_seconds", round(time.time(), 3))
+        if self.scheduler is not None:
+            stats = self.scheduler.stats()
+            metrics.set("phobos_scheduled_urls", stats["urls"])
+            metrics.set("phobos_failing_urls", stats["failing"])
+        metrics.write()
+
+    def run_cycle(self, metrics):
+        pages = []
+        scored = []
+        changed_urls = set()
         try:
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            print(f"Running scraper from: {app_dir}")
-            
-            result = subprocess.run(
-                ["python", "run.py"],
-                cwd=app_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            print(f"Scraper return code: {result.returncode}")
-            if result.stdout:
-                print(f"Scraper stdout: {result.stdout}")
-            if result.stderr:
-                print(f"Scraper stderr: {result.stderr}")
-
-            if result.returncode == 0:
-                print("Scraper completed, now processing data")
-                self.process_scraped_data()
-                self.load_and_display_data()
-            else:
-                self.scraped_data.emit(f"Error running scraper: {result.stderr}")
+            with metrics.span("model_load"):
+                self.load_or_train_model()
 
-        except subprocess.TimeoutExpired:
-            print("Scraper timeout")
-            self.scraped_data.emit("Scraper timeout after 60 seconds")
-        except Exception as e:
-            print(f"Monitor error: {e}")
-            self.scraped_data.emit(f"Monitoring error: {str(e)}")
+            # Pages stream in from the resident scraper in completion order and
+            # are handed to the extraction pool straight away, so parsing and
+            # scoring of early pages overlaps with fetching the rest. The scrape
+            # span is that whole overlapped loop; fetch, parse and score are
+            # also timed per page.
+            pending = deque()
+            store = get_fingerprint_store()
+            reused = 0
+            not_modified = 0
+            # Pages that get text and a score: error responses are only counted,
+            # so the store keeps the last good text the stored validators match
+            kept = []
 
-    def process_scraped_data(self):
-        try:
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            print(f"Processing data from: {app_dir}")
-            
-            result = subprocess.run(
-                ["python", "read.py"],
-                cwd=app_dir,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            print(f"Data processing return code: {result.returncode}")
-            if result.stdout:
-                print(f"Processing stdout: {result.stdout}")
-            if result.stderr:
-                print(f"Processing stderr: {result.stderr}")
-                
-        except Exception as e:
-            print(f"Error processing data: {e}")
+            def finish(page, future):
+                url = page.get("url", "unknown")
+                text, page_posts, parse_seconds = future.result()
+                if parse_seconds is not None:
+                    metrics.observe("phobos_stage_seconds", parse_seconds, stage="parse")
+                if page_posts is None:
+                    # Stored before posts were kept
+                    page_posts = posts.segment_text(text, extraction.SEPARATOR)
+                page["posts"] = page_posts
+                with metrics.span("score"):
+                    result = self.score_page(store, url, text, page_posts)
+                scored.append(dict(result, url=url, text=text))
 
-    def load_and_display_data(self):
-        try:
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            project_root = os.path.dirname(app_dir)
-            scraper_dir = os.path.join(project_root, "scraper")
-            data_path = os.path.join(scraper_dir, "data.json")
-
-            if os.path.exists(data_path):
-                with open(data_path, 'r', encoding='utf-8') as f:
-                    scraped_content = f.read()
-                self.scraped_data.emit(scraped_content)
-                print("Emitted scraped data")
-            else:
-                self.scraped_data.emit("data.json not found")
-                print("data.json not found")
+            with metrics.span("scrape"):
+                for page in get_page_source().scrape(self.urls, headers_for=self.conditional_headers(store)):
+                    print(f"Completed scraping: {page.get('url')}")
+                    pages.append(page)
+                    self.record_page(metrics, page)
+                    if not is_ok(page.get("status")):
+                        continue
+                    kept.append(page)
+                    html = page.get("html") or ""
+                    cached = store.cached_page(page.get("url", "unknown"))
+                    if str(page.get("status", "")).startswith("304") and cached is not None:
+                        # Not modified: reuse the stored text (and with it the score)
+                        not_modified += 1
+                        page["html_hash"], text = cached
+                    else:
+                        text = store.cached_text(page.get("url", "unknown"), html)
+                    if text is None:
+                        changed_urls.add(page.get("url", "unknown"))
+                        future = extraction.submit_page_timed(html)
+                    else:
+                        # Unchanged since the last cycle: skip parsing and scoring
+                        reused += 1
+                        future = Future()
+                        future.set_result((text, store.cached_posts(page.get("url", "unknown")), None))
+                    pending.append((page, future))
+                    while pending and pending[0][1].done():
+                        finish(*pending.popleft())
+                while pending:
+                    finish(*pending.popleft())
+            metrics.inc("phobos_pages_reused_total", reused)
+
+            triage = self.analyze_units(scored)
+            print(format_summary(triage))
+            alerts = sum(len(entry.get("alerts", [])) for entry in scored)
+            if alerts:
+                print(f"New flagged posts: {alerts}")
 
+            with metrics.span("emit"):
+                for entry, page in zip(scored, kept):
+                    store.update(entry["url"], page.get("html") or "", entry["text"], self.stored_result(entry),
+                                 html_hash=page.get("html_hash"), posts=page.get("posts"))
+                store.save()
+                print(f"Reused {reused} unchanged pages")
 
-            results_path = os.path.join(app_dir, "results.json")
-            if os.path.exists(results_path):
-                with open(results_path, 'r', encoding='utf-8') as f:
-                    parsed_content = f.read()
-                self.parsed_data.emit(parsed_content)
-                print("Emitted parsed data")
-                
+                print(f"Scraped {len(pages)} pages")
+                self.fetch_stats.emit(self.format_fetch_stats(pages, not_modified))
+                run_id = self.save_results(pages, kept, scored, changed_urls)
 
-                print("Starting AI analysis...")
-                ai_analysis = self.analyze_with_ai(parsed_content)
-                self.ai_results.emit(ai_analysis)
+                if scored:
+                    self.ai_results.emit(self.format_analysis(scored))
+                else:
+                    self.ai_results.emit("No data to analyze")
                 print("AI analysis completed")
-            else:
-                self.parsed_data.emit("results.json not found")
-                self.ai_results.emit("No results.json found for AI analysis")
-                print("results.json not found")
+                if run_id is not None:
+                    self.run_completed.emit(run_id)
 
+        except TimeoutError as e:
+            print("Scraper timeout")
+            metrics.inc("phobos_stage_errors_total", stage="scrape")
+            self.scraped_data.emit(str(e))
         except Exception as e:
-            error_msg = f"Error loading data: {str(e)}"
-            print(error_msg)
-            self.scraped_data.emit(error_msg)
-            self.parsed_data.emit(error_msg)
-            self.ai_results.emit(f"AI analysis error: {str(e)}")
+            print(f"Monitor error: {e}")
+            self.scraped_data.emit(f"Monitoring error: {str(e)}")
+        finally:
+            self.report_outcomes(pages, scored, changed_urls)
 
+    def save_results(self, pages, kept, scored, changed_urls):
+        try:
+            db = get_result_store()
+            run_id = db.start_run()
+            # Raw HTML is only kept when it changed; unchanged pages point at
+            # the earlier copy through html_hash
+            rows = []
+            for page in kept:
+                html = page.get("html") or ""
+                rows.append({
+                    "url": page.get("url", "unknown"),
+                    "status": page.get("status"),
+                    "html_hash": page.get("html_hash") or fingerprint(html),
+                    "html": html if page.get("url", "unknown") in changed_urls else None
+                })
+            db.add_results(run_id, rows, scored)
+            # Validators of error responses aren't kept: they would not match the stored text
+            get_url_registry().record_fetches(
+                (page.get("url", "unknown"), page.get("status"),
+                 page.get("headers", {}).get("etag") if is_ok(page.get("status")) else None,
+                 page.get("headers", {}).get("last-modified") if is_ok(page.get("status")) else None)
+                for page in pages)
+            suspicious = sum(1 for entry in scored if entry["status"] == "SUSPICIOUS")
+            db.finish_run(run_id, len(scored), suspicious)
+            return run_id
+        except Exception as e:
+            print(f"Error saving results: {e}")
+            return None
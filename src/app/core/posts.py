@@ -0,0 +1,132 @@
+import re
+
+from core.fingerprints import fingerprint
+
+# Thread markup we know, tried in order: the class of each post's container,
+# then the classes of its author, time and body inside it. page_author is a
+# page-level element naming the author of every post (profile pages).
+LAYOUTS = [
+    {"post": "comment", "author": "comment-user", "time": "comment-meta", "body": "comment-text"},
+    {"post": "chat-line", "author": "username", "time": "timestamp", "body": "message-text"},
+    {"post": "activity-item", "page_author": "profile-username", "body": "activity-body"},
+]
+
+TIME_RE = re.compile(
+    r"^(?:\d+\s*(?:s|secs?|seconds?|m|mins?|minutes?|h|hrs?|hours?|d|days?|w|wks?|weeks?|mo|months?|y|yrs?|years?)"
+    r"\s+ago|just now|yesterday|today|\d{1,2}:\d{2}(?::\d{2})?(?:\s*[ap]m)?)$", re.IGNORECASE)
+
+# Buttons and counters that surround posts in the extracted text
+CHROME_RE = re.compile(
+    r"^(?:vote|reply|like|share|report|edit|delete|quote|post comment|permalink|"
+    r"\d+\s+(?:upvotes?|downvotes?|comments?|shares?|likes?|points?|replies))$", re.IGNORECASE)
+
+MAX_AUTHOR_LENGTH = 40
+
+
+def post_id(author, body):
+    """Stable identity of a post. The time is left out: "2h ago" changes between visits."""
+    return fingerprint(f"{author}\0{body}")[:16]
+
+
+def element_text(el):
+    return " ".join(el.text_content().split()) if el is not None else ""
+
+
+def layout_roles(layouts):
+    """class name -> [(layout index, role)]"""
+    roles = {}
+    for index, layout in enumerate(layouts):
+        for role, name in layout.items():
+            roles.setdefault(name, []).append((index, role))
+    return roles
+
+
+class PostCollector:
+    """Finds posts while extraction walks the document, for all layouts at once.
+
+    Fed the start of every element that has a class, and the end of open
+    post containers. The author, time
+    and body of a post are the first ones inside its innermost open container,
+    so replies nested in a post don't take over its fields. start() returns
+    True for body elements, whose text range the walk then records.
+    """
+
+    def __init__(self, layouts=LAYOUTS):
+        self.layouts = layouts
+        self.roles = layout_roles(layouts)
+        self.found = [[] for _ in layouts]
+        self.open = [[] for _ in layouts]
+        # Open post containers -> the layouts they are posts of
+        self.containers = {}
+        self.page_authors = {}
+
+    def start(self, el, classes):
+        body = False
+        for name in classes.split():
+            for index, role in self.roles.get(name, ()):
+                if role == "post":
+                    self.open[index].append({})
+                    self.found[index].append(self.open[index][-1])
+                    self.containers.setdefault(el, []).append(index)
+                elif role == "page_author":
+                    self.page_authors.setdefault(index, el)
+                elif self.open[index] and role not in self.open[index][-1]:
+                    self.open[index][-1][role] = el
+                    body = body or role == "body"
+        return body
+
+    def end(self, el):
+        """Called at the end of each element in containers"""
+        for index in self.containers.pop(el):
+            self.open[index].pop()
+
+    def posts(self):
+        """[(author, time, body element)] for the first layout that matched"""
+        for index, layout_posts in enumerate(self.found):
+            page_author = element_text(self.page_authors.get(index))
+            posts = [(element_text(post.get("author")).rstrip(":") if "author" in self.layouts[index]
+                      else page_author, element_text(post.get("time")), post["body"])
+                     for post in layout_posts if "body" in post]
+            if posts:
+                return posts
+        return []
+
+
+def segment_text(text, separator="\n\n"):
+    """Posts found in already-extracted text, for pages with unknown markup.
+
+    A post is a short line (the author) followed by a relative time ("2h ago")
+    and then body lines up to the next author/time pair, leaving out buttons
+    and counters. Returns [{author, time, start, end}] with body offsets.
+    """
+    lines = []
+    offset = 0
+    for line in text.split(separator):
+        lines.append((offset + len(line) - len(line.lstrip()), line.strip()))
+        offset += len(line) + len(separator)
+    heads = [i for i in range(1, len(lines))
+             if TIME_RE.match(lines[i][1]) and 0 < len(lines[i - 1][1]) <= MAX_AUTHOR_LENGTH]
+    posts = []
+    for n, i in enumerate(heads):
+        stop = heads[n + 1] - 1 if n + 1 < len(heads) else len(lines)
+        body = [j for j in range(i + 1, stop) if lines[j][1] and not CHROME_RE.match(lines[j][1])]
+        if not body:
+            continue
+        # Trailing buttons end the post; anything after them is page chrome
+        last = body[0]
+        for j in body[1:]:
+            if any(CHROME_RE.match(lines[k][1]) for k in range(last + 1, j)):
+                break
+            last = j
+        start = lines[body[0]][0]
+        end = lines[last][0] + len(lines[last][1])
+        posts.append({"author": lines[i - 1][1], "time": lines[i][1], "start": start, "end": end})
+    return posts
+
+
+def with_ids(text, posts):
+    """Add each post's id and body text"""
+    for post in posts:
+        post["text"] = text[post["start"]:post["end"]]
+        post["id"] = post_id(post["author"], post["text"])
+    return posts
@@ -0,0 +1,181 @@
+import heapq
+import random
+import threading
+import time
+
+from config.app_config import (DEFAULT_INTERVAL, SCHEDULE_MIN_INTERVAL, SCHEDULE_MAX_INTERVAL,
+                               SCHEDULE_FETCH_RATE, SCHEDULE_BURST)
+from core.url_registry import get_url_registry
+
+# Weight of the latest observation in a URL's change rate
+CHANGE_ALPHA = 0.3
+# Change rate a URL starts with, and the floor that caps how far a static page backs off
+INITIAL_CHANGE_RATE = 0.5
+MIN_CHANGE_RATE = 0.02
+# Score at which a page is revisited twice as often
+SCORE_HALF_LIFE = 3
+JITTER = 0.1
+
+
+def is_ok(status):
+    """True for 2xx/3xx statuses from the scraper ("200 OK"), False for errors"""
+    return bool(status) and str(status)[:1] in ("2", "3")
+
+
+class _State:
+    __slots__ = ("interval", "next_due", "failures", "change_rate", "in_flight")
+
+    def __init__(self, interval, next_due, failures=0, change_rate=INITIAL_CHANGE_RATE):
+        self.interval = interval
+        self.next_due = next_due
+        self.failures = failures
+        self.change_rate = change_rate
+        self.in_flight = False
+
+
+class RevisitScheduler:
+    """Per-URL revisit times kept in a heap, drained under a global fetch budget.
+
+    A URL's interval is the base interval divided by how often its content
+    changes (exponentially weighted), shortened further for high threat scores.
+    Failed fetches back off exponentially. Dispatch is limited by a token
+    bucket of fetch_rate URLs per second with room for burst URLs at once.
+    State is persisted in the URL registry so back-offs survive restarts.
+    """
+
+    def __init__(self, registry, base_interval=DEFAULT_INTERVAL, min_interval=SCHEDULE_MIN_INTERVAL,
+                 max_interval=SCHEDULE_MAX_INTERVAL, fetch_rate=SCHEDULE_FETCH_RATE, burst=SCHEDULE_BURST):
+        self.registry = registry
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.fetch_rate = fetch_rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._states = {}
+        self._heap = []
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._version = None
+        saved = registry.schedule_state()
+        now = time.time()
+        for url in registry.urls():
+            interval, next_due, failures, change_rate = saved.get(url, (None, None, 0, None))
+            self._add(url, now, interval, next_due, failures or 0, change_rate)
+        self._version = registry.version
+
+    def _add(self, url, now, interval=None, next_due=None, failures=0, change_rate=None):
+        state = _State(interval or self.base_interval, next_due if next_due is not None else now,
+                       failures, change_rate if change_rate is not None else INITIAL_CHANGE_RATE)
+        self._states[url] = state
+        heapq.heappush(self._heap, (state.next_due, url))
+
+    def sync(self):
+        """Pick up URLs added to or removed from the registry since the last call"""
+        if self.registry.version == self._version:
+            return
+        with self._lock:
+            self._version = self.registry.version
+            current = set(self.registry.urls())
+            now = time.time()
+            for url in current.difference(self._states):
+                self._add(url, now)
+            for url in set(self._states).difference(current):
+                # Its heap entry is skipped lazily when it surfaces
+                del self._states[url]
+
+    def set_base_interval(self, seconds):
+        """New base interval; URLs pick it up from their next fetch on"""
+        self.base_interval = seconds
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.fetch_rate)
+        self._refilled = now
+
+    def due(self, now=None):
+        """Pop the URLs whose revisit time has come, as many as the fetch budget allows"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._refill()
+            urls = []
+            while self._heap and self._heap[0][0] <= now and len(urls) < int(self._tokens):
+                next_due, url = heapq.heappop(self._heap)
+                state = self._states.get(url)
+                # Stale heap entry: URL removed, rescheduled since, or already fetching
+                if state is None or state.next_due != next_due or state.in_flight:
+                    continue
+                state.in_flight = True
+                urls.append(url)
+            self._tokens -= len(urls)
+            return urls
+
+    def next_due_in(self, now=None):
+        """Seconds until the earliest revisit (0 if overdue), or None when nothing is scheduled"""
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._heap:
+                next_due, url = self._heap[0]
+                state = self._states.get(url)
+                if state is None or state.next_due != next_due or state.in_flight:
+                    heapq.heappop(self._heap)
+                    continue
+                return max(0.0, next_due - now)
+            return None
+
+    def _interval(self, state, score):
+        if state.failures:
+            interval = self.base_interval * (2 ** state.failures)
+        else:
+            interval = self.base_interval / max(state.change_rate, MIN_CHANGE_RATE)
+            interval /= 1 + max(score or 0, 0) / SCORE_HALF_LIFE
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        return interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def report(self, outcomes):
+        """Reschedule fetched URLs: iterable of (url, ok, changed, score)"""
+        now = time.time()
+        saved = []
+        with self._lock:
+            for url, ok, changed, score in outcomes:
+                state = self._states.get(url)
+                if state is None:
+                    continue
+                state.in_flight = False
+                if ok:
+                    state.failures = 0
+                    state.change_rate += CHANGE_ALPHA * ((1.0 if changed else 0.0) - state.change_rate)
+                else:
+                    state.failures += 1
+                state.interval = self._interval(state, score)
+                state.next_due = now + state.interval
+                heapq.heappush(self._heap, (state.next_due, url))
+                saved.append((url, state.interval, state.next_due, state.failures, state.change_rate))
+        try:
+            self.registry.save_schedule(saved)
+        except Exception as e:
+            print(f"Error saving schedule: {e}")
+
+    def stats(self):
+        with self._lock:
+            intervals = [state.interval for state in self._states.values()]
+            return {
+                "urls": len(self._states),
+                "in_flight": sum(1 for state in self._states.values() if state.in_flight),
+                "failing": sum(1 for state in self._states.values() if state.failures),
+                "min_interval": min(intervals) if intervals else None,
+                "max_interval": max(intervals) if intervals else None,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RevisitScheduler(get_url_registry())
+    return _scheduler
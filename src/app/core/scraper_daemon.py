@@ -0,0 +1,137 @@
+import atexit
+import json
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+
+from config.app_config import SCRAPER_COMMAND, SCRAPER_TIMEOUT
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRAPER_DIR = os.path.join(os.path.dirname(APP_DIR), "scraper")
+
+_EOF = object()
+
+
+class ScraperDaemon:
+    """Client for a resident scraper speaking newline-delimited JSON.
+
+    One command line is written to the daemon's stdin per crawl
+    ({"urls": [...]}, or {} for everything in url.txt). The daemon answers with
+    one {"type": "page", ...} line per fetched page, in completion order, and a
+    final {"type": "done"} line. Pages are yielded to the caller as they arrive.
+    """
+
+    def __init__(self, command=None, cwd=SCRAPER_DIR):
+        command = command or os.environ.get("PHOBOS_SCRAPER") or SCRAPER_COMMAND
+        if isinstance(command, str):
+            command = shlex.split(command)
+        self.command = list(command)
+        self.cwd = cwd
+        self.process = None
+        self._lines = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.process is not None and self.process.poll() is None:
+            return
+        print(f"Starting scraper daemon: {' '.join(self.command)}")
+        self.process = subprocess.Popen(
+            self.command,
+            cwd=self.cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._pump, args=(self.process.stdout, self._lines),
+            name="scraper-daemon-reader", daemon=True,
+        ).start()
+
+    @staticmethod
+    def _pump(stream, lines):
+        for line in stream:
+            lines.put(line)
+        lines.put(_EOF)
+
+    def scrape(self, urls=None, timeout=SCRAPER_TIMEOUT, headers_for=None):
+        """Yield page dicts ({url, status, links, html}) as the daemon streams them.
+
+        headers_for (conditional request headers) is accepted for parity with
+        FetchEngine but ignored: the Go scraper always fetches in full.
+        """
+        with self._lock:
+            self.start()
+            command = {"urls": list(urls)} if urls else {}
+            try:
+                self.process.stdin.write(json.dumps(command) + "\n")
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                self.close()
+                raise RuntimeError("Scraper daemon exited unexpectedly")
+
+            deadline = time.monotonic() + timeout
+            finished = False
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        line = self._lines.get(timeout=max(remaining, 0))
+                    except queue.Empty:
+                        raise TimeoutError(f"Scraper timeout after {timeout} seconds")
+                    if line is _EOF:
+                        raise RuntimeError("Scraper daemon exited unexpectedly")
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        print(f"Scraper: {line}")
+                        continue
+                    kind = message.pop("type", None)
+                    if kind == "page":
+                        yield message
+                    elif kind == "done":
+                        finished = True
+                        if message.get("error"):
+                            raise RuntimeError(message["error"])
+                        return
+            finally:
+                if not finished:
+                    # The daemon is mid-batch and would answer the next command
+                    # with stale pages, so it has to be restarted
+                    self.close()
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+
+_daemon = None
+_daemon_lock = threading.Lock()
+
+
+def get_scraper_daemon():
+    global _daemon
+    if _daemon is None:
+        with _daemon_lock:
+            if _daemon is None:
+                _daemon = ScraperDaemon()
+                atexit.register(_daemon.close)
+    return _daemon
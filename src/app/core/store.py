@@ -0,0 +1,230 @@
+import json
+import sqlite3
+import threading
+import time
+
+from config.app_config import RESULTS_DB_PATH, RESULTS_KEEP_RUNS, RESULTS_PRUNE_EVERY
+from core.fingerprints import SCHEMA as FINGERPRINT_SCHEMA, fingerprint
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    pages INTEGER DEFAULT 0,
+    suspicious INTEGER DEFAULT 0,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    status TEXT,
+    html_hash TEXT,
+    html TEXT,
+    text_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS texts (
+    hash TEXT PRIMARY KEY,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS scores (
+    page_id INTEGER PRIMARY KEY REFERENCES pages(id),
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    url TEXT NOT NULL,
+    scored_at REAL NOT NULL,
+    score INTEGER NOT NULL,
+    status TEXT,
+    classification TEXT,
+    ai_label TEXT,
+    ai_confidence REAL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pages_url_time ON pages(url, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_pages_time ON pages(fetched_at);
+CREATE INDEX IF NOT EXISTS idx_pages_run ON pages(run_id);
+CREATE INDEX IF NOT EXISTS idx_pages_text ON pages(text_hash);
+CREATE INDEX IF NOT EXISTS idx_scores_run_score ON scores(run_id, score);
+CREATE INDEX IF NOT EXISTS idx_scores_score ON scores(score);
+CREATE INDEX IF NOT EXISTS idx_scores_time ON scores(scored_at, page_id);
+"""
+
+RESULT_COLUMNS = """
+    s.page_id, s.run_id, s.url, s.scored_at, s.score, s.status, s.classification,
+    s.ai_label, s.ai_confidence, p.status AS fetch_status
+"""
+
+# Columns the UI may sort result rows by
+SORT_COLUMNS = {"url": "s.url", "score": "s.score", "scored_at": "s.scored_at", "status": "s.status"}
+
+
+class ResultStore:
+    """SQLite history of runs, fetched pages, extracted texts and scores.
+
+    The database runs in WAL mode, so the monitor thread can write a run while
+    the GUI reads earlier ones. Each thread gets its own connection.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+            conn.executescript(FINGERPRINT_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def start_run(self):
+        with self._conn() as conn:
+            return conn.execute("INSERT INTO runs (started_at, status) VALUES (?, 'running')",
+                                (time.time(),)).lastrowid
+
+    def add_results(self, run_id, pages, scored):
+        """Bulk-insert one run's pages, texts and scores in a single transaction.
+
+        pages and scored are aligned lists: page dicts from the scraper
+        ({url, status, html, html_hash}, html may be None when unchanged) and
+        scored entries ({url, text, score, status, classification, ...}).
+        """
+        now = time.time()
+        # Texts are stored once per distinct text; unchanged pages only add a reference
+        text_hashes = [fingerprint(entry.get("text", "")) for entry in scored]
+        texts = dict(zip(text_hashes, (entry.get("text", "") for entry in scored)))
+        conn = self._conn()
+        with conn:
+            cursor = conn.cursor()
+            page_ids = []
+            for page, text_hash in zip(pages, text_hashes):
+                cursor.execute(
+                    "INSERT INTO pages (run_id, url, fetched_at, status, html_hash, html, text_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, page.get("url"), now, page.get("status"), page.get("html_hash"), page.get("html"),
+                     text_hash))
+                page_ids.append(cursor.lastrowid)
+            cursor.executemany("INSERT OR IGNORE INTO texts (hash, text) VALUES (?, ?)", texts.items())
+            cursor.executemany(
+                """INSERT INTO scores (page_id, run_id, url, scored_at, score, status, classification,
+                                       ai_label, ai_confidence, details)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(page_id, run_id, entry["url"], now, entry.get("score", 0), entry.get("status"),
+                  entry.get("classification"), entry.get("ai_label"), entry.get("ai_confidence"),
+                  json.dumps({k: entry[k] for k in ("hits", "matches", "llm_report", "new_posts", "alerts")
+                              if k in entry}))
+                 for page_id, entry in zip(page_ids, scored)])
+        return page_ids
+
+    def finish_run(self, run_id, pages, suspicious, status="ok"):
+        with self._conn() as conn:
+            conn.execute("UPDATE runs SET finished_at = ?, pages = ?, suspicious = ?, status = ? WHERE id = ?",
+                         (time.time(), pages, suspicious, status, run_id))
+        if RESULTS_KEEP_RUNS and run_id % RESULTS_PRUNE_EVERY == 0:
+            self.prune(RESULTS_KEEP_RUNS)
+
+    def prune(self, keep_runs=RESULTS_KEEP_RUNS):
+        """Delete all but the last keep_runs runs, with their pages and scores
+        and the texts no remaining page or fingerprint uses; returns the number
+        of runs deleted"""
+        conn = self._conn()
+        row = conn.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?", (keep_runs - 1,)).fetchone()
+        if row is None:
+            return 0
+        cutoff = row[0]
+        with conn:
+            # Unchanged pages store no HTML and point at the last row that did;
+            # move it into a kept row before that one goes
+            conn.execute(
+                """UPDATE pages SET html = (
+                       SELECT o.html FROM pages o
+                       WHERE o.url = pages.url AND o.html_hash = pages.html_hash AND o.html IS NOT NULL
+                       ORDER BY o.id DESC LIMIT 1)
+                   WHERE id IN (
+                       SELECT MIN(p.id) FROM pages p
+                       WHERE p.run_id >= ? AND p.html IS NULL AND p.html_hash IS NOT NULL
+                         AND NOT EXISTS (SELECT 1 FROM pages k
+                                         WHERE k.url = p.url AND k.html_hash = p.html_hash
+                                           AND k.html IS NOT NULL AND k.run_id >= ?)
+                       GROUP BY p.url, p.html_hash)""", (cutoff, cutoff))
+            conn.execute("DELETE FROM scores WHERE run_id < ?", (cutoff,))
+            conn.execute("DELETE FROM pages WHERE run_id < ?", (cutoff,))
+            runs = conn.execute("DELETE FROM runs WHERE id < ?", (cutoff,)).rowcount
+            conn.execute("DELETE FROM texts WHERE NOT EXISTS (SELECT 1 FROM pages WHERE pages.text_hash = texts.hash) "
+                         "AND NOT EXISTS (SELECT 1 FROM fingerprints f WHERE f.text_hash = texts.hash)")
+        if runs:
+            print(f"Pruned {runs} old runs from the result store")
+        return runs
+
+    def get_run(self, run_id):
+        row = self._conn().execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def results(self, run_id=None, offset=0, limit=100, min_score=None, order_by="score", descending=True):
+        """Scored rows (without text/html), one run or all runs, for paged views"""
+        where, params = [], []
+        if run_id is not None:
+            where.append("s.run_id = ?")
+            params.append(run_id)
+        if min_score is not None:
+            where.append("s.score >= ?")
+            params.append(min_score)
+        sql = f"SELECT {RESULT_COLUMNS} FROM scores s JOIN pages p ON p.id = s.page_id"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # page_id breaks ties in the same direction, so one index serves both
+        direction = "DESC" if descending else "ASC"
+        sql += f" ORDER BY {SORT_COLUMNS.get(order_by, 's.score')} {direction}, s.page_id {direction}"
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        return [dict(row) for row in self._conn().execute(sql, params)]
+
+    def count_results(self, run_id=None, min_score=None):
+        where, params = [], []
+        if run_id is not None:
+            where.append("run_id = ?")
+            params.append(run_id)
+        if min_score is not None:
+            where.append("score >= ?")
+            params.append(min_score)
+        sql = "SELECT COUNT(*) FROM scores"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._conn().execute(sql, params).fetchone()[0]
+
+    def page_text(self, page_id):
+        row = self._conn().execute(
+            "SELECT t.text FROM pages p JOIN texts t ON t.hash = p.text_hash WHERE p.id = ?", (page_id,)).fetchone()
+        return row[0] if row else None
+
+    def page_html(self, page_id):
+        """Raw HTML for a page; unchanged pages point at the last run that stored it"""
+        row = self._conn().execute("SELECT url, html, html_hash FROM pages WHERE id = ?", (page_id,)).fetchone()
+        if row is None:
+            return None
+        if row["html"] is not None or row["html_hash"] is None:
+            return row["html"]
+        row = self._conn().execute(
+            "SELECT html FROM pages WHERE url = ? AND html_hash = ? AND html IS NOT NULL "
+            "ORDER BY id DESC LIMIT 1", (row["url"], row["html_hash"])).fetchone()
+        return row[0] if row else None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResultStore()
+    return _store
@@ -0,0 +1,70 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+from config.app_config import LOG_BACKUP_COUNT, LOG_BUFFER_SIZE, LOG_FILE_MAX_BYTES, LOG_FILE_PATH
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            "ts": record.created,
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": getattr(record, "phobos_level", record.levelname),
+            "message": record.getMessage(),
+        }, ensure_ascii=False)
+
+
+class SystemLog:
+    """Bounded in-memory log with a rotating JSON Lines file sink.
+
+    Records are kept in a ring buffer of `capacity` entries. Records not yet
+    shown by the UI wait in a second bounded queue so the UI can drain them in
+    batches on a timer instead of repainting on every message.
+    """
+
+    LEVELS = {"INFO": logging.INFO, "SUCCESS": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+
+    def __init__(self, capacity=LOG_BUFFER_SIZE, path=LOG_FILE_PATH,
+                 max_bytes=LOG_FILE_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+        self.records = deque(maxlen=capacity)
+        self.pending = deque(maxlen=capacity)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(f"phobos.system.{id(self)}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if path:
+            try:
+                handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+                handler.setFormatter(JsonLinesFormatter())
+                self.logger.addHandler(handler)
+            except OSError as e:
+                print(f"System log file disabled: {e}")
+
+    def log(self, message, level="INFO"):
+        record = {"ts": time.time(), "level": level, "message": str(message)}
+        with self._lock:
+            if len(self.pending) == self.pending.maxlen:
+                self.dropped += 1
+            self.records.append(record)
+            self.pending.append(record)
+        self.logger.log(self.LEVELS.get(level, logging.INFO), record["message"], extra={"phobos_level": level})
+        return record
+
+    def take_pending(self):
+        """Records logged since the last call, and how many were dropped meanwhile"""
+        with self._lock:
+            records = list(self.pending)
+            self.pending.clear()
+            dropped, self.dropped = self.dropped, 0
+        return records, dropped
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.pending.clear()
+            self.dropped = 0
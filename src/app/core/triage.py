@@ -0,0 +1,145 @@
+from config.app_config import (CHUNK_MAX_WINDOWS, CHUNK_OVERLAP, CHUNK_TOP_K, TRIAGE_CLASSIFIER_THRESHOLD,
+                               TRIAGE_CLASSIFIER_WEIGHT, TRIAGE_KEYWORD_THRESHOLD, TRIAGE_LLM_SECONDS,
+                               TRIAGE_LLM_TOKENS)
+from core import chunking
+from core.llm_service import WINDOW_CHARS, build_prompt, estimate_tokens, get_llm_service, merge_reports
+from core.metrics import get_metrics
+
+
+def suspicious_confidence(entry):
+    """Classifier probability that the entry is suspicious (0 when unclassified)"""
+    label = entry.get("ai_label")
+    confidence = entry.get("ai_confidence") or 0.0
+    if label == "suspicious":
+        return confidence
+    if label is not None:
+        return 1.0 - confidence
+    return 0.0
+
+
+class TriageCascade:
+    """Keyword scorer -> TF-IDF classifier -> LLM report.
+
+    Entries (whole pages, or the posts of threads) arrive with the two cheap
+    tiers already applied (score_entry and classify_scored). Those past
+    either escalation threshold are ranked by priority, and the top_k hottest windows of each (classifier probability
+    plus keyword matches inside the window) are sent to the LLM, one prompt
+    and one memo entry per window, until the budget is spent. The budget
+    covers the whole report queue, so a slow model sheds new work instead of
+    falling further behind every cycle. Memoized reports cost nothing and are
+    always attached.
+    """
+
+    def __init__(self, service=None, keyword_threshold=TRIAGE_KEYWORD_THRESHOLD,
+                 classifier_threshold=TRIAGE_CLASSIFIER_THRESHOLD, classifier_weight=TRIAGE_CLASSIFIER_WEIGHT,
+                 budget_seconds=TRIAGE_LLM_SECONDS, budget_tokens=TRIAGE_LLM_TOKENS, top_k=CHUNK_TOP_K):
+        self.service = service or get_llm_service()
+        self.top_k = top_k
+        self.keyword_threshold = keyword_threshold
+        self.classifier_threshold = classifier_threshold
+        self.classifier_weight = classifier_weight
+        self.budget_seconds = budget_seconds
+        self.budget_tokens = budget_tokens
+
+    def priority(self, entry):
+        return entry.get("score", 0) + self.classifier_weight * suspicious_confidence(entry)
+
+    def escalates(self, entry):
+        return (entry.get("score", 0) >= self.keyword_threshold
+                or (entry.get("ai_label") == "suspicious"
+                    and (entry.get("ai_confidence") or 0.0) >= self.classifier_threshold))
+
+    def page_windows(self, entry):
+        """[start, end, probability] per window, from the classifier when it ran"""
+        if entry.get("ai_chunks"):
+            return entry["ai_chunks"]
+        return [[start, end, 0.0]
+                for start, end in chunking.windows(entry["text"], WINDOW_CHARS, CHUNK_OVERLAP, CHUNK_MAX_WINDOWS)]
+
+    def hot_windows(self, entry):
+        """(start, end, prompt text) of the top_k windows most worth an LLM report"""
+        text = entry["text"]
+        offsets = [match[1] for match in entry.get("matches", [])]
+
+        def heat(window):
+            start, end, probability = window
+            return self.classifier_weight * probability + sum(1 for offset in offsets if start <= offset < end)
+
+        top = sorted(self.page_windows(entry), key=heat, reverse=True)[:self.top_k]
+        return [(start, end, chunking.focus(text, start, end, offsets, WINDOW_CHARS)) for start, end, _ in top]
+
+    def within_budget(self, seconds, tokens):
+        if self.budget_seconds is not None and seconds > self.budget_seconds:
+            return False
+        if self.budget_tokens is not None and tokens > self.budget_tokens:
+            return False
+        return True
+
+    def run(self, scored):
+        """Attach memoized reports and queue new LLM work; returns per-tier counts.
+
+        escalated/avoided count pages; cached, queued, pending and over_budget
+        count windows.
+        """
+        summary = {"entries": len(scored), "escalated": 0, "avoided": 0, "windows": 0, "cached": 0, "queued": 0,
+                   "pending": 0, "over_budget": 0, "tokens_avoided": 0}
+        metrics = get_metrics()
+        metrics.inc("phobos_triage_total", len(scored), tier="keyword")
+        metrics.inc("phobos_triage_total", sum(1 for entry in scored if "ai_label" in entry), tier="classifier")
+        if not self.service.enabled:
+            return summary
+
+        candidates = []
+        for entry in scored:
+            if self.escalates(entry):
+                candidates.append(entry)
+            else:
+                # What covering the whole page with the LLM would have cost
+                summary["tokens_avoided"] += sum(estimate_tokens(build_prompt(entry["text"][start:end]))
+                                                 for start, end, _ in self.page_windows(entry))
+        candidates.sort(key=self.priority, reverse=True)
+        summary["escalated"] = len(candidates)
+        summary["avoided"] = len(scored) - len(candidates)
+        seconds = self.service.backlog_seconds()
+        tokens = self.service.queued_tokens
+        for entry in candidates:
+            reports = []
+            for start, end, window in self.hot_windows(entry):
+                summary["windows"] += 1
+                cost = estimate_tokens(build_prompt(window))
+                report = self.service.cached(window)
+                if report is not None:
+                    reports.append((start, f"chars {start}-{end}", report))
+                    summary["cached"] += 1
+                    summary["tokens_avoided"] += cost
+                    continue
+                if self.service.is_pending(window):
+                    summary["pending"] += 1
+                    continue
+                if not self.within_budget(seconds + self.service.seconds_per_report, tokens + cost):
+                    summary["over_budget"] += 1
+                    summary["tokens_avoided"] += cost
+                    continue
+                if self.service.submit(entry["url"], window) is None:
+                    break
+                seconds += self.service.seconds_per_report
+                tokens += cost
+                summary["queued"] += 1
+            if reports:
+                entry["llm_report"] = merge_reports([(heading, report) for _, heading, report in sorted(reports)])
+
+        metrics.inc("phobos_triage_total", summary["queued"], tier="llm")
+        metrics.inc("phobos_llm_avoided_total", summary["avoided"], reason="below_threshold")
+        metrics.inc("phobos_llm_avoided_total", summary["cached"], reason="memoized")
+        metrics.inc("phobos_llm_avoided_total", summary["over_budget"], reason="over_budget")
+        skipped = summary["avoided"] + summary["cached"] + summary["over_budget"]
+        metrics.inc("phobos_llm_seconds_avoided_total", round(skipped * self.service.seconds_per_report, 3))
+        metrics.inc("phobos_llm_tokens_avoided_total", summary["tokens_avoided"])
+        return summary
+
+
+def format_summary(summary):
+    return (f"Triage: {summary['entries']} entries, {summary['escalated']} escalated to the LLM as "
+            f"{summary['windows']} windows ({summary['cached']} memoized, {summary['queued']} queued, "
+            f"{summary['pending']} already queued, {summary['over_budget']} over budget), "
+            f"{summary['avoided']} stopped at the cheap tiers")
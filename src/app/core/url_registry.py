@@ -0,0 +1,260 @@
+import atexit
+import bisect
+import os
+import sqlite3
+import threading
+import time
+
+from config.app_config import URL_DB_PATH, URL_EXPORT_DELAY, URL_FILE_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    added_by TEXT,
+    added_at REAL,
+    last_fetch REAL,
+    last_status TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    revisit_interval REAL,
+    next_due REAL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    change_rate REAL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_priority ON urls(priority);
+"""
+
+FIELDS = ("url", "added_by", "added_at", "last_fetch", "last_status", "etag", "last_modified", "priority")
+
+
+class UrlRegistry:
+    """Monitored URLs with per-URL metadata, backed by SQLite.
+
+    Membership and listing positions are answered from an in-memory index.
+    Every change is committed in one SQLite transaction and then mirrored to
+    url.txt, which is replaced atomically so the Go scraper never reads a
+    half-written list; after removals that rewrite is deferred by export_delay
+    seconds so a run of them costs one.
+    """
+
+    def __init__(self, db_path=URL_DB_PATH, export_path=URL_FILE_PATH, export_delay=URL_EXPORT_DELAY):
+        self.db_path = db_path
+        self.export_path = export_path
+        self.export_delay = export_delay
+        self._export_timer = None
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Bumped on every add/remove so watchers can cheaply spot changes
+        self.version = 0
+        # Listing order as slots (None where a URL was removed), the slot of each
+        # URL, and the removed slots in order: a URL's position is its slot less
+        # the removed slots before it, so a removal doesn't shift the others
+        self._slots = [row["url"] for row in self._conn.execute("SELECT url FROM urls ORDER BY id")]
+        self._slot = {url: slot for slot, url in enumerate(self._slots)}
+        self._removed = []
+        atexit.register(self.flush)
+        if not self._slots and os.path.exists(export_path):
+            with open(export_path, "r", encoding="utf-8") as f:
+                self.bulk_import((line for line in f), added_by="url.txt")
+        else:
+            # The registry is the source of truth; repair any stale or torn url.txt
+            self.export()
+
+    def __contains__(self, url):
+        return url.strip() in self._slot
+
+    def __len__(self):
+        return len(self._slot)
+
+    def __iter__(self):
+        return iter(self.urls())
+
+    def urls(self):
+        with self._lock:
+            if not self._removed:
+                return list(self._slots)
+            return [url for url in self._slots if url is not None]
+
+    def url_at(self, index):
+        """URL at position index of the listing order"""
+        with self._lock:
+            if index < 0:
+                index += len(self._slot)
+            if not 0 <= index < len(self._slot):
+                raise IndexError("url index out of range")
+            # The first slot with index live slots before it
+            slot = index
+            while True:
+                moved = index + bisect.bisect_right(self._removed, slot)
+                if moved == slot:
+                    return self._slots[slot]
+                slot = moved
+
+    def index_of(self, url):
+        """Position of url in the listing order, or -1"""
+        with self._lock:
+            slot = self._slot.get(url.strip())
+            if slot is None:
+                return -1
+            return slot - bisect.bisect_left(self._removed, slot)
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(FIELDS)} FROM urls WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def add(self, url, added_by="ui", priority=0):
+        """Add one URL; returns False if it is already monitored"""
+        url = url.strip()
+        with self._lock:
+            if not url or url in self._slot:
+                return False
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO urls (url, added_by, added_at, priority) VALUES (?, ?, ?, ?)",
+                    (url, added_by, time.time(), priority))
+            self._slot[url] = len(self._slots)
+            self._slots.append(url)
+            self.version += 1
+            # Appending keeps a single add O(1); a torn line after a crash is
+            # repaired by the next full export
+            with open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(url + "\n")
+        return True
+
+    def bulk_import(self, urls, added_by="import", priority=0):
+        """Add many URLs in one transaction; returns the ones that were new"""
+        now = time.time()
+        with self._lock:
+            new = []
+            seen = set()
+            for url in urls:
+                url = url.strip()
+                if url and url not in self._slot and url not in seen:
+                    seen.add(url)
+                    new.append(url)
+            if not new:
+                return []
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO urls (url, added_by, added_at, priority) VALUES (?, ?, ?, ?)",
+                    ((url, added_by, now, priority) for url in new))
+            self._slot.update(zip(new, range(len(self._slots), len(self._slots) + len(new))))
+            self._slots.extend(new)
+            self.version += 1
+            self.export()
+        return new
+
+    def remove(self, url):
+        url = url.strip()
+        with self._lock:
+            if url not in self._slot:
+                return False
+            with self._conn:
+                self._conn.execute("DELETE FROM urls WHERE url = ?", (url,))
+            slot = self._slot.pop(url)
+            self._slots[slot] = None
+            bisect.insort(self._removed, slot)
+            # Drop the empty slots once they outnumber the URLs
+            if len(self._removed) > len(self._slot):
+                self._slots = [url for url in self._slots if url is not None]
+                self._slot = {url: slot for slot, url in enumerate(self._slots)}
+                self._removed = []
+            self.version += 1
+            self.export_soon()
+        return True
+
+    def clear(self):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM urls")
+            self._slots = []
+            self._slot = {}
+            self._removed = []
+            self.version += 1
+            self.export()
+
+    def validators(self, urls):
+        """{url: (etag, last_modified)} for the given URLs that have either"""
+        urls = list(urls)
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        with self._lock:
+            for i in range(0, len(urls), 900):
+                chunk = urls[i:i + 900]
+                rows = self._conn.execute(
+                    f"SELECT url, etag, last_modified FROM urls WHERE url IN ({', '.join('?' * len(chunk))}) "
+                    "AND (etag IS NOT NULL OR last_modified IS NOT NULL)", chunk)
+                found.update((row["url"], (row["etag"], row["last_modified"])) for row in rows)
+        return found
+
+    def record_fetches(self, fetches):
+        """Store fetch outcomes: iterable of (url, status, etag, last_modified)"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE urls SET last_fetch = ?, last_status = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                ((now, status, etag, last_modified, url) for url, status, etag, last_modified in fetches))
+
+    def schedule_state(self):
+        """{url: (revisit_interval, next_due, failures, change_rate)} as last saved"""
+        with self._lock:
+            return {row["url"]: (row["revisit_interval"], row["next_due"], row["failures"], row["change_rate"])
+                    for row in self._conn.execute(
+                        "SELECT url, revisit_interval, next_due, failures, change_rate FROM urls")}
+
+    def save_schedule(self, rows):
+        """Persist scheduler state: iterable of (url, revisit_interval, next_due, failures, change_rate)"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE urls SET revisit_interval = ?, next_due = ?, failures = ?, change_rate = ? WHERE url = ?",
+                ((interval, next_due, failures, change_rate, url)
+                 for url, interval, next_due, failures, change_rate in rows))
+
+    def export_soon(self):
+        """export() in export_delay seconds, unless one is already due"""
+        with self._lock:
+            if not self.export_delay:
+                self.export()
+            elif self._export_timer is None:
+                self._export_timer = threading.Timer(self.export_delay, self.export)
+                self._export_timer.daemon = True
+                self._export_timer.start()
+
+    def flush(self):
+        """Run a deferred export now, if one is due"""
+        if self._export_timer is not None:
+            self.export()
+
+    def export(self):
+        """Atomically rewrite url.txt from the registry"""
+        with self._lock:
+            if self._export_timer is not None:
+                self._export_timer.cancel()
+                self._export_timer = None
+            tmp_path = self.export_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("".join(url + "\n" for url in self.urls()))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.export_path)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_url_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = UrlRegistry()
+    return _registry
@@ -0,0 +1,272 @@
+"""Compact, memory-mapped form of a TF-IDF + LogisticRegression pipeline.
+
+export_model() writes the fitted pipeline as a directory of .npy arrays plus a
+meta.json: the vocabulary as sorted 64-bit hashes of its terms (with the
+matching column of each, and the keys of the hash function), the IDF weights and the coefficients as float32.
+CompactClassifier loads it with NumPy alone. The arrays are memory-mapped, so
+loading takes milliseconds instead of unpickling a vocabulary dict, and every
+process serving the same model shares one copy in the page cache. It
+reproduces the pipeline's predict_proba to within float32 rounding.
+PHOBOS_CLASSIFIER=compact makes the monitor serve it.
+
+    cd src/app && python -m model.compact                      # threat_classifier.pkl
+    cd src/app && python -m model.compact --model ../../anti_india_detector.pkl --output ../../anti_india_detector.compact
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from config.app_config import APP_DIR, COMPACT_MODEL_DIR, THREAT_MODEL_PATH
+
+FORMAT_VERSION = 1
+ARRAYS = ("keys", "hashes", "columns", "idf", "coef", "intercept")
+# Documents featurized together: one hash, lookup and scoring pass each
+BATCH_SIZE = 1024
+
+
+def term_hashes(terms, keys):
+    """64-bit hashes of terms, computed for all of them at once.
+
+    Multilinear hashing over the terms' code points: each position has its own
+    random odd 64-bit key, and products and sums wrap around. Returns
+    (hashes, known), known being False for terms longer than any vocabulary
+    term (they can't be in it, and truncating them could collide).
+    """
+    # Drop those before building the array: it is as wide as its longest term,
+    # and one run-on n-gram would otherwise widen every row
+    known = np.fromiter((len(term) <= len(keys) for term in terms), dtype=bool, count=len(terms))
+    if not known.all():
+        terms = [term if fits else "" for term, fits in zip(terms, known)]
+    array = np.array(terms, dtype=str)
+    width = array.dtype.itemsize // 4
+    codes = array.view(np.uint32).reshape(len(array), width)
+    return codes.astype(np.uint64) @ keys[:width], known
+
+
+def word_ngrams(tokens, ngram_range):
+    """Same n-grams, in the same order, as sklearn's _VectorizerMixin._word_ngrams"""
+    min_n, max_n = ngram_range
+    grams = list(tokens) if min_n == 1 else []
+    for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+        grams.extend(map(" ".join, zip(*(tokens[i:] for i in range(n)))))
+    return grams
+
+
+class CompactClassifier:
+    """NumPy-only predict/predict_proba over an exported model directory.
+
+    Exposes classes_, predict and predict_proba like the sklearn Pipeline, so
+    classify_batch and MonitorWorker take either.
+    """
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.classes_ = np.array(meta["classes"])
+        self.lowercase = meta["lowercase"]
+        self.token_re = re.compile(meta["token_pattern"])
+        self.ngram_range = tuple(meta["ngram_range"])
+        self.stop_words = frozenset(meta["stop_words"] or ())
+        self.binary = meta["binary"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.norm = meta["norm"]
+        self.keys = arrays["keys"]
+        self.hashes = arrays["hashes"]
+        self.columns = arrays["columns"]
+        self.idf = arrays.get("idf")
+        self.coef = arrays["coef"]
+        self.intercept = arrays["intercept"]
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Load from an export directory or its meta.json"""
+        directory = os.path.dirname(path) if path.endswith(".json") else path
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"unsupported compact model format: {meta.get('format')}")
+        arrays = {name: np.load(os.path.join(directory, filename), mmap_mode=mmap_mode)
+                  for name, filename in meta["arrays"].items()}
+        return cls(meta, arrays)
+
+    def analyze(self, text):
+        if self.lowercase:
+            text = text.lower()
+        tokens = [token for token in self.token_re.findall(text) if token not in self.stop_words]
+        return word_ngrams(tokens, self.ngram_range)
+
+    def features(self, texts):
+        """(document index, column, tf-idf value) of every known term of texts,
+        normalized per document like the vectorizer"""
+        terms = []
+        lengths = []
+        for text in texts:
+            grams = self.analyze(text)
+            terms.extend(grams)
+            lengths.append(len(grams))
+        if not terms:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        hashes, known = term_hashes(terms, self.keys)
+        positions = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+        known &= self.hashes[positions] == hashes
+        # Count each (document, column) pair: the term frequencies
+        n_features = len(self.coef)
+        pairs = np.repeat(np.arange(len(texts)), lengths)[known] * n_features + self.columns[positions[known]]
+        pairs, tf = np.unique(pairs, return_counts=True)
+        documents, columns = np.divmod(pairs, n_features)
+        values = tf.astype(np.float64)
+        if self.binary:
+            values = np.ones_like(values)
+        elif self.sublinear_tf:
+            values = 1 + np.log(values)
+        if self.idf is not None:
+            values = values * self.idf[columns]
+        if self.norm in ("l1", "l2"):
+            weights = np.abs(values) if self.norm == "l1" else values * values
+            norms = np.bincount(documents, weights=weights, minlength=len(texts))
+            if self.norm == "l2":
+                norms = np.sqrt(norms)
+            norms[norms == 0] = 1
+            values = values / norms[documents]
+        return documents, columns, values
+
+    def decision_function(self, texts):
+        texts = list(texts)
+        scores = np.empty((len(texts), self.coef.shape[1]))
+        for start in range(0, len(texts), BATCH_SIZE):
+            batch = texts[start:start + BATCH_SIZE]
+            documents, columns, values = self.features(batch)
+            weighted = self.coef[columns] * values[:, None]
+            for k in range(scores.shape[1]):
+                scores[start:start + len(batch), k] = np.bincount(documents, weights=weighted[:, k],
+                                                                  minlength=len(batch))
+        return scores + self.intercept
+
+    def predict_proba(self, texts):
+        scores = self.decision_function(texts)
+        if scores.shape[1] == 1:
+            positive = 1 / (1 + np.exp(-scores[:, 0]))
+            return np.column_stack([1 - positive, positive])
+        scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict(self, texts):
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
+
+
+def export_model(model, directory=COMPACT_MODEL_DIR):
+    """Write a fitted Pipeline(TfidfVectorizer, LogisticRegression) to directory
+
+    Arrays are written under content-addressed names and meta.json is replaced
+    last, so a reader (or the model registry watching meta.json) never sees a
+    half-written model. Returns the loaded CompactClassifier.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    vectorizer, classifier = model.steps[0][1], model.steps[-1][1]
+    if not isinstance(vectorizer, TfidfVectorizer) or not isinstance(classifier, LogisticRegression):
+        raise ValueError("only Pipeline(TfidfVectorizer, LogisticRegression) models can be exported")
+    if (vectorizer.analyzer != "word" or vectorizer.preprocessor is not None or vectorizer.tokenizer is not None
+            or vectorizer.strip_accents):
+        raise ValueError("only word analyzers with the default preprocessor and tokenizer can be exported")
+
+    terms = list(vectorizer.vocabulary_)
+    width = max(len(term) for term in terms)
+    keys = np.random.default_rng(0).integers(0, 2 ** 63, width, dtype=np.uint64) * 2 + 1
+    hashes, _ = term_hashes(terms, keys)
+    order = np.argsort(hashes)
+    if len(np.unique(hashes)) != len(hashes):
+        raise ValueError("vocabulary hash collision")
+    stop_words = vectorizer.get_stop_words()
+    arrays = {
+        "keys": keys,
+        "hashes": hashes[order],
+        "columns": np.array([vectorizer.vocabulary_[term] for term in terms], dtype=np.int32)[order],
+        "idf": vectorizer.idf_.astype(np.float32) if vectorizer.use_idf else None,
+        # Features x classes, so gathering a document's columns reads whole rows
+        "coef": np.ascontiguousarray(classifier.coef_.T, dtype=np.float32),
+        "intercept": np.asarray(classifier.intercept_, dtype=np.float32),
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    filenames = {}
+    for name in ARRAYS:
+        array = arrays[name]
+        if array is None:
+            continue
+        digest = hashlib.blake2b(array.tobytes(), digest_size=8).hexdigest()
+        filenames[name] = f"{name}-{digest}.npy"
+        path = os.path.join(directory, filenames[name])
+        if not os.path.exists(path):
+            np.save(path + ".tmp.npy", array)
+            os.replace(path + ".tmp.npy", path)
+    meta = {
+        "format": FORMAT_VERSION,
+        "classes": classifier.classes_.tolist(),
+        "lowercase": vectorizer.lowercase,
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "binary": vectorizer.binary,
+        "sublinear_tf": vectorizer.sublinear_tf,
+        "norm": vectorizer.norm,
+        "arrays": filenames,
+    }
+    meta_path = os.path.join(directory, "meta.json")
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+
+    # Arrays of earlier exports; Windows won't delete ones still mapped, retried next export
+    for filename in os.listdir(directory):
+        if filename.endswith(".npy") and filename not in filenames.values():
+            try:
+                os.remove(os.path.join(directory, filename))
+            except OSError:
+                pass
+    return CompactClassifier.load(directory)
+
+
+def max_difference(model, compact, texts):
+    """Largest absolute predict_proba difference between the pipeline and its export"""
+    if not texts:
+        return 0.0
+    return float(np.abs(model.predict_proba(texts) - compact.predict_proba(texts)).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=THREAT_MODEL_PATH, help="joblib-pickled pipeline to export")
+    parser.add_argument("--output", default=COMPACT_MODEL_DIR, help="export directory")
+    parser.add_argument("--check", default=os.path.join(APP_DIR, "model", "train.json"),
+                        help="train.json or JSON Lines whose texts are used to check predict_proba parity")
+    parser.add_argument("--tolerance", type=float, default=1e-5)
+    args = parser.parse_args()
+
+    import joblib
+    from model.online import load_examples
+
+    model = joblib.load(args.model)
+    compact = export_model(model, args.output)
+    size = sum(os.path.getsize(os.path.join(args.output, filename)) for filename in os.listdir(args.output))
+    print(f"Exported {args.model} ({os.path.getsize(args.model) / 1024:.0f} KB) to {args.output} "
+          f"({size / 1024:.0f} KB, {len(compact.hashes)} terms, classes: {', '.join(compact.classes_)})")
+
+    start = time.perf_counter()
+    CompactClassifier.load(args.output)
+    print(f"Compact model loads in {(time.perf_counter() - start) * 1000:.2f} ms")
+    if args.check:
+        texts, _ = load_examples(args.check)
+        difference = max_difference(model, compact, texts)
+        print(f"Max predict_proba difference on {len(texts)} texts: {difference:.2e}")
+        if difference > args.tolerance:
+            raise SystemExit(f"Compact model differs from the pipeline by more than {args.tolerance}")
+
+
+if __name__ == "__main__":
+    main()
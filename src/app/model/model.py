@@ -1,12 +1,10 @@
 import json
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import Pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, accuracy_score
 import joblib
 
+# sklearn is imported where a model is built or evaluated: classify_batch also
+# serves the compact model, whose processes never need it
+
 def load_training_data():
     """Load training data from train.json"""
     with open("train.json", "r", encoding="utf-8") as f:
@@ -17,8 +15,33 @@ def load_training_data():
     
     return texts, labels
 
+def build_pipeline(memory=None):
+    """Unfitted TF-IDF (1-3 grams) + LogisticRegression batch classifier
+
+    memory (a joblib.Memory or directory) caches the fitted TF-IDF step.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline([
+        ('tfidf', TfidfVectorizer(
+            max_features=5000,
+            ngram_range=(1, 3),
+            stop_words='english',
+            lowercase=True
+        )),
+        ('classifier', LogisticRegression(
+            random_state=42,
+            class_weight='balanced'
+        ))
+    ], memory=memory)
+
 def train_model():
     """Train the suspicious content classifier"""
+    from sklearn.metrics import accuracy_score, classification_report
+    from sklearn.model_selection import train_test_split
+
     print("Loading training data...")
     texts, labels = load_training_data()
     
@@ -32,18 +55,7 @@ def train_model():
     )
     
     # Create pipeline
-    model = Pipeline([
-        ('tfidf', TfidfVectorizer(
-            max_features=5000,
-            ngram_range=(1, 3),
-            stop_words='english',
-            lowercase=True
-        )),
-        ('classifier', LogisticRegression(
-            random_state=42,
-            class_weight='balanced'
-        ))
-    ])
+    model = build_pipeline()
     
     print("Training model...")
     model.fit(X_train, y_train)
@@ -62,12 +74,38 @@ def train_model():
     
     return model
 
+def classify_batch(model, entries):
+    """Classify many entries with a single TF-IDF transform and predict_proba call
+
+    Entries may be result dicts (with a "text" key) or plain strings. Returns
+    NumPy arrays aligned with the input: labels, confidence (probability of
+    the predicted label) and the full probability matrix, plus the classes.
+    """
+    texts = [entry.get("text", "") if isinstance(entry, dict) else entry for entry in entries]
+    classes = model.classes_
+    if not texts:
+        return {
+            "labels": np.empty(0, dtype=classes.dtype),
+            "confidence": np.empty(0),
+            "probabilities": np.empty((0, len(classes))),
+            "classes": classes
+        }
+    
+    probabilities = model.predict_proba(texts)
+    best = probabilities.argmax(axis=1)
+    
+    return {
+        "labels": classes[best],
+        "confidence": probabilities[np.arange(len(texts)), best],
+        "probabilities": probabilities,
+        "classes": classes
+    }
+
 def analyze_content(model, text):
     """Analyze content for suspicious activity"""
-    prediction = model.predict([text])[0]
-    confidence = model.predict_proba([text])[0].max()
+    result = classify_batch(model, [text])
     
-    return prediction, confidence
+    return result["labels"][0], result["confidence"][0]
 
 def main():
     # Train model
@@ -88,13 +126,12 @@ def main():
     print("ANALYZING SCRAPED DATA")
     print("="*60)
     
-    # Analyze each entry
-    for i, entry in enumerate(data, 1):
+    # Analyze all entries in one batch
+    result = classify_batch(model, data)
+    for i, (entry, prediction, confidence) in enumerate(zip(data, result["labels"], result["confidence"]), 1):
         url = entry.get("url", "")
         text = entry.get("text", "")
         
-        prediction, confidence = analyze_content(model, text)
-        
         print(f"\nEntry {i}:")
         print(f"URL: {url}")
         print(f"Classification: {prediction.upper()}")
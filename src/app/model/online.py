@@ -0,0 +1,225 @@
+"""Online threat classifier: stateless hashing features + SGD logistic regression.
+
+Unlike the TF-IDF pipeline in model.py there is no vocabulary to fit, so new
+labelled examples are folded in with partial_fit in a few milliseconds
+instead of retraining on the whole of train.json.
+
+    cd src/app && python -m model.online              # fit on train.json, checkpoint
+    cd src/app && python -m model.online --replay     # also fold in the label journal
+"""
+import argparse
+import atexit
+import json
+import os
+import random
+import threading
+import time
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from config.app_config import (APP_DIR, ONLINE_CHECKPOINT_EVERY, ONLINE_CHECKPOINT_SECONDS, ONLINE_LABELS_PATH,
+                               ONLINE_MODEL, ONLINE_MODEL_PATH)
+
+CLASSES = np.array(["not suspicious", "suspicious"])
+TRAIN_PATH = os.path.join(APP_DIR, "model", "train.json")
+
+
+def load_examples(path=TRAIN_PATH):
+    """(texts, labels) from train.json ({"data": [...]}), a JSON array or JSON Lines of {text, label}"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            items = [json.loads(line) for line in f if line.strip()]
+        else:
+            items = json.load(f)
+            items = items["data"] if isinstance(items, dict) else items
+    return [item["text"] for item in items], [item["label"] for item in items]
+
+
+def read_journal(path=ONLINE_LABELS_PATH):
+    """Analyst labels journaled so far, oldest first ({text, label, source, time})"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class OnlineClassifier:
+    """HashingVectorizer + SGDClassifier(log_loss), usable wherever the batch pipeline is.
+
+    Exposes classes_, predict and predict_proba like the sklearn Pipeline, so
+    classify_batch and MonitorWorker take either. Classes are weighted by the
+    running label counts, the online counterpart of class_weight="balanced".
+    """
+
+    def __init__(self, n_features=ONLINE_MODEL["n_features"], ngram_range=ONLINE_MODEL["ngram_range"],
+                 alpha=ONLINE_MODEL["alpha"], average=ONLINE_MODEL["average"], random_state=42):
+        self.vectorizer = HashingVectorizer(n_features=n_features, ngram_range=tuple(ngram_range),
+                                            stop_words="english", lowercase=True, alternate_sign=False)
+        self.classifier = SGDClassifier(loss="log_loss", alpha=alpha, average=average, random_state=random_state)
+        self.class_counts = dict.fromkeys(CLASSES.tolist(), 0)
+        self.updates = 0
+        # Lines of the label journal folded in (set by OnlineLearner)
+        self.labels = 0
+
+    @property
+    def classes_(self):
+        return self.classifier.classes_
+
+    def sample_weights(self, labels):
+        total = sum(self.class_counts.values())
+        return np.array([total / (len(CLASSES) * max(self.class_counts[label], 1)) for label in labels])
+
+    def partial_fit(self, texts, labels):
+        """Fold a batch of labelled texts into the model"""
+        for label in labels:
+            self.class_counts[label] += 1
+        self.classifier.partial_fit(self.vectorizer.transform(texts), labels, classes=CLASSES,
+                                    sample_weight=self.sample_weights(labels))
+        self.updates += len(labels)
+        return self
+
+    def fit(self, texts, labels, epochs=ONLINE_MODEL["epochs"], seed=42):
+        """Initial training: several shuffled passes of partial_fit over the examples"""
+        for label in labels:
+            self.class_counts[label] += 1
+        X = self.vectorizer.transform(texts)
+        y = np.asarray(labels)
+        weights = self.sample_weights(labels)
+        order = list(range(len(labels)))
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(order)
+            self.classifier.partial_fit(X[order], y[order], classes=CLASSES, sample_weight=weights[order])
+        self.updates += len(labels)
+        return self
+
+    def predict_proba(self, texts):
+        return self.classifier.predict_proba(self.vectorizer.transform(texts))
+
+    def predict(self, texts):
+        return self.classifier.predict(self.vectorizer.transform(texts))
+
+
+def build_online_model(path=ONLINE_MODEL_PATH, train_path=TRAIN_PATH, labels_path=ONLINE_LABELS_PATH):
+    """Fit a fresh online model on train.json, fold in the label journal at
+    labels_path (None skips it) and checkpoint it; registry fallback"""
+    texts, labels = load_examples(train_path)
+    model = OnlineClassifier().fit(texts, labels)
+    items = read_journal(labels_path) if labels_path else []
+    if items:
+        model.partial_fit([item["text"] for item in items], [item["label"] for item in items])
+        model.labels = len(items)
+    save_model(model, path)
+    print(f"Online model trained on {len(texts)} examples and {len(items)} analyst labels, saved to {path}")
+    return model
+
+
+def save_model(model, path=ONLINE_MODEL_PATH):
+    # Write-then-rename, so the registry watcher never loads a half-written file
+    tmp_path = path + ".tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class OnlineLearner:
+    """Folds analyst labels into the online model as they come in.
+
+    Every label is appended to a journal first, then partial_fit into the
+    model. The model is checkpointed every checkpoint_every labels or
+    checkpoint_seconds, and on exit; the model registry picks the checkpoint
+    up from there. Labels journaled after the last checkpoint are replayed on
+    startup, so none are lost to a crash.
+    """
+
+    def __init__(self, path=ONLINE_MODEL_PATH, labels_path=ONLINE_LABELS_PATH,
+                 checkpoint_every=ONLINE_CHECKPOINT_EVERY, checkpoint_seconds=ONLINE_CHECKPOINT_SECONDS):
+        self.path = path
+        self.labels_path = labels_path
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_seconds = checkpoint_seconds
+        self._lock = threading.Lock()
+        self.model = joblib.load(path) if os.path.exists(path) else build_online_model(path, labels_path=labels_path)
+        self.labels = self.model.labels
+        self.pending = 0
+        self.last_checkpoint = time.monotonic()
+        self.replay()
+        atexit.register(self.checkpoint)
+
+    def replay(self):
+        """Fold in journaled labels the checkpoint doesn't include yet"""
+        items = read_journal(self.labels_path)[self.labels:]
+        if not items:
+            return
+        with self._lock:
+            self.model.partial_fit([item["text"] for item in items], [item["label"] for item in items])
+            self.labels += len(items)
+            self.pending += len(items)
+        print(f"Replayed {len(items)} journaled labels into the online model")
+        self.checkpoint()
+
+    def learn(self, texts, label, source="analyst"):
+        """Fold texts (the posts of one labelled page) into the model as one
+        update; returns the seconds it took"""
+        if label not in CLASSES:
+            raise ValueError(f"unknown label: {label}")
+        start = time.perf_counter()
+        with self._lock:
+            now = time.time()
+            with open(self.labels_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps({"text": text, "label": label, "source": source, "time": now},
+                                           ensure_ascii=False) + "\n" for text in texts))
+            self.model.partial_fit(texts, [label] * len(texts))
+            self.labels += len(texts)
+            self.pending += len(texts)
+            due = (self.pending >= self.checkpoint_every
+                   or time.monotonic() - self.last_checkpoint >= self.checkpoint_seconds)
+        if due:
+            self.checkpoint()
+        return time.perf_counter() - start
+
+    def checkpoint(self):
+        with self._lock:
+            if not self.pending:
+                return
+            self.model.labels = self.labels
+            save_model(self.model, self.path)
+            self.pending = 0
+            self.last_checkpoint = time.monotonic()
+        print(f"Online model checkpointed ({self.labels} analyst labels)")
+
+
+_learner = None
+_learner_lock = threading.Lock()
+
+
+def get_online_learner():
+    global _learner
+    if _learner is None:
+        with _learner_lock:
+            if _learner is None:
+                _learner = OnlineLearner()
+    return _learner
+
+
+def checkpoint_online_learner():
+    """Checkpoint labels not yet written, if a learner has been started"""
+    if _learner is not None:
+        _learner.checkpoint()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train", default=TRAIN_PATH, help="train.json or a JSON Lines file of {text, label}")
+    parser.add_argument("--output", default=ONLINE_MODEL_PATH)
+    parser.add_argument("--replay", action="store_true", help="fold in the analyst label journal too")
+    args = parser.parse_args()
+
+    model = build_online_model(args.output, args.train, ONLINE_LABELS_PATH if args.replay else None)
+    print(f"Classes: {', '.join(model.classes_)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Cross-validated hyperparameter search for the batch TF-IDF + LogisticRegression
+classifier, run in parallel with joblib and with the fitted TF-IDF step cached
+on disk.
+
+Every SEARCH_GRID combination is scored on stratified folds (accuracy and macro
+F1); the best by macro F1 is refit on all the data and written where the monitor
+loads it from, so a running monitor hot-reloads it. Candidates that only differ
+in classifier__ params reuse the cached TF-IDF matrices of their fold, within a
+run and across runs.
+
+    cd src/app && python -m model.search
+    cd src/app && python -m model.search --data model/train.json --data model/labels.jsonl --jobs 4
+    cd src/app && python -m model.search --grid grid.json --output /tmp/model.pkl
+"""
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+
+from config.app_config import (SEARCH_CACHE_DIR, SEARCH_CACHE_MAX_BYTES, SEARCH_FOLDS, SEARCH_GRID, SEARCH_JOBS,
+                               THREAT_MODEL_PATH)
+from model.model import build_pipeline
+from model.online import TRAIN_PATH, load_examples
+
+SCORING = {"accuracy": "accuracy", "f1": "f1_macro"}
+
+
+def load_grid(path):
+    """Parameter grid from a JSON file ({"step__param": [values]}); ngram ranges become tuples"""
+    with open(path, "r", encoding="utf-8") as f:
+        grid = json.load(f)
+    return {name: [tuple(value) if name.endswith("ngram_range") else value for value in values]
+            for name, values in grid.items()}
+
+
+def cached_fits(path):
+    """Number of fitted steps stored in a joblib.Memory directory"""
+    return sum("output.pkl" in files for _, _, files in os.walk(path))
+
+
+def search(texts, labels, grid=SEARCH_GRID, folds=SEARCH_FOLDS, jobs=SEARCH_JOBS, cache_dir=SEARCH_CACHE_DIR,
+           seed=42):
+    """Fit a GridSearchCV over grid; returns (search, report)"""
+    memory = joblib.Memory(cache_dir, verbose=0) if cache_dir else None
+    # Fixed fold split, so the cached TF-IDF fits match from one run to the next
+    folds = min(folds, min(labels.count(label) for label in set(labels)))
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    grid_search = GridSearchCV(build_pipeline(memory=memory), grid, scoring=SCORING, refit="f1", cv=cv,
+                               n_jobs=jobs, error_score="raise")
+    cached = cached_fits(cache_dir) if cache_dir else 0
+    start = time.perf_counter()
+    grid_search.fit(texts, labels)
+    seconds = time.perf_counter() - start
+
+    results = grid_search.cv_results_
+    candidates = []
+    for i in np.argsort(results["rank_test_f1"], kind="stable"):
+        candidates.append({
+            "params": {name: list(value) if isinstance(value, tuple) else value
+                       for name, value in results["params"][i].items()},
+            "f1": float(results["mean_test_f1"][i]),
+            "f1_std": float(results["std_test_f1"][i]),
+            "accuracy": float(results["mean_test_accuracy"][i]),
+            "fit_s": float(results["mean_fit_time"][i]),
+            "score_s": float(results["mean_score_time"][i]),
+        })
+    report = {
+        "examples": len(texts),
+        "folds": folds,
+        "jobs": jobs,
+        "fits": len(candidates) * folds,
+        "search_s": seconds,
+        "refit_s": float(grid_search.refit_time_),
+        "cache_dir": cache_dir,
+        # TF-IDF fits found in the cache before / stored in it after the search
+        "cached_fits": [cached, cached_fits(cache_dir) if cache_dir else 0],
+        "best": candidates[0],
+        "candidates": candidates,
+    }
+    if memory is not None:
+        memory.reduce_size(bytes_limit=SEARCH_CACHE_MAX_BYTES)
+    return grid_search, report
+
+
+def save_model(model, path=THREAT_MODEL_PATH):
+    # The cache directory is a training-time detail; don't ship it with the model.
+    # Write-then-rename, so the registry watcher never loads a half-written file
+    model.set_params(memory=None)
+    tmp_path = path + ".tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def print_report(report, top=10):
+    if report["cache_dir"]:
+        before, after = report["cached_fits"]
+        cache = f"TF-IDF cache held {before} fits, now {after}"
+    else:
+        cache = "no TF-IDF cache"
+    print(f"{report['examples']} examples, {report['folds']}-fold cross-validation, "
+          f"{report['fits']} fits on {report['jobs']} jobs ({cache})")
+    print(f"Search {report['search_s']:.1f} s, refit {report['refit_s']:.2f} s")
+    print(f"{'rank':>4} {'macro F1':>9} {'accuracy':>9} {'fit ms':>8}  params")
+    for rank, candidate in enumerate(report["candidates"][:top], 1):
+        params = ", ".join(f"{name.split('__')[-1]}={value}" for name, value in candidate["params"].items())
+        print(f"{rank:>4} {candidate['f1']:>9.3f} {candidate['accuracy']:>9.3f} "
+              f"{candidate['fit_s'] * 1000:>8.1f}  {params}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", action="append",
+                        help="train.json or a JSON Lines file of {text, label}; repeat to combine (default train.json)")
+    parser.add_argument("--grid", help="JSON file of {step__param: [values]} to search instead of SEARCH_GRID")
+    parser.add_argument("--folds", type=int, default=SEARCH_FOLDS)
+    parser.add_argument("--jobs", type=int, default=SEARCH_JOBS, help="parallel fits (-1 = all cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-cache", action="store_true", help="refit TF-IDF for every candidate")
+    parser.add_argument("--clear-cache", action="store_true", help="empty the TF-IDF cache first")
+    parser.add_argument("--output", default=THREAT_MODEL_PATH, help="where to write the best pipeline")
+    parser.add_argument("--report", help="JSON report path (default: next to --output)")
+    parser.add_argument("--top", type=int, default=10, help="candidates to print")
+    args = parser.parse_args()
+
+    texts, labels = [], []
+    for path in args.data or [TRAIN_PATH]:
+        more_texts, more_labels = load_examples(path)
+        texts.extend(more_texts)
+        labels.extend(more_labels)
+    if args.clear_cache:
+        joblib.Memory(SEARCH_CACHE_DIR, verbose=0).clear(warn=False)
+
+    grid = load_grid(args.grid) if args.grid else SEARCH_GRID
+    grid_search, report = search(texts, labels, grid, args.folds, args.jobs,
+                                 None if args.no_cache else SEARCH_CACHE_DIR, args.seed)
+    print_report(report, args.top)
+
+    save_model(grid_search.best_estimator_, args.output)
+    print(f"Best pipeline saved to {args.output}")
+    report_path = args.report or os.path.splitext(args.output)[0] + "_search.json"
+    report["data"] = args.data or [TRAIN_PATH]
+    report["output"] = args.output
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,39 @@
+import argparse
 import json
-from bs4 import BeautifulSoup
 import os
+import sys
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config.app_config import (EXTRACT_WORKERS, READ_CHUNK_SIZE, READ_MAX_RSS_MB, READ_MIN_PROCESS_MB,
+                               READ_STREAM_BATCH)
+from core.extraction import SEPARATOR, extract_page_batch, get_pool, limit_memory, worker_rss_mb
+from core.fingerprints import FingerprintStore
+from core.posts import segment_text
+
+def extract_changed(items, store):
+    """Extract text and posts for items whose HTML changed since the last run, reusing the rest"""
+    texts = [store.cached_text(item["url"], item["html"]) for item in items]
+    page_posts = [None if text is None else store.cached_posts(item["url"]) for item, text in zip(items, texts)]
+    stale = [i for i, text in enumerate(texts) if text is None]
+    for i, (text, found) in zip(stale, extract_page_batch(items[i]["html"] for i in stale)):
+        texts[i] = text
+        page_posts[i] = found
+        store.update(items[i]["url"], items[i]["html"], text, posts=found)
+    for i, found in enumerate(page_posts):
+        if found is None:
+            # Cached before posts were stored
+            page_posts[i] = segment_text(texts[i], SEPARATOR)
+    return texts, page_posts, len(stale)
+
+def result_item(item, text, page_posts):
+    """Output record: the page text plus its posts (author, relative time and
+    start/end offsets of the body in the text)"""
+    return {"url": item["url"], "text": text, "posts": page_posts}
 
 def process_scraped_data():
     app_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,26 +52,17 @@ def process_scraped_data():
             data = json.load(f)
         
         print(f"Data type: {type(data)}")
-        print(f"Data content: {data}")
         
-        results = []
+        store = FingerprintStore()
         if isinstance(data, dict):
             print("Processing dict")
-            soup = BeautifulSoup(data["html"], "html.parser")
-            all_text = soup.get_text(separator="\n\n", strip=True)
-            results.append({
-                "url": data["url"],
-                "text": all_text
-            })
+            data = [data]
         elif isinstance(data, list):
             print(f"Processing list with {len(data)} items")
-            for item in data:
-                soup = BeautifulSoup(item["html"], "html.parser")
-                all_text = soup.get_text(separator="\n\n", strip=True)
-                results.append({
-                    "url": item["url"],
-                    "text": all_text
-                })
+        texts, page_posts, changed = extract_changed(data, store)
+        print(f"Changed pages: {changed}, reused: {len(data) - changed}")
+        results = [result_item(item, text, found) for item, text, found in zip(data, texts, page_posts)]
+        store.save()
         
         print(f"Results count: {len(results)}")
         
@@ -51,6 +75,150 @@ def process_scraped_data():
     except Exception as e:
         print(f"Error processing data: {e}")
 
+def peak_rss_mb():
+    """Peak resident set size of this process plus each extraction worker's peak,
+    in MB, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    peak = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return peak + (worker_rss_mb() or 0)
+
+def iter_json_items(path, chunk_size=READ_CHUNK_SIZE):
+    """Yield the items of a top-level JSON array one at a time.
+
+    Only the item being decoded (plus one read chunk) is held in memory. A
+    top-level object is yielded as a single item, like process_scraped_data.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = f.read(chunk_size)
+        pos = len(buf) - len(buf.lstrip())
+        if buf[pos:pos + 1] == "{":
+            yield json.loads(buf + f.read())
+            return
+        if buf[pos:pos + 1] != "[":
+            raise ValueError("Expected a JSON array or object")
+        pos += 1
+        read_size = chunk_size
+        eof = False
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                if pos >= len(buf):
+                    raise json.JSONDecodeError("Need more data", buf, pos)
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Item spans past the buffer: pull in more, growing the read size
+                # so a single huge item is not re-scanned once per small chunk
+                chunk = f.read(read_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                read_size *= 2
+                continue
+            read_size = chunk_size
+            buf = buf[end:]
+            pos = 0
+            if len(buf) < chunk_size and not eof:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf += chunk
+            yield item
+
+def memory_plan(max_rss_mb, workers=EXTRACT_WORKERS):
+    """(workers, MB per process) splitting max_rss_mb evenly between this
+    process and the extraction workers, with fewer workers if each process
+    would get less than READ_MIN_PROCESS_MB"""
+    workers = min(workers or os.cpu_count() or 1, int(max_rss_mb // READ_MIN_PROCESS_MB) - 1)
+    if workers < 1:
+        raise MemoryError(f"A {max_rss_mb} MB ceiling leaves under {READ_MIN_PROCESS_MB} MB each for the main "
+                          f"process and one extraction worker")
+    return workers, max_rss_mb / (workers + 1)
+
+def stream_scraped_data(data_path, results_path, max_rss_mb=READ_MAX_RSS_MB):
+    """Convert data.json to JSON Lines one item at a time.
+
+    Results are written and flushed, and fingerprints saved, one batch of
+    READ_STREAM_BATCH items at a time, so memory use follows the batch, not
+    the input. max_rss_mb is enforced up front: this process and each
+    extraction worker get an equal share as an address-space limit, which
+    their RSS can't exceed, so together they stay under it. An item too big
+    for its share fails with MemoryError instead of growing past the ceiling.
+    """
+    if max_rss_mb:
+        workers, share = memory_plan(max_rss_mb)
+        if limit_memory(share):
+            get_pool(workers, share)
+            print(f"Memory ceiling {max_rss_mb} MB: main process and {workers} extraction workers "
+                  f"limited to {share:.0f} MB each")
+        else:
+            print("Warning: memory limits are not available on this platform, ceiling not enforced")
+
+    store = FingerprintStore()
+    count = 0
+    changed = 0
+    with open(results_path, "w", encoding="utf-8") as out:
+        batch = []
+        items = iter_json_items(data_path)
+        while True:
+            # Extraction runs on the process pool, so items are handed over in
+            # small fixed-size batches to keep memory bounded
+            for item in items:
+                batch.append({"url": item["url"], "html": item["html"]})
+                if len(batch) >= READ_STREAM_BATCH:
+                    break
+            if not batch:
+                break
+
+            texts, page_posts, batch_changed = extract_changed(batch, store)
+            for item, text, found in zip(batch, texts, page_posts):
+                out.write(json.dumps(result_item(item, text, found), ensure_ascii=False) + "\n")
+            out.flush()
+            # Write this batch's fingerprints out so they don't pile up in memory
+            store.save()
+            count += len(batch)
+            changed += batch_changed
+            batch = []
+            del texts, page_posts
+
+    store.save()
+    peak = peak_rss_mb()
+    print(f"Streamed {count} items to {results_path} ({changed} changed, {count - changed} reused)")
+    print(f"Peak RSS: {peak:.1f} MB" if peak is not None else "Peak RSS: n/a")
+    return count, peak
+
+def main():
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    data_path = os.path.join(os.path.dirname(app_dir), "scraper", "data.json")
+
+    parser = argparse.ArgumentParser(description="Extract text from scraped pages")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse items one by one and write JSON Lines incrementally")
+    parser.add_argument("--input", default=data_path)
+    parser.add_argument("--output", default=os.path.join(app_dir, "results.jsonl"))
+    parser.add_argument("--max-rss-mb", type=float, default=READ_MAX_RSS_MB,
+                        help="memory ceiling in MB for the main process and extraction workers "
+                             "together, enforced as per-process address-space limits")
+    args = parser.parse_args()
+
+    if not args.stream:
+        process_scraped_data()
+        return
+
+    try:
+        stream_scraped_data(args.input, args.output, args.max_rss_mb)
+    except (MemoryError, BrokenProcessPool) as e:
+        # A worker that can't even report its MemoryError leaves the pool broken
+        print(f"Error processing data: {str(e) or type(e).__name__} (memory ceiling: {args.max_rss_mb} MB)")
+        sys.exit(1)
+
 if __name__ == "__main__":
-    process_scraped_data()
+    main()
 
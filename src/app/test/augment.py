@@ -1,35 +1,128 @@
+"""Synonym-replacement augmentation of a labelled dataset, streamed to JSON Lines.
+
+Each example is written once, followed by up to --factor variants in which
+words from the replacement map are swapped for a random alternative. Variants
+are generated on a process pool and every row is deduplicated by a hash of its
+label and normalized text, so examples with no replaceable word (or with few
+combinations) don't come out several times. Input is read as JSON Lines one
+row at a time (a JSON array is loaded whole), so output can grow to millions
+of rows with only the hash set kept in memory.
+
+    cd src/app && python test/augment.py
+    cd src/app && python test/augment.py --input model/train.json --output /tmp/train_big.jsonl --factor 10
+"""
+import argparse
+import hashlib
 import json
+import os
 import random
+import re
+from multiprocessing import Pool
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+WORD_RE = re.compile(r"[\w']+")
+
+replace_map = {}
 
-replace_map = {
-    "destroy": ["wipe out", "eliminate", "annihilate"],
-    "love": ["enjoy", "like", "appreciate"],
-    "India": ["this country", "India", "the nation"]
-}
-
-def augment(text):
-    words = text.split()
-    new_words = []
-    for w in words:
-        if w in replace_map:
-            new_words.append(random.choice(replace_map[w]))
+
+def load_replace_map(path):
+    """{word: [alternatives]}; words match case-insensitively"""
+    with open(path, "r", encoding="utf-8") as f:
+        return {word.lower(): alternatives for word, alternatives in json.load(f).items()}
+
+
+def read_examples(path):
+    """Yield {text, label} rows from a JSON Lines file or a JSON array"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
         else:
-            new_words.append(w)
-    return " ".join(new_words)
+            data = json.load(f)
+            yield from data["data"] if isinstance(data, dict) else data
+
+
+def augment(text, rng):
+    def replace(match):
+        word = match.group(0)
+        alternatives = replace_map.get(word.lower())
+        if not alternatives:
+            return word
+        choice = rng.choice(alternatives)
+        # Alternatives are written as they'd appear mid-sentence
+        return choice[:1].upper() + choice[1:] if match.start() == 0 else choice
+    return WORD_RE.sub(replace, text)
+
+
+def variants(args):
+    """The example followed by up to factor distinct variants of it (pool worker)"""
+    index, item, factor, attempts, seed = args
+    text = item["text"]
+    found = [text]
+    if any(word.lower() in replace_map for word in WORD_RE.findall(text)):
+        rng = random.Random(f"{seed}:{index}")
+        for _ in range(factor * attempts):
+            aug_text = augment(text, rng)
+            if aug_text not in found:
+                found.append(aug_text)
+                if len(found) > factor:
+                    break
+    return item["label"], found
+
+
+def init_worker(mapping):
+    global replace_map
+    replace_map = mapping
+
+
+def row_key(text, label):
+    normalized = " ".join(text.lower().split())
+    # 8-byte ints keep the seen set at a few dozen bytes per row
+    return int.from_bytes(hashlib.blake2b(f"{label}\0{normalized}".encode("utf-8"), digest_size=8).digest(), "big")
+
 
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=os.path.join(TEST_DIR, "modeldata.json"),
+                        help="JSON array, {\"data\": [...]} or JSON Lines of {text, label}")
+    parser.add_argument("--output", default=os.path.join(TEST_DIR, "modeldata_big.jsonl"))
+    parser.add_argument("--replace-map", default=os.path.join(TEST_DIR, "replace_map.json"))
+    parser.add_argument("--factor", type=int, default=2, help="variants per example")
+    parser.add_argument("--attempts", type=int, default=5,
+                        help="random draws per wanted variant before giving up on duplicates")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--chunksize", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
 
-with open("D:\\projects\\PHOBOS\\src\\app\\modeldata.json","r",encoding="utf8") as f:
-    data = json.load(f)
+    mapping = load_replace_map(args.replace_map)
+    tasks = ((index, item, args.factor, args.attempts, args.seed)
+             for index, item in enumerate(read_examples(args.input)))
+    seen = set()
+    read = written = duplicates = 0
 
-augmented = []
-for item in data:
-    augmented.append(item)  
-    for _ in range(2):      
-        aug_text = augment(item["text"])
-        augmented.append({"text": aug_text, "label": item["label"]})
+    pool = Pool(args.workers, initializer=init_worker, initargs=(mapping,))
+    try:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for label, texts in pool.imap(variants, tasks, chunksize=args.chunksize):
+                read += 1
+                for text in texts:
+                    key = row_key(text, label)
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                    f.write(json.dumps({"text": text, "label": label}, ensure_ascii=False) + "\n")
+                    written += 1
+                    if written % 100000 == 0:
+                        print(f"{written} rows written...")
+    finally:
+        pool.close()
+        pool.join()
 
+    print(f"Read {read} examples, wrote {written} rows to {args.output} ({duplicates} duplicates dropped)")
 
-with open("modeldata_big.json","w",encoding="utf8") as f:
-    json.dump(augmented, f, ensure_ascii=False, indent=2)
 
-print("Saved", len(augmented), "examples to data_big.json")
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,84 @@
-import json
-from llama_cpp import Llama
-
-# Load the Q2 GGUF model with optimized settings
-llm = Llama(
-    model_path="./model/mistral-7b-instruct-v0.2.Q2_K.gguf",
-    n_ctx=512,         # smaller context for speed
-    n_threads=8,       # CPU threads
-    n_batch=128,       # process tokens in batches
-    use_mmap=True,     # memory-mapped file, low RAM
-    use_mlock=False    # disable locking
-)
-
-# Load scraped JSON data
-with open("results.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-# Prompt template
-template = """You are a cybersecurity analyst.
-
-Forum Post:
-URL: {url}
-Content: {content}
-
-Task:
-1. Summarize in 2–3 sentences.
-2. Identify any dangerous/illegal activity.
-3. Give a danger rating (0–10).
-4. Provide concise reasoning.
-
-Keep your response structured and concise.
+"""LLM reports for a scraped results.json, through the resident service.
+
+The model is loaded once, the shared prompt prefix stays in its KV cache and
+reports are memoized by content hash, so re-running on the same posts only
+analyzes new or edited ones. Threads are analyzed post by post (the "posts"
+read.py writes, or found in the text); other pages are split into overlapping
+windows that fit the model's context and the --windows hottest by keyword
+matches are analyzed (0 = all of them). Either way the reports are merged
+into one per page.
+
+    cd src/app && python test/model.py --input ../../results.json
+    cd src/app && python test/model.py --backend stub
 """
-
-
-results = []
-
-for entry in data:
-    url = entry.get("url", "")
-    text = entry.get("text", "")
-
-    content = text[:800]
-
-    prompt = template.format(url=url, content=content)
-
-    # Run model
-    output = llm(
-        prompt,
-        max_tokens=150,     
-        temperature=0.3,    
-        top_p=0.95,         
-        repeat_penalty=1.1  
-    )
-
-    result_text = output["choices"][0]["text"].strip()
-
-    # Save structured output
-    results.append({
-        "url": url,
-        "summary_report": result_text
-    })
-
-# Save results to a JSON file
-with open("analysis_results.json", "w", encoding="utf-8") as f:
-    json.dump(results, f, ensure_ascii=False, indent=2)
-
-print("✅ Analysis complete. Results saved to 'analysis_results.json'")
-
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.app_config import CHUNK_MAX_WINDOWS, CHUNK_TOP_K, LEXICON_PATH, LLM_BACKEND
+from core.extraction import SEPARATOR
+from core.keywords import KeywordMatcher
+from core.llm_service import LlmService, merge_reports
+from core.posts import segment_text
+from core.triage import TriageCascade
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default="results.json")
+    parser.add_argument("--output", default="analysis_results.json")
+    parser.add_argument("--backend", default=os.environ.get("PHOBOS_LLM_BACKEND", LLM_BACKEND),
+                        choices=["llama_cpp", "stub"])
+    parser.add_argument("--windows", type=int, default=CHUNK_TOP_K, help="windows per page (0 = all)")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    service = LlmService(args.backend)
+    matcher = KeywordMatcher.from_file(LEXICON_PATH)
+    cascade = TriageCascade(service, top_k=args.windows or CHUNK_MAX_WINDOWS)
+    # Queue everything up front; the service works through it on its own thread
+    pages = []
+    for entry in data:
+        url, text = entry.get("url", ""), entry.get("text", "")
+        page_posts = entry.get("posts")
+        if page_posts is None:
+            page_posts = segment_text(text, SEPARATOR)
+        if page_posts:
+            # The url is only recorded with the report; memo keys are the post text
+            parts = [(f"post by {post['author']}{', ' + post['time'] if post['time'] else ''}",
+                      service.submit(f"{url} (post by {post['author']})" if post["author"] else url,
+                                     text[post["start"]:post["end"]]))
+                     for post in page_posts]
+            pages.append((url, "posts", parts))
+            continue
+        windows = cascade.hot_windows({"url": url, "text": text, "matches": matcher.score(text)["matches"]})
+        pages.append((url, "windows", [(f"chars {start}-{end}", service.submit(url, window))
+                                       for start, end, window in sorted(windows)]))
+
+    results = []
+    for url, unit, parts in pages:
+        # A window or post that fails (e.g. too long for the context) doesn't sink the rest of the page
+        reports = []
+        for heading, future in parts:
+            try:
+                reports.append((heading, future.result()))
+            except Exception as e:
+                print(f"Analysis failed for {url} ({heading}): {e}")
+        if reports:
+            results.append({"url": url, "summary_report": merge_reports(reports, unit=unit), unit: len(reports)})
+    service.close()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ Analysis complete: {service.stats['generated']} generated, {service.stats['cached']} from cache, "
+          f"{service.stats['failed']} failed. Results saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Revisits with conditional GETs must never rebuild a page from an error response.
+
+    cd src/app && python -m pytest test
+"""
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import core.fingerprints as fingerprints
+import core.llm_service as llm_service
+import core.monitor as monitor
+import core.store as store
+import core.url_registry as url_registry
+from core.fingerprints import get_fingerprint_store
+
+URL = "http://forum.example.onion/thread/1"
+GOOD_HTML = "<html><body><h1>Thread</h1><p>Selling weapons and explosives, message me</p></body></html>"
+ERROR_HTML = "<html><body><h1>404 Not Found</h1><p>Nothing matches the given URI</p></body></html>"
+
+
+class ScriptedSource:
+    """Page source answering each cycle with the next scripted response"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def scrape(self, urls, headers_for=None, **kwargs):
+        status, html, etag = self.responses.pop(0)
+        self.sent.append(headers_for(URL) if headers_for else None)
+        yield {"url": URL, "status": status, "html": html, "links": [],
+               "headers": {"etag": etag} if etag else {}}
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(url_registry, "_registry",
+                        url_registry.UrlRegistry(str(tmp_path / "urls.db"), str(tmp_path / "url.txt")))
+    monkeypatch.setattr(fingerprints, "_store", fingerprints.FingerprintStore(str(tmp_path / "phobos.db")))
+    monkeypatch.setattr(store, "_store", store.ResultStore(str(tmp_path / "phobos.db")))
+    monkeypatch.setattr(llm_service, "_service", llm_service.LlmService("off"))
+    url_registry._registry.add(URL)
+    return store._store
+
+
+def run_cycles(monkeypatch, responses):
+    source = ScriptedSource(responses)
+    monkeypatch.setattr(monitor, "get_page_source", lambda: source)
+    for _ in range(len(source.responses)):
+        monitor.MonitorWorker([URL]).run_cycle(monitor.get_metrics())
+    return source
+
+
+def last_text(results):
+    row = results.results(order_by="scored_at")[0]
+    return results.page_text(row["page_id"])
+
+
+def test_not_modified_after_error_reuses_last_good_page(stores, monkeypatch):
+    source = run_cycles(monkeypatch, [("200 OK", GOOD_HTML, '"good"'),
+                                      ("404 Not Found", ERROR_HTML, '"error"'),
+                                      ("304 Not Modified", "", '"good"'),
+                                      ("304 Not Modified", "", '"good"')])
+    # The error response neither replaced the stored page nor its validators
+    assert source.sent[2] == {"If-None-Match": '"good"'}
+    html_hash, text = get_fingerprint_store().cached_page(URL)
+    assert html_hash == fingerprints.fingerprint(GOOD_HTML)
+    assert "explosives" in text and "Not Found" not in text
+    assert "explosives" in last_text(stores)
+    assert url_registry._registry.get(URL)["last_status"] == "304 Not Modified"
+
+
+def test_error_pages_are_not_scored(stores, monkeypatch):
+    run_cycles(monkeypatch, [("404 Not Found", ERROR_HTML, None)])
+    assert get_fingerprint_store().cached_page(URL) is None
+    assert stores.count_results() == 0
+    assert url_registry._registry.get(URL)["last_status"] == "404 Not Found"
@@ -1,28 +1,75 @@
 import os
 import json
+import html
+import threading
 from datetime import datetime
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, 
                             QLabel, QTextEdit, QPushButton, QComboBox, QFrame, 
                             QSizePolicy, QTabWidget, QSplitter, QLineEdit, QMessageBox,
-                            QListWidget, QListWidgetItem)
+                            QPlainTextEdit, QSpinBox,
+                            QTableView, QHeaderView, QAbstractItemView, QFileDialog,
+                            QTableWidget, QTableWidgetItem)
 from PyQt5.QtCore import QTimer, QThread, pyqtSignal, Qt
 from PyQt5.QtGui import QPixmap, QIcon, QFont
 from ui.styles import get_dark_stylesheet
-from config.app_config import TIMER_INTERVALS, DEFAULT_INTERVAL
-from core.monitor import MonitorWorker
+from config.app_config import (TIMER_INTERVALS, DEFAULT_INTERVAL, LOG_BUFFER_SIZE, LOG_FLUSH_MS, SCHEDULE_TICK_MS,
+                               METRICS_REFRESH_MS, ONLINE_CHECKPOINT_SECONDS)
+from core.llm_service import get_llm_service
+from core.metrics import STAGES, get_metrics, metrics_port
+from core.monitor import CLASSIFIER, MonitorWorker, label_units
+from core.scheduler import get_scheduler
+from core.store import get_result_store
+from core.system_log import SystemLog
+from core.url_registry import get_url_registry
+from ui.results_model import ResultsTableModel
+from ui.url_list import UrlListModel, UrlItemDelegate, ROW_HEIGHT as URL_ROW_HEIGHT
 
 class DarkWebMonitorApp(QMainWindow):
+    # Emitted from the LLM service thread; delivered on the UI thread
+    llm_report_ready = pyqtSignal(str, str)
+    # (message, level) from background work, logged on the GUI thread
+    background_message = pyqtSignal(str, str)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("PHOBOS - Dark Web Monitoring Division")
         self.setStyleSheet(get_dark_stylesheet())
         
+        # The timer only ticks the scheduler; each URL has its own revisit time
         self.timer = QTimer()
         self.timer.timeout.connect(self.run_monitoring)
         self.is_monitoring = False
         self.current_interval = DEFAULT_INTERVAL
+        self.scheduler = get_scheduler()
+        self.scheduler.set_base_interval(self.current_interval)
+        
+        self.system_log_buffer = SystemLog()
+        self.log_flush_timer = QTimer()
+        self.log_flush_timer.timeout.connect(self.flush_system_log)
+        
+        self.metrics = get_metrics()
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.refresh_stats)
         
         self.init_ui()
+        self.log_flush_timer.start(LOG_FLUSH_MS)
+        self.llm_report_ready.connect(self.on_llm_report)
+        get_llm_service().add_listener(self.llm_report_ready.emit)
+        self.background_message.connect(self.log_system_message)
+        if CLASSIFIER == "online":
+            # The monitor serves the checkpoint, so labels reach it when one is written
+            self.checkpoint_timer = QTimer()
+            self.checkpoint_timer.timeout.connect(self.checkpoint_online_model)
+            self.checkpoint_timer.start(ONLINE_CHECKPOINT_SECONDS * 1000)
+        if self.metrics.enabled:
+            self.stats_timer.start(METRICS_REFRESH_MS)
+            port = metrics_port()
+            if port is not None:
+                try:
+                    port = self.metrics.serve(port)
+                    self.log_system_message(f"Metrics endpoint on http://127.0.0.1:{port}/metrics", "INFO")
+                except OSError as e:
+                    self.log_system_message(f"Metrics endpoint disabled: {str(e)}", "WARNING")
         
     def init_ui(self):
         central_widget = QWidget()
@@ -107,7 +154,7 @@ class DarkWebMonitorApp(QMainWindow):
         controls_layout = QVBoxLayout(controls_frame)
         controls_layout.setSpacing(15)
         
-        interval_label = QLabel("Monitor Interval:")
+        interval_label = QLabel("Base Revisit Interval:")
         interval_label.setStyleSheet("font-size: 16px; margin-bottom: 5px;")
         
         self.interval_combo = QComboBox()
@@ -187,27 +234,13 @@ class DarkWebMonitorApp(QMainWindow):
             return
         
         try:
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            project_root = os.path.dirname(app_dir)
-            scraper_dir = os.path.join(project_root, "scraper")
-            urls_file = os.path.join(scraper_dir, "url.txt")
-            
-            existing_urls = set()
-            if os.path.exists(urls_file):
-                with open(urls_file, 'r', encoding='utf-8') as f:
-                    existing_urls = set(line.strip() for line in f.readlines())
-            
-            if url in existing_urls:
+            if not self.urls_model.add_url(url, added_by="ui"):
                 QMessageBox.information(self, "Duplicate URL", "This URL is already being monitored.")
                 self.url_input.clear()
                 return
             
-            with open(urls_file, 'a', encoding='utf-8') as f:
-                f.write(url + '\n')
-            
             QMessageBox.information(self, "URL Added", f"Successfully added URL to monitoring list:\n{url}")
             self.url_input.clear()
-            self.refresh_url_list()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add URL: {str(e)}")
@@ -258,11 +291,13 @@ class DarkWebMonitorApp(QMainWindow):
         data_logs_tab = self.create_data_logs_tab()
         urls_tab = self.create_urls_tab()
         system_logs_tab = self.create_system_logs_tab()
+        stats_tab = self.create_stats_tab()
         
         tab_widget.addTab(ai_results_tab, "AI Analysis")
         tab_widget.addTab(data_logs_tab, "Data Logs")
         tab_widget.addTab(urls_tab, "URLs")
         tab_widget.addTab(system_logs_tab, "System Logs")
+        tab_widget.addTab(stats_tab, "Stats")
         
         return tab_widget
     
@@ -312,38 +347,102 @@ class DarkWebMonitorApp(QMainWindow):
             }
         """)
         
-        scraped_frame = QFrame()
-        scraped_layout = QVBoxLayout(scraped_frame)
-        scraped_layout.setSpacing(5)
-        scraped_layout.setContentsMargins(0, 0, 0, 5)
-        
-        scraped_label = QLabel("Scraped Data (data.json)")
-        scraped_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #ffffff;")
-        
-        self.scraped_log = QTextEdit()
-        self.scraped_log.setPlainText("Waiting for monitoring to start...")
-        self.scraped_log.setStyleSheet("font-size: 22px;")
-        
-        scraped_layout.addWidget(scraped_label)
-        scraped_layout.addWidget(self.scraped_log)
-        
-        parsed_frame = QFrame()
-        parsed_layout = QVBoxLayout(parsed_frame)
-        parsed_layout.setSpacing(5)
-        parsed_layout.setContentsMargins(0, 5, 0, 0)
-        
-        parsed_label = QLabel("Parsed Data (results.json)")
-        parsed_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #ffffff;")
-        
-        self.parsed_log = QTextEdit()
-        self.parsed_log.setPlainText("Waiting for monitoring to start...")
-        self.parsed_log.setStyleSheet("font-size: 22px;")
-        
-        parsed_layout.addWidget(parsed_label)
-        parsed_layout.addWidget(self.parsed_log)
-        
-        splitter.addWidget(scraped_frame)
-        splitter.addWidget(parsed_frame)
+        results_frame = QFrame()
+        results_layout = QVBoxLayout(results_frame)
+        results_layout.setSpacing(5)
+        results_layout.setContentsMargins(0, 0, 0, 5)
+        
+        results_header = QHBoxLayout()
+        results_label = QLabel("Scraped Pages")
+        results_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #ffffff;")
+        
+        min_score_label = QLabel("Min score:")
+        min_score_label.setStyleSheet("font-size: 14px;")
+        self.min_score_spin = QSpinBox()
+        self.min_score_spin.setRange(0, 1000)
+        self.min_score_spin.setStyleSheet("font-size: 14px; padding: 4px;")
+        self.min_score_spin.valueChanged.connect(self.on_min_score_changed)
+        
+        results_header.addWidget(results_label)
+        results_header.addStretch()
+        results_header.addWidget(min_score_label)
+        results_header.addWidget(self.min_score_spin)
+        
+        self.results_model = ResultsTableModel(get_result_store(), parent=self)
+        self.results_view = QTableView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setSortingEnabled(True)
+        self.results_view.horizontalHeader().setSortIndicator(0, Qt.DescendingOrder)
+        self.results_view.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.results_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.results_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.results_view.verticalHeader().setVisible(False)
+        self.results_view.setStyleSheet("""
+            QTableView {
+                background-color: #1a1a1a;
+                color: #ffffff;
+                gridline-color: #333333;
+                border: 1px solid #555555;
+                font-size: 14px;
+            }
+            QTableView::item:selected {
+                background-color: #4a90e2;
+            }
+            QHeaderView::section {
+                background-color: #3c3c3c;
+                color: #ffffff;
+                padding: 6px;
+                border: 1px solid #555555;
+                font-weight: bold;
+            }
+        """)
+        self.results_view.selectionModel().currentRowChanged.connect(self.show_page_detail)
+        
+        results_layout.addLayout(results_header)
+        results_layout.addWidget(self.results_view)
+        
+        detail_frame = QFrame()
+        detail_layout = QVBoxLayout(detail_frame)
+        detail_layout.setSpacing(5)
+        detail_layout.setContentsMargins(0, 5, 0, 0)
+        
+        detail_header = QHBoxLayout()
+        detail_label = QLabel("Page Detail")
+        detail_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #ffffff;")
+        
+        self.detail_mode = QComboBox()
+        self.detail_mode.addItems(["Parsed text", "Raw HTML"])
+        self.detail_mode.currentIndexChanged.connect(
+            lambda _: self.show_page_detail(self.results_view.currentIndex()))
+        
+        # Analyst confirmations, folded straight into the online classifier
+        self.mark_suspicious_button = QPushButton("Mark suspicious")
+        self.mark_suspicious_button.clicked.connect(lambda: self.label_selected_page("suspicious"))
+        self.mark_safe_button = QPushButton("Mark safe")
+        self.mark_safe_button.clicked.connect(lambda: self.label_selected_page("not suspicious"))
+        if CLASSIFIER != "online":
+            # The served model wouldn't change, so a click would look like it did nothing
+            for button in (self.mark_suspicious_button, self.mark_safe_button):
+                button.setEnabled(False)
+                button.setToolTip(f"Labels train the online classifier, but the monitor serves the {CLASSIFIER} "
+                                  "one (set PHOBOS_CLASSIFIER=online)")
+        
+        detail_header.addWidget(detail_label)
+        detail_header.addStretch()
+        detail_header.addWidget(self.mark_suspicious_button)
+        detail_header.addWidget(self.mark_safe_button)
+        detail_header.addWidget(self.detail_mode)
+        
+        self.page_detail = QPlainTextEdit()
+        self.page_detail.setReadOnly(True)
+        self.page_detail.setPlainText("Select a page to see its content...")
+        self.page_detail.setStyleSheet("font-size: 22px;")
+        
+        detail_layout.addLayout(detail_header)
+        detail_layout.addWidget(self.page_detail)
+        
+        splitter.addWidget(results_frame)
+        splitter.addWidget(detail_frame)
         splitter.setSizes([300, 300])
         
         layout.addWidget(splitter)
@@ -404,13 +503,59 @@ class DarkWebMonitorApp(QMainWindow):
             }
         """)
         
+        self.import_button = QPushButton("Import URLs")
+        self.import_button.clicked.connect(self.import_urls)
+        self.import_button.setStyleSheet(self.refresh_button.styleSheet())
+        
         buttons_layout.addWidget(self.refresh_button)
+        buttons_layout.addWidget(self.import_button)
         buttons_layout.addWidget(self.clear_all_button)
         buttons_layout.addStretch()
         
-        self.urls_list = QListWidget()
+        self.url_search = QLineEdit()
+        self.url_search.setPlaceholderText("Search monitored URLs...")
+        self.url_search.setClearButtonEnabled(True)
+        self.url_search.setStyleSheet("""
+            QLineEdit {
+                background-color: #1a1a1a;
+                color: #ffffff;
+                border: 2px solid #555555;
+                border-radius: 6px;
+                padding: 8px;
+                font-size: 13px;
+            }
+            QLineEdit:focus {
+                border-color: #4a90e2;
+            }
+        """)
+        # Don't re-filter on every keystroke; wait for a pause in typing
+        self.url_search_timer = QTimer(self)
+        self.url_search_timer.setSingleShot(True)
+        self.url_search_timer.setInterval(200)
+        self.url_search_timer.timeout.connect(self.apply_url_filter)
+        self.url_search.textChanged.connect(self.url_search_timer.start)
+        
+        self.urls_model = UrlListModel(get_url_registry(), parent=self)
+        
+        self.urls_delegate = UrlItemDelegate(self)
+        self.urls_delegate.remove_requested.connect(self.remove_url)
+        
+        # A table with fixed-height rows only touches the visible rows;
+        # QListView and QTreeView walk every row on each layout pass
+        self.urls_list = QTableView()
+        self.urls_list.setModel(self.urls_model)
+        self.urls_list.setItemDelegate(self.urls_delegate)
+        self.urls_list.horizontalHeader().hide()
+        self.urls_list.horizontalHeader().setStretchLastSection(True)
+        self.urls_list.verticalHeader().hide()
+        self.urls_list.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.urls_list.verticalHeader().setDefaultSectionSize(URL_ROW_HEIGHT)
+        self.urls_list.setShowGrid(False)
+        self.urls_list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.urls_list.setMouseTracking(True)
+        self.urls_list.setSelectionMode(QAbstractItemView.SingleSelection)
         self.urls_list.setStyleSheet("""
-            QListWidget {
+            QTableView {
                 background-color: #1a1a1a;
                 color: #ffffff;
                 border: 2px solid #555555;
@@ -418,27 +563,23 @@ class DarkWebMonitorApp(QMainWindow):
                 padding: 10px;
                 font-family: 'Consolas', 'Monaco', monospace;
                 font-size: 13px;
-            }
-            QListWidget::item {
-                padding: 15px;
-                border-bottom: 1px solid #333333;
-                margin: 5px;
-                border-radius: 6px;
-                background-color: #2a2a2a;
-            }
-            QListWidget::item:hover {
-                background-color: #3d3d3d;
-            }
-            QListWidget::item:selected {
-                background-color: #4a90e2;
+                selection-background-color: transparent;
             }
         """)
         
+        self.urls_count_label = QLabel()
+        self.urls_count_label.setStyleSheet("color: #888888; font-size: 12px;")
+        for signal in (self.urls_model.rowsInserted, self.urls_model.rowsRemoved,
+                       self.urls_model.modelReset, self.urls_model.count_changed):
+            signal.connect(self.update_url_count)
+        
         layout.addWidget(urls_label)
         layout.addLayout(buttons_layout)
+        layout.addWidget(self.url_search)
         layout.addWidget(self.urls_list)
+        layout.addWidget(self.urls_count_label)
         
-        self.refresh_url_list()
+        self.update_url_count()
         
         return urls_tab
 
@@ -475,10 +616,11 @@ class DarkWebMonitorApp(QMainWindow):
         logs_header.addStretch()
         logs_header.addWidget(clear_logs_button)
         
-        self.system_log = QTextEdit()
-        self.system_log.setPlainText("System logs will appear here...")
+        self.system_log = QPlainTextEdit()
+        self.system_log.setPlaceholderText("System logs will appear here...")
+        self.system_log.setMaximumBlockCount(LOG_BUFFER_SIZE)
         self.system_log.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #0d1117;
                 color: #58a6ff;
                 border: 1px solid #555555;
@@ -496,8 +638,133 @@ class DarkWebMonitorApp(QMainWindow):
         
         return logs_tab
 
+    def create_stats_tab(self):
+        stats_tab = QWidget()
+        layout = QVBoxLayout(stats_tab)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+        
+        stats_header = QHBoxLayout()
+        
+        stats_label = QLabel("Pipeline Stats")
+        stats_label.setStyleSheet("font-size: 22px; font-weight: bold; margin-bottom: 10px; color: #ffffff;")
+        
+        reset_stats_button = QPushButton("Reset")
+        reset_stats_button.clicked.connect(self.reset_stats)
+        reset_stats_button.setStyleSheet("""
+            QPushButton {
+                background-color: #dc3545;
+                color: white;
+                border: none;
+                padding: 8px 15px;
+                border-radius: 4px;
+                font-weight: bold;
+                font-size: 22px;
+                max-width: 100px;
+            }
+            QPushButton:hover {
+                background-color: #c82333;
+            }
+        """)
+        
+        stats_header.addWidget(stats_label)
+        stats_header.addStretch()
+        stats_header.addWidget(reset_stats_button)
+        
+        self.stats_summary = QLabel()
+        self.stats_summary.setStyleSheet("color: #cccccc; font-size: 18px;")
+        self.stats_summary.setWordWrap(True)
+        
+        self.stats_table = QTableWidget(len(STAGES), 6)
+        self.stats_table.setHorizontalHeaderLabels(["Stage", "Count", "Last ms", "Avg ms", "p95 ms", "Errors"])
+        self.stats_table.verticalHeader().setVisible(False)
+        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.stats_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stats_table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.stats_table.setStyleSheet("""
+            QTableView {
+                background-color: #1a1a1a;
+                color: #ffffff;
+                border: 1px solid #555555;
+                border-radius: 6px;
+                gridline-color: #333333;
+                font-family: 'Consolas', 'Monaco', monospace;
+                font-size: 18px;
+            }
+        """)
+        for row, stage in enumerate(STAGES):
+            self.stats_table.setItem(row, 0, QTableWidgetItem(stage))
+            for column in range(1, 6):
+                item = QTableWidgetItem("-")
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.stats_table.setItem(row, column, item)
+        
+        layout.addLayout(stats_header)
+        layout.addWidget(self.stats_summary)
+        layout.addWidget(self.stats_table)
+        
+        if not self.metrics.enabled:
+            self.stats_summary.setText("Metrics are disabled (METRICS_ENABLED / PHOBOS_METRICS).")
+            reset_stats_button.setEnabled(False)
+        else:
+            self.refresh_stats(force=True)
+        
+        return stats_tab
+
+    def refresh_stats(self, force=False):
+        # Nothing to repaint while the tab is hidden
+        if not force and not self.stats_table.isVisible():
+            return
+        snapshot = self.metrics.snapshot()
+        counters = snapshot["counters"]
+        gauges = snapshot["gauges"]
+        
+        def ms(value):
+            return "-" if value is None else f"{value * 1000:.1f}"
+        
+        for row, stage in enumerate(STAGES):
+            timing = snapshot["stages"].get(stage)
+            values = ["-"] * 5 if timing is None else [
+                str(timing["count"]), ms(timing["last"]), ms(timing["avg"]), ms(timing["p95"]), str(timing["errors"])]
+            for column, value in enumerate(values, 1):
+                self.stats_table.item(row, column).setText(value)
+        
+        by_class = {dict(labels)["status"]: value for (name, labels), value in counters.items()
+                    if name == "phobos_pages_total"}
+        pages = sum(by_class.values())
+        breakdown = ", ".join(f"{status} {count}" for status, count in sorted(by_class.items()))
+        by_reason = {dict(labels)["reason"]: value for (name, labels), value in counters.items()
+                     if name == "phobos_llm_avoided_total"}
+        avoided = sum(by_reason.values())
+        breakdown_avoided = ", ".join(f"{reason.replace('_', ' ')} {count}"
+                                      for reason, count in sorted(by_reason.items()))
+        self.stats_summary.setText(
+            f"Cycles: {counters.get(('phobos_cycles_total', ()), 0)}    "
+            f"Pages: {pages}" + (f" ({breakdown})" if breakdown else "") + "    "
+            f"Received: {counters.get(('phobos_bytes_total', ()), 0) / (1024 * 1024):.1f} MB    "
+            f"Reused: {counters.get(('phobos_pages_reused_total', ()), 0)}    "
+            f"Fetch errors: {counters.get(('phobos_fetch_errors_total', ()), 0)}    "
+            f"Scheduled: {gauges.get(('phobos_scheduled_urls', ()), 0)} "
+            f"({gauges.get(('phobos_failing_urls', ()), 0)} backing off)\n"
+            f"LLM: {counters.get(('phobos_triage_total', (('tier', 'llm'),)), 0)} sent, "
+            f"{gauges.get(('phobos_llm_queue', ()), 0)} queued, "
+            f"{avoided} avoided ({breakdown_avoided}), "
+            f"~{counters.get(('phobos_llm_seconds_avoided_total', ()), 0):.0f} s and "
+            f"{counters.get(('phobos_llm_tokens_avoided_total', ()), 0)} tokens saved")
+
+    def reset_stats(self):
+        self.metrics.reset()
+        self.refresh_stats(force=True)
+        self.log_system_message("Pipeline stats reset", "INFO")
+
     def log_system_message(self, message, level="INFO"):
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        # Shown on the next flush_system_log tick, written to the file sink now
+        self.system_log_buffer.log(message, level)
+
+    def flush_system_log(self):
+        records, dropped = self.system_log_buffer.take_pending()
+        if not records:
+            return
         color_map = {
             "INFO": "#58a6ff",
             "WARNING": "#f1c40f", 
@@ -505,108 +772,40 @@ class DarkWebMonitorApp(QMainWindow):
             "SUCCESS": "#2ecc71"
         }
         
-        color = color_map.get(level, "#58a6ff")
-        formatted_message = f'<span style="color: {color};">[{timestamp}] [{level}] {message}</span>'
-        
-        self.system_log.append(formatted_message)
-        self.system_log.verticalScrollBar().setValue(self.system_log.verticalScrollBar().maximum())
+        scrollbar = self.system_log.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        self.system_log.setUpdatesEnabled(False)
+        if dropped:
+            self.system_log.appendHtml(f'<span style="color: #f1c40f;">... {dropped} messages not shown ...</span>')
+        for record in records:
+            timestamp = datetime.fromtimestamp(record["ts"]).strftime("%H:%M:%S")
+            color = color_map.get(record["level"], "#58a6ff")
+            self.system_log.appendHtml(
+                f'<span style="color: {color};">[{timestamp}] [{record["level"]}] {html.escape(record["message"])}</span>')
+        self.system_log.setUpdatesEnabled(True)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
 
     def clear_system_logs(self):
+        self.system_log_buffer.clear()
         self.system_log.clear()
         self.log_system_message("System logs cleared", "INFO")
 
     def refresh_url_list(self):
-        self.urls_list.clear()
-        
-        try:
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            project_root = os.path.dirname(app_dir)
-            scraper_dir = os.path.join(project_root, "scraper")
-            urls_file = os.path.join(scraper_dir, "url.txt")
-            
-            if not os.path.exists(urls_file):
-                item = QListWidgetItem("No URLs found. Add URLs using the control panel.")
-                item.setForeground(Qt.gray)
-                self.urls_list.addItem(item)
-                return
-            
-            with open(urls_file, 'r', encoding='utf-8') as f:
-                urls = [line.strip() for line in f.readlines() if line.strip()]
-            
-            if not urls:
-                item = QListWidgetItem("No URLs found. Add URLs using the control panel.")
-                item.setForeground(Qt.gray)
-                self.urls_list.addItem(item)
-                return
-            
-            for i, url in enumerate(urls, 1):
-                item_widget = QWidget()
-                item_widget.setMinimumHeight(80)
-                item_layout = QHBoxLayout(item_widget)
-                item_layout.setContentsMargins(15, 15, 15, 15)
-                item_layout.setSpacing(20)
-                
-                url_container = QVBoxLayout()
-                
-                number_label = QLabel(f"#{i}")
-                number_label.setStyleSheet("""
-                    color: #4a90e2; 
-                    font-size: 16px; 
-                    font-weight: bold;
-                    margin-bottom: 5px;
-                """)
-                
-                url_label = QLabel(url)
-                url_label.setStyleSheet("""
-                    color: #ffffff; 
-                    font-size: 14px;
-                    background-color: #333333;
-                    padding: 12px;
-                    border-radius: 6px;
-                    border: 1px solid #555555;
-                    min-height: 20px;
-                """)
-                url_label.setWordWrap(True)
-                url_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
-                
-                url_container.addWidget(number_label)
-                url_container.addWidget(url_label)
-                
-                remove_button = QPushButton("Remove")
-                remove_button.setStyleSheet("""
-                    QPushButton {
-                        background-color: #dc3545;
-                        color: white;
-                        border: none;
-                        padding: 15px 25px;
-                        border-radius: 6px;
-                        font-size: 14px;
-                        font-weight: bold;
-                        min-width: 100px;
-                        max-width: 120px;
-                    }
-                    QPushButton:hover {
-                        background-color: #c82333;
-                    }
-                    QPushButton:pressed {
-                        background-color: #a71e2a;
-                    }
-                """)
-                remove_button.clicked.connect(lambda checked, url=url: self.remove_url(url))
-                
-                item_layout.addLayout(url_container, 1)
-                item_layout.addWidget(remove_button)
-                
-                list_item = QListWidgetItem()
-                list_item.setSizeHint(item_widget.sizeHint())
-                
-                self.urls_list.addItem(list_item)
-                self.urls_list.setItemWidget(list_item, item_widget)
-                
-        except Exception as e:
-            item = QListWidgetItem(f"Error loading URLs: {str(e)}")
-            item.setForeground(Qt.red)
-            self.urls_list.addItem(item)
+        self.urls_model.reload()
+
+    def apply_url_filter(self):
+        self.urls_model.set_search(self.url_search.text())
+
+    def update_url_count(self, *args):
+        total = self.urls_model.total()
+        shown = self.urls_model.rowCount()
+        if total == 0:
+            self.urls_count_label.setText("No URLs found. Add URLs using the control panel.")
+        elif shown == total:
+            self.urls_count_label.setText(f"{total} URLs monitored")
+        else:
+            self.urls_count_label.setText(f"{shown} of {total} URLs match")
 
     def remove_url(self, url_to_remove):
         reply = QMessageBox.question(self, "Remove URL", 
@@ -618,32 +817,30 @@ class DarkWebMonitorApp(QMainWindow):
             return
         
         try:
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            project_root = os.path.dirname(app_dir)
-            scraper_dir = os.path.join(project_root, "scraper")
-            urls_file = os.path.join(scraper_dir, "url.txt")
-            
-            if not os.path.exists(urls_file):
-                return
-            
-            with open(urls_file, 'r', encoding='utf-8') as f:
-                urls = [line.strip() for line in f.readlines() if line.strip()]
-            
-            if url_to_remove in urls:
-                urls.remove(url_to_remove)
-                
-                with open(urls_file, 'w', encoding='utf-8') as f:
-                    for url in urls:
-                        f.write(url + '\n')
-                
+            if self.urls_model.remove_url(url_to_remove):
                 QMessageBox.information(self, "URL Removed", "URL successfully removed from monitoring list.")
-                self.refresh_url_list()
                 self.log_system_message(f"URL removed from monitoring: {url_to_remove}", "SUCCESS")
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to remove URL: {str(e)}")
             self.log_system_message(f"Failed to remove URL: {str(e)}", "ERROR")
 
+    def import_urls(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import URLs", "", "Text files (*.txt);;All files (*)")
+        if not path:
+            return
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                urls = [line.strip() for line in f if line.strip().startswith(('http://', 'https://'))]
+            added = self.urls_model.import_urls(urls, added_by=f"import:{os.path.basename(path)}")
+            
+            self.log_system_message(f"Imported {len(added)} new URLs from {path} ({len(urls) - len(added)} already monitored)", "SUCCESS")
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to import URLs: {str(e)}")
+            self.log_system_message(f"Failed to import URLs: {str(e)}", "ERROR")
+
     def clear_all_urls(self):
         reply = QMessageBox.question(self, "Clear All URLs", 
                                    "Are you sure you want to remove all monitored URLs?",
@@ -654,18 +851,10 @@ class DarkWebMonitorApp(QMainWindow):
             return
         
         try:
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            project_root = os.path.dirname(app_dir)
-            scraper_dir = os.path.join(project_root, "scraper")
-            urls_file = os.path.join(scraper_dir, "url.txt")
+            self.urls_model.clear()
             
-            if os.path.exists(urls_file):
-                with open(urls_file, 'w', encoding='utf-8') as f:
-                    f.write('')
-                
-                QMessageBox.information(self, "URLs Cleared", "All URLs have been removed from monitoring list.")
-                self.refresh_url_list()
-                self.log_system_message("All URLs cleared from monitoring list", "SUCCESS")
+            QMessageBox.information(self, "URLs Cleared", "All URLs have been removed from monitoring list.")
+            self.log_system_message("All URLs cleared from monitoring list", "SUCCESS")
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to clear URLs: {str(e)}")
@@ -674,9 +863,8 @@ class DarkWebMonitorApp(QMainWindow):
     def on_interval_changed(self, index):
         _, value = TIMER_INTERVALS[index]
         self.current_interval = value
-        self.log_system_message(f"Monitor interval changed to {value} seconds", "INFO")
-        if self.is_monitoring:
-            self.timer.setInterval(value * 1000)
+        self.scheduler.set_base_interval(value)
+        self.log_system_message(f"Base revisit interval changed to {value} seconds", "INFO")
     
     def start_monitoring(self):
         self.is_monitoring = True
@@ -685,7 +873,7 @@ class DarkWebMonitorApp(QMainWindow):
         self.status_text.setText("Monitoring Active")
         self.status_text.setStyleSheet("color: #28a745; font-size: 14px; padding: 10px; background-color: #1e1e1e; border-radius: 4px;")
         
-        self.timer.start(self.current_interval * 1000)
+        self.timer.start(SCHEDULE_TICK_MS)
         self.log_system_message("Monitoring started", "SUCCESS")
         self.run_monitoring()
     
@@ -699,37 +887,105 @@ class DarkWebMonitorApp(QMainWindow):
         self.log_system_message("Monitoring stopped", "INFO")
     
     def run_monitoring(self):
-        self.log_system_message(f"Timer triggered - monitoring active: {self.is_monitoring}", "INFO")
         if not self.is_monitoring:
             return
 
+        # A busy worker just leaves due URLs in the queue for the next tick
         if hasattr(self, 'worker') and self.worker.isRunning():
-            self.log_system_message("Previous worker still running, skipping...", "WARNING")
             return
 
-        self.log_system_message("Starting MonitorWorker", "INFO")
-        self.worker = MonitorWorker()
+        self.scheduler.sync()
+        urls = self.scheduler.due()
+        if not urls:
+            return
+
+        self.log_system_message(f"Starting MonitorWorker for {len(urls)} due URLs", "INFO")
+        self.worker = MonitorWorker(urls, self.scheduler)
         self.worker.scraped_data.connect(self.update_scraped_log)
-        self.worker.parsed_data.connect(self.update_parsed_log)
         self.worker.ai_results.connect(self.update_ai_log)
+        self.worker.run_completed.connect(self.on_run_completed)
+        self.worker.fetch_stats.connect(lambda message: self.log_system_message(message, "INFO"))
         self.worker.finished.connect(self.worker_finished)
         self.worker.start()
 
     def worker_finished(self):
-        self.log_system_message("MonitorWorker finished", "SUCCESS")
+        stats = self.scheduler.stats()
+        next_due = self.scheduler.next_due_in()
+        message = f"MonitorWorker finished; {stats['urls']} URLs scheduled, {stats['failing']} backing off"
+        if next_due is not None:
+            message += f", next revisit in {next_due:.0f}s"
+        self.log_system_message(message, "SUCCESS")
+    
+    def on_run_completed(self, run_id):
+        with self.metrics.span("ui"):
+            self.show_run_completed(run_id)
+    
+    def show_run_completed(self, run_id):
+        try:
+            db = get_result_store()
+            run = db.get_run(run_id)
+            top = db.results(run_id=run_id, limit=1)
+            message = f"Run #{run_id} stored: {run['pages']} pages, {run['suspicious']} suspicious"
+            if top:
+                message += f", top score {top[0]['score']} ({top[0]['url']})"
+            self.log_system_message(message, "SUCCESS")
+            self.results_model.add_run(run_id)
+        except Exception as e:
+            self.log_system_message(f"Failed to read run #{run_id}: {str(e)}", "ERROR")
+    
+    def on_llm_report(self, url, report):
+        with self.metrics.span("ui"):
+            self.ai_log.append(f"\nLLM report for {url}:\n{report}\n{'-' * 60}")
+        self.log_system_message(f"LLM report ready for {url} ({get_llm_service().pending()} queued)", "INFO")
+    
+    def update_scraped_log(self, message):
+        self.log_system_message(message, "ERROR")
     
-    def update_scraped_log(self, data):
-        self.scraped_log.setPlainText(data)
-        self.scraped_log.verticalScrollBar().setValue(self.scraped_log.verticalScrollBar().maximum())
-        self.log_system_message("Scraped data updated", "SUCCESS")
+    def on_min_score_changed(self, value):
+        self.results_model.set_min_score(value)
     
-    def update_parsed_log(self, data):
-        self.parsed_log.setPlainText(data)
-        self.parsed_log.verticalScrollBar().setValue(self.parsed_log.verticalScrollBar().maximum())
-        self.log_system_message("Parsed data updated", "SUCCESS")
+    def show_page_detail(self, index):
+        if not index.isValid():
+            self.page_detail.setPlainText("")
+            return
+        # Only the selected page's content is ever loaded into the widget
+        page_id = self.results_model.row(index.row())["page_id"]
+        db = get_result_store()
+        if self.detail_mode.currentIndex() == 0:
+            content = db.page_text(page_id)
+        else:
+            content = db.page_html(page_id)
+        self.page_detail.setPlainText(content or "")
+    
+    def label_selected_page(self, label):
+        index = self.results_view.currentIndex()
+        if not index.isValid():
+            self.log_system_message("Select a page to label first", "WARNING")
+            return
+        row = self.results_model.row(index.row())
+        # The first label may have to train the online model; keep that off the GUI thread
+        threading.Thread(target=self.label_page, args=(row, label), name="label", daemon=True).start()
+
+    def label_page(self, row, label):
+        try:
+            # Only the online backend needs sklearn's SGD model in this process
+            from model.online import get_online_learner
+            db = get_result_store()
+            units = label_units(db.page_text(row["page_id"]) or "", db.page_html(row["page_id"]), label)
+            seconds = get_online_learner().learn(units, label)
+            self.background_message.emit(
+                f"Labelled {row['url']} as {label} ({len(units)} posts) in {seconds * 1000:.1f} ms; "
+                f"the monitor serves it from the next checkpoint, within {ONLINE_CHECKPOINT_SECONDS}s", "SUCCESS")
+        except Exception as e:
+            self.background_message.emit(f"Failed to label {row['url']}: {str(e)}", "ERROR")
+
+    def checkpoint_online_model(self):
+        from model.online import checkpoint_online_learner
+        threading.Thread(target=checkpoint_online_learner, name="checkpoint", daemon=True).start()
     
     def update_ai_log(self, data):
-        self.ai_log.setPlainText(data)
-        self.ai_log.verticalScrollBar().setValue(self.ai_log.verticalScrollBar().maximum())
+        with self.metrics.span("ui"):
+            self.ai_log.setPlainText(data)
+            self.ai_log.verticalScrollBar().setValue(self.ai_log.verticalScrollBar().maximum())
         self.log_system_message("AI analysis completed", "SUCCESS")
 
@@ -0,0 +1,130 @@
+from datetime import datetime
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor
+
+# (header, row key, store sort column)
+COLUMNS = [
+    ("Time", "scored_at", "scored_at"),
+    ("URL", "url", "url"),
+    ("Fetch", "fetch_status", None),
+    ("Score", "score", "score"),
+    ("Status", "status", "status"),
+    ("AI Label", "ai_label", None),
+    ("AI Conf.", "ai_confidence", None),
+]
+
+STATUS_COLORS = {
+    "SUSPICIOUS": QColor("#e74c3c"),
+    "POTENTIALLY SUSPICIOUS": QColor("#f1c40f"),
+    "SAFE": QColor("#2ecc71"),
+}
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """Scored pages from the result store, fetched page by page as the view scrolls.
+
+    Only rows the view has asked for are held in memory. Sorting and the
+    minimum-score filter are pushed down to SQLite.
+    """
+
+    def __init__(self, store, batch_size=200, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.batch_size = batch_size
+        self.rows = []
+        self.total = 0
+        self.min_score = None
+        self.sort_key = "scored_at"
+        self.descending = True
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self.rows = []
+        self.total = self.store.count_results(min_score=self.min_score)
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.rows) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        rows = self.store.results(offset=len(self.rows), limit=self.batch_size, min_score=self.min_score,
+                                  order_by=self.sort_key, descending=self.descending)
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        key = COLUMNS[index.column()][1]
+        value = row.get(key)
+        if role == Qt.DisplayRole:
+            if value is None:
+                return ""
+            if key == "scored_at":
+                return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S")
+            if key == "ai_confidence":
+                return f"{value:.2f}"
+            return str(value)
+        if role == Qt.ForegroundRole and key == "status":
+            return STATUS_COLORS.get(value)
+        if role == Qt.TextAlignmentRole and key in ("score", "ai_confidence"):
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role == Qt.ToolTipRole and key == "url":
+            return value
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        sort_key = COLUMNS[column][2]
+        if sort_key is None:
+            return
+        self.sort_key = sort_key
+        self.descending = order == Qt.DescendingOrder
+        self.reload()
+
+    def set_min_score(self, min_score):
+        self.min_score = min_score or None
+        self.reload()
+
+    def row(self, index):
+        return self.rows[index]
+
+    def add_run(self, run_id):
+        """Show a newly stored run without re-reading rows already loaded"""
+        count = self.store.count_results(run_id=run_id, min_score=self.min_score)
+        rows = self.store.results(run_id=run_id, limit=count, min_score=self.min_score,
+                                  order_by=self.sort_key, descending=self.descending)
+        if not rows:
+            return
+        if self.sort_key != "scored_at" or not self.descending:
+            # New rows interleave with loaded ones; re-query the loaded window
+            loaded = len(self.rows) + len(rows)
+            self.beginResetModel()
+            self.total = self.store.count_results(min_score=self.min_score)
+            self.rows = self.store.results(limit=loaded, min_score=self.min_score,
+                                           order_by=self.sort_key, descending=self.descending)
+            self.endResetModel()
+            return
+        # Newest-first view: the run goes on top as one insertion
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self.rows[0:0] = rows
+        self.total += len(rows)
+        self.endInsertRows()
@@ -0,0 +1,197 @@
+from datetime import datetime
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QRect, QSize, QEvent, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+
+ROW_HEIGHT = 64
+BUTTON_WIDTH = 110
+NumberRole = Qt.UserRole + 1
+
+
+class UrlListModel(QAbstractListModel):
+    """Monitored URLs straight from the URL registry.
+
+    Unfiltered, the model holds no copy of the list; rows are read from the
+    registry on demand. A search keeps only the matching (position, url)
+    pairs. Adds and removals go through the model so the view is updated
+    with row insertions/removals instead of a full rebuild.
+    """
+
+    # Emitted when the registry total changes without any visible row changing
+    count_changed = pyqtSignal()
+
+    def __init__(self, registry, parent=None):
+        super().__init__(parent)
+        self.registry = registry
+        self.search = ""
+        self.matches = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.registry) if self.matches is None else len(self.matches)
+
+    def total(self):
+        return len(self.registry)
+
+    def _row(self, row):
+        if self.matches is None:
+            return row, self.registry.url_at(row)
+        return self.matches[row]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        position, url = self._row(index.row())
+        if role == Qt.DisplayRole:
+            return url
+        if role == NumberRole:
+            return position + 1
+        if role == Qt.ToolTipRole:
+            # Only hovered rows pay for the metadata lookup
+            meta = self.registry.get(url) or {}
+            lines = [url, f"Added by: {meta.get('added_by') or '-'}"]
+            if meta.get("last_fetch"):
+                fetched = datetime.fromtimestamp(meta["last_fetch"]).strftime("%Y-%m-%d %H:%M:%S")
+                lines.append(f"Last fetch: {fetched} ({meta.get('last_status') or '-'})")
+            return "\n".join(lines)
+        return None
+
+    def _match(self, urls, start=0):
+        needle = self.search
+        return [(position, url) for position, url in enumerate(urls, start) if needle in url.lower()]
+
+    def set_search(self, text):
+        """Case-insensitive substring filter; an empty string shows every URL"""
+        self.beginResetModel()
+        self.search = text.strip().lower()
+        self.matches = self._match(self.registry.urls()) if self.search else None
+        self.endResetModel()
+
+    def reload(self):
+        self.set_search(self.search)
+
+    def _append(self, urls, first):
+        """Rows for URLs just appended to the registry at position first"""
+        if self.matches is None:
+            return first, first + len(urls) - 1, None
+        matched = self._match(urls, first)
+        return len(self.matches), len(self.matches) + len(matched) - 1, matched
+
+    def add_url(self, url, added_by="ui"):
+        """Append one URL; returns False if it is already monitored"""
+        url = url.strip()
+        if not url or url in self.registry:
+            return False
+        self.import_urls([url], added_by=added_by)
+        return True
+
+    def import_urls(self, urls, added_by="import"):
+        """Append many URLs as one row insertion; returns the ones that were new"""
+        new = list(dict.fromkeys(url.strip() for url in urls if url.strip() and url.strip() not in self.registry))
+        if not new:
+            return []
+        first, last, matched = self._append(new, len(self.registry))
+        if last < first:
+            # None of them match the search; only the total changes
+            added = self.registry.bulk_import(new, added_by=added_by)
+            self.count_changed.emit()
+            return added
+        self.beginInsertRows(QModelIndex(), first, last)
+        added = self.registry.bulk_import(new, added_by=added_by)
+        if matched is not None:
+            self.matches.extend(matched)
+        self.endInsertRows()
+        return added
+
+    def remove_url(self, url):
+        position = self.registry.index_of(url)
+        if position < 0:
+            return False
+        if self.matches is None:
+            self.beginRemoveRows(QModelIndex(), position, position)
+            self.registry.remove(url)
+            self.endRemoveRows()
+            return True
+        row = next((i for i, (_, match) in enumerate(self.matches) if match == url), -1)
+        if row >= 0:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        self.registry.remove(url)
+        # Every URL after the removed one moved up a place in the registry
+        self.matches = [(p - 1 if p > position else p, u) for p, u in self.matches if u != url]
+        if row >= 0:
+            self.endRemoveRows()
+        else:
+            self.count_changed.emit()
+        return True
+
+    def clear(self):
+        self.beginResetModel()
+        self.registry.clear()
+        if self.matches is not None:
+            self.matches = []
+        self.endResetModel()
+
+
+class UrlItemDelegate(QStyledItemDelegate):
+    """Paints a URL row (number, URL, remove button) without any child widgets"""
+
+    remove_requested = pyqtSignal(str)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def _rects(self, rect):
+        card = rect.adjusted(4, 4, -4, -4)
+        button = QRect(card.right() - BUTTON_WIDTH - 12, card.top() + 12, BUTTON_WIDTH, card.height() - 24)
+        text = QRect(card.left() + 14, card.top(), button.left() - card.left() - 28, card.height())
+        return card, text, button
+
+    def paint(self, painter, option, index):
+        card, text, button = self._rects(option.rect)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        if option.state & QStyle.State_Selected:
+            background = QColor("#4a90e2")
+        elif option.state & QStyle.State_MouseOver:
+            background = QColor("#3d3d3d")
+        else:
+            background = QColor("#2a2a2a")
+        painter.setPen(QPen(QColor("#333333")))
+        painter.setBrush(background)
+        painter.drawRoundedRect(card, 6, 6)
+
+        font = QFont(option.font)
+        font.setBold(True)
+        font.setPointSize(11)
+        painter.setFont(font)
+        painter.setPen(QColor("#ffffff") if option.state & QStyle.State_Selected else QColor("#4a90e2"))
+        number_rect = QRect(text.left(), text.top() + 6, text.width(), text.height() // 2 - 6)
+        painter.drawText(number_rect, Qt.AlignLeft | Qt.AlignVCenter, f"#{index.data(NumberRole)}")
+
+        font.setBold(False)
+        font.setPointSize(10)
+        painter.setFont(font)
+        painter.setPen(QColor("#ffffff"))
+        url_rect = QRect(text.left(), text.top() + text.height() // 2, text.width(), text.height() // 2 - 6)
+        url = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole), Qt.ElideMiddle, url_rect.width())
+        painter.drawText(url_rect, Qt.AlignLeft | Qt.AlignVCenter, url)
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#dc3545"))
+        painter.drawRoundedRect(button, 6, 6)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(button, Qt.AlignCenter, "Remove")
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            _, _, button = self._rects(option.rect)
+            if button.contains(event.pos()):
+                self.remove_requested.emit(index.data(Qt.DisplayRole))
+                return True
+        return super().editorEvent(event, model, option, index)
@@ -4,6 +4,7 @@ import (
 	"bufio"
 	"context"
 	"encoding/json"
+	"flag"
 	"fmt"
 	"io"
 	"log"
@@ -98,15 +99,10 @@ func scrapeURL(url string, results chan<- Result, wg *sync.WaitGroup) {
 	results <- result
 }
 
-func main() {
-	var err error
-	torClient, err = newTorClient("127.0.0.1:9050", 60*time.Second)
+func readURLs(path string) ([]string, error) {
+	file, err := os.Open(path)
 	if err != nil {
-		log.Fatalf("failed to create tor client: %v", err)
-	}
-	file, err := os.Open("url.txt")
-	if err != nil {
-		log.Fatal("Error opening url.txt:", err)
+		return nil, err
 	}
 	defer file.Close()
 	var urls []string
@@ -117,7 +113,95 @@ func main() {
 			urls = append(urls, url)
 		}
 	}
-	if err := scanner.Err(); err != nil {
+	return urls, scanner.Err()
+}
+
+// Command is one request read from stdin in -serve mode. An empty URL list
+// means "scrape everything in url.txt".
+type Command struct {
+	URLs []string `json:"urls"`
+}
+
+// StreamMessage is one line written to stdout in -serve mode.
+type StreamMessage struct {
+	Type  string `json:"type"`
+	Count int    `json:"count,omitempty"`
+	Error string `json:"error,omitempty"`
+	*Result
+}
+
+// serve keeps the process (and its Tor connection pool) alive, answering one
+// newline-delimited JSON command at a time. Every page is written as soon as
+// it is fetched, followed by a "done" line once the batch is complete.
+func serve() {
+	out := bufio.NewWriter(os.Stdout)
+	enc := json.NewEncoder(out)
+	enc.SetEscapeHTML(false)
+	var mu sync.Mutex
+	emit := func(msg StreamMessage) {
+		mu.Lock()
+		defer mu.Unlock()
+		if err := enc.Encode(msg); err != nil {
+			log.Fatal("JSON encode error:", err)
+		}
+		out.Flush()
+	}
+
+	in := bufio.NewScanner(os.Stdin)
+	in.Buffer(make([]byte, 1024*1024), 64*1024*1024)
+	for in.Scan() {
+		var cmd Command
+		line := strings.TrimSpace(in.Text())
+		if line != "" {
+			if err := json.Unmarshal([]byte(line), &cmd); err != nil {
+				emit(StreamMessage{Type: "done", Error: "bad command: " + err.Error()})
+				continue
+			}
+		}
+		urls := cmd.URLs
+		if len(urls) == 0 {
+			var err error
+			urls, err = readURLs("url.txt")
+			if err != nil {
+				emit(StreamMessage{Type: "done", Error: "reading url.txt: " + err.Error()})
+				continue
+			}
+		}
+		var wg sync.WaitGroup
+		results := make(chan Result, len(urls))
+		for _, url := range urls {
+			wg.Add(1)
+			go scrapeURL(url, results, &wg)
+		}
+		go func() {
+			wg.Wait()
+			close(results)
+		}()
+		count := 0
+		for result := range results {
+			r := result
+			emit(StreamMessage{Type: "page", Result: &r})
+			count++
+		}
+		emit(StreamMessage{Type: "done", Count: count})
+	}
+}
+
+func main() {
+	serveMode := flag.Bool("serve", false, "stay resident and stream results as JSON lines on stdout")
+	flag.Parse()
+
+	var err error
+	torClient, err = newTorClient("127.0.0.1:9050", 60*time.Second)
+	if err != nil {
+		log.Fatalf("failed to create tor client: %v", err)
+	}
+	if *serveMode {
+		serve()
+		return
+	}
+	urls, err := readURLs("url.txt")
+	if err != nil {
 		log.Fatal("Error reading url.txt:", err)
 	}
 	if len(urls) == 0 {